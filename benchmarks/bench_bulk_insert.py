@@ -0,0 +1,116 @@
+"""Measure record import throughput of the different write paths.
+
+- create_record: one ORM session and commit per record.
+- per-row flush: one transaction, flushing each record for its ID, like the
+  old sample-entry loader.
+- bulk_create_records: batched executemany in one transaction, with and
+  without deferred index maintenance.
+
+Usage: python benchmarks/bench_bulk_insert.py [--single 2000] [--flush 10000] [--bulk 100000]
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from common import print_table, reset_records, seed_records, setup_instance
+
+setup_instance()
+
+from bagels.managers import records
+from bagels.models.database.app import Session
+from bagels.models.record import Record
+from bagels.models.split import Split
+
+
+def records_data(count: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(days=365)
+    data = []
+    for i in range(count):
+        record = {
+            "label": f"Imported {i}",
+            "amount": round(rng.uniform(1, 500), 2),
+            "date": start + timedelta(seconds=rng.randint(0, 365 * 86400)),
+            "accountId": 2,
+            "categoryId": 1,
+            "isIncome": rng.random() < 0.15,
+        }
+        if rng.random() < 0.1:
+            record["splits"] = [{"amount": 5.0, "personId": 1, "isPaid": True}]
+        data.append(record)
+    return data
+
+
+def per_row_flush(data: list[dict]):
+    session = Session()
+    try:
+        for record_data in data:
+            record_data = dict(record_data)
+            splits = record_data.pop("splits", None) or []
+            record = Record(**record_data)
+            session.add(record)
+            session.flush()
+            for split in splits:
+                session.add(Split(recordId=record.id, **split))
+        session.commit()
+    finally:
+        session.close()
+
+
+def timed_rate(fn, count: int) -> str:
+    reset_records()
+    seed_records(0, accounts=2, persons=2)
+    start = time.perf_counter()
+    fn()
+    return f"{count / (time.perf_counter() - start):,.0f}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--single", type=int, default=2_000)
+    parser.add_argument("--flush", type=int, default=10_000)
+    parser.add_argument("--bulk", type=int, default=100_000)
+    args = parser.parse_args()
+
+    single = records_data(args.single)
+    flush = records_data(args.flush)
+    bulk = records_data(args.bulk)
+
+    rows = [
+        [
+            "create_record",
+            args.single,
+            timed_rate(
+                lambda: [
+                    records.create_record({k: v for k, v in d.items() if k != "splits"})
+                    for d in single
+                ],
+                args.single,
+            ),
+        ],
+        [
+            "per-row flush",
+            args.flush,
+            timed_rate(lambda: per_row_flush(flush), args.flush),
+        ],
+        [
+            "bulk_create_records",
+            args.bulk,
+            timed_rate(lambda: records.bulk_create_records(bulk), args.bulk),
+        ],
+        [
+            "bulk_create_records (deferred indexes)",
+            args.bulk,
+            timed_rate(
+                lambda: records.bulk_create_records(bulk, defer_indexes=True),
+                args.bulk,
+            ),
+        ],
+    ]
+    print_table(["path", "records", "records/s"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Compare the per-record category breakdown with the grouped query.
+
+Usage: python benchmarks/bench_category_totals.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+
+from common import best_of, print_table, reset_records, seed_records, setup_instance
+
+setup_instance()
+
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from bagels.managers import categories
+from bagels.models.category import Category
+from bagels.models.record import Record
+
+
+def legacy_get_all_categories_records(
+    offset=0, offset_type="month", is_income=True, subcategories=False
+):
+    """The previous implementation: ORM load of the period, totals in Python."""
+    session = categories.Session()
+    try:
+        start, end = categories.get_start_end_of_period(offset, offset_type)
+        stmt = (
+            select(Record)
+            .options(joinedload(Record.category))
+            .filter(
+                Record.date >= start, Record.date < end, Record.isIncome == is_income
+            )
+        )
+        totals = {}
+        for record in session.scalars(stmt).all():
+            record_amount = record.amount - sum(split.amount for split in record.splits)
+            if record.category is None:
+                continue
+            category_id = record.categoryId
+            if not subcategories and record.category.parentCategoryId:
+                category_id = record.category.parentCategoryId
+            totals[category_id] = totals.get(category_id, 0) + record_amount
+
+        stmt = (
+            select(Category)
+            .filter(Category.id.in_(totals.keys()), Category.deletedAt.is_(None))
+            .options(joinedload(Category.parentCategory))
+        )
+        result = session.scalars(stmt).all()
+        for category in result:
+            category.amount = totals[category.id]
+        result = [cat for cat in result if cat.amount != 0]
+        result.sort(key=lambda cat: cat.amount, reverse=True)
+        return result
+    finally:
+        session.close()
+
+
+CASES = {
+    "month expense": dict(offset_type="month", is_income=False),
+    "month income": dict(offset_type="month", is_income=True),
+    "year expense": dict(offset_type="year", is_income=False),
+    "year expense, subcategories": dict(
+        offset_type="year", is_income=False, subcategories=True
+    ),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        reset_records()
+        seed_records(size)
+        for name, kwargs in CASES.items():
+            old = legacy_get_all_categories_records(**kwargs)
+            new = categories.get_all_categories_records(**kwargs)
+            drift = max(
+                (abs(a.amount - b.amount) for a, b in zip(old, new)), default=0.0
+            )
+            assert [c.id for c in old] == [c.id for c in new]
+            old_time = best_of(
+                lambda: legacy_get_all_categories_records(**kwargs), args.repeat
+            )
+            new_time = best_of(
+                lambda: categories.get_all_categories_records(**kwargs), args.repeat
+            )
+            rows.append(
+                [
+                    f"{size:,}",
+                    name,
+                    f"{old_time * 1000:.1f}",
+                    f"{new_time * 1000:.1f}",
+                    f"{old_time / new_time:.1f}x",
+                    f"{drift:.2e}",
+                ]
+            )
+
+    print_table(["records", "case", "old (ms)", "new (ms)", "speedup", "drift"], rows)
+
+
+if __name__ == "__main__":
+    main()
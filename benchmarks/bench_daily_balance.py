@@ -0,0 +1,117 @@
+"""Compare the per-day query balance engine with the aggregated one.
+
+Usage: python benchmarks/bench_daily_balance.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+from datetime import datetime, timedelta
+
+from common import best_of, print_table, reset_records, seed_records, setup_instance
+
+setup_instance()
+
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+from bagels.managers import records
+from bagels.models.account import Account
+from bagels.models.record import Record
+
+
+def legacy_get_daily_balance(start_date, end_date) -> list[float]:
+    """The previous implementation: one ORM load of history plus one query per day."""
+    session = records.Session()
+    try:
+        accounts = session.query(Account).filter(Account.deletedAt.is_(None)).all()
+        total_balance = sum(a.beginningBalance for a in accounts)
+        old_records = (
+            session.query(Record)
+            .filter(
+                Record.date < start_date, Record.accountId.in_([a.id for a in accounts])
+            )
+            .options(
+                joinedload(Record.splits),
+                joinedload(Record.account),
+                joinedload(Record.transferToAccount),
+            )
+            .all()
+        )
+
+        def adjust_balance(r):
+            if r.isTransfer:
+                if r.transferToAccount and r.transferToAccount.name == "Outside source":
+                    return -r.amount
+                if r.account and r.account.name == "Outside source":
+                    return r.amount
+                return 0
+            if r.isIncome:
+                return r.amount - sum(s.amount for s in r.splits)
+            return -r.amount + sum(s.amount for s in r.splits)
+
+        for rec in old_records:
+            total_balance += adjust_balance(rec)
+
+        results = []
+        current = start_date
+        today = datetime.today()
+        while current <= end_date:
+            if current > today:
+                break
+            day_records = (
+                session.query(Record)
+                .filter(
+                    func.date(Record.date) == current.date(),
+                    Record.accountId.in_([a.id for a in accounts]),
+                )
+                .options(
+                    joinedload(Record.splits),
+                    joinedload(Record.account),
+                    joinedload(Record.transferToAccount),
+                )
+                .all()
+            )
+            total_balance += sum(adjust_balance(dr) for dr in day_records)
+            results.append(total_balance)
+            current += timedelta(days=1)
+        return results
+    finally:
+        session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # The Balance plot zoomed out to its maximum of 12 periods
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    end = today.replace(hour=23, minute=59, second=59)
+    start = today - timedelta(days=365)
+
+    rows = []
+    for size in args.sizes:
+        reset_records()
+        seed_records(size)
+        old = legacy_get_daily_balance(start, end)
+        new = records.get_daily_balance(start, end)
+        drift = max(abs(a - b) for a, b in zip(old, new))
+        old_time = best_of(lambda: legacy_get_daily_balance(start, end), args.repeat)
+        new_time = best_of(lambda: records.get_daily_balance(start, end), args.repeat)
+        rows.append(
+            [
+                f"{size:,}",
+                f"{old_time * 1000:.1f}",
+                f"{new_time * 1000:.1f}",
+                f"{old_time / new_time:.1f}x",
+                f"{drift:.2e}",
+            ]
+        )
+
+    print_table(["records", "old (ms)", "new (ms)", "speedup", "max drift"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Compare period queries over raw records with the daily rollup.
+
+Usage: python benchmarks/bench_daily_rollup.py [--sizes 100000 1000000]
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from common import best_of, print_table, reset_records, seed_records, setup_instance
+
+setup_instance()
+
+from sqlalchemy import case, func, select
+
+from bagels.managers import categories, records, utils
+from bagels.managers.cache import query_cache
+from bagels.models.record import Record
+from bagels.models.split import Split
+
+
+def _split_totals(*conditions):
+    return (
+        select(Split.recordId, func.sum(Split.amount).label("total"))
+        .filter(Split.recordId.in_(select(Record.id).filter(*conditions)))
+        .group_by(Split.recordId)
+        .subquery()
+    )
+
+
+def records_period_expenses(offset_type: str) -> float:
+    """Expenses of the period summed over records, as before the rollup."""
+    start, end = utils.get_start_end_of_period(0, offset_type)
+    conditions = [
+        Record.date >= start,
+        Record.date < end,
+        Record.isTransfer == False,  # noqa: E712
+        Record.isIncome == False,  # noqa: E712
+    ]
+    split_totals = _split_totals(*conditions)
+    amount = Record.amount - func.coalesce(split_totals.c.total, 0)
+    session = utils.Session()
+    try:
+        return session.scalar(
+            select(func.sum(case((Record.isIncome, amount), else_=-amount)))
+            .outerjoin(split_totals, split_totals.c.recordId == Record.id)
+            .filter(*conditions)
+        )
+    finally:
+        session.close()
+
+
+def records_category_totals(offset_type: str) -> list:
+    """Per-category expenses of the period summed over records."""
+    start, end = utils.get_start_end_of_period(0, offset_type)
+    conditions = [Record.date >= start, Record.date < end, Record.isIncome == False]  # noqa: E712
+    split_totals = _split_totals(*conditions)
+    session = utils.Session()
+    try:
+        return session.execute(
+            select(
+                Record.categoryId,
+                func.sum(Record.amount - func.coalesce(split_totals.c.total, 0)),
+            )
+            .outerjoin(split_totals, split_totals.c.recordId == Record.id)
+            .filter(*conditions)
+            .group_by(Record.categoryId)
+        ).all()
+    finally:
+        session.close()
+
+
+def records_daily_spending(start, end) -> list:
+    """Spending per day of the window summed over records."""
+    first_day, after_last_day = utils.get_day_range(start, end)
+    conditions = [
+        Record.dateDay >= first_day,
+        Record.dateDay < after_last_day,
+        Record.isIncome == False,  # noqa: E712
+        Record.isTransfer == False,  # noqa: E712
+    ]
+    split_totals = _split_totals(*conditions)
+    session = utils.Session()
+    try:
+        return session.execute(
+            select(
+                Record.dateDay,
+                func.sum(Record.amount - func.coalesce(split_totals.c.total, 0)),
+            )
+            .outerjoin(split_totals, split_totals.c.recordId == Record.id)
+            .filter(*conditions)
+            .group_by(Record.dateDay)
+        ).all()
+    finally:
+        session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    query_cache.enabled = False
+
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    end = today.replace(hour=23, minute=59, second=59)
+    year_start = today - timedelta(days=365)
+
+    rows = []
+    for size in args.sizes:
+        reset_records()
+        seed_records(size)
+        start = time.perf_counter()
+        records.rebuild_daily_rollup()
+        print(f"{size:,} records: rollup rebuilt in {time.perf_counter() - start:.2f}s")
+
+        cases = {
+            "year expenses": (
+                lambda: records_period_expenses("year"),
+                lambda: utils.get_period_figures(
+                    offset_type="year", offset=0, isIncome=False
+                ),
+            ),
+            "month expenses": (
+                lambda: records_period_expenses("month"),
+                lambda: utils.get_period_figures(
+                    offset_type="month", offset=0, isIncome=False
+                ),
+            ),
+            "year categories": (
+                lambda: records_category_totals("year"),
+                lambda: categories.get_all_categories_records(0, "year", False),
+            ),
+            "year spending": (
+                lambda: records_daily_spending(year_start, end),
+                lambda: records.get_daily_spending(year_start, end),
+            ),
+        }
+        for name, (raw, rollup) in cases.items():
+            raw_time = best_of(raw, args.repeat)
+            rollup_time = best_of(rollup, args.repeat)
+            rows.append(
+                [
+                    f"{size:,}",
+                    name,
+                    f"{raw_time * 1000:.1f}",
+                    f"{rollup_time * 1000:.1f}",
+                    f"{raw_time / rollup_time:.1f}x",
+                ]
+            )
+
+    print_table(["records", "query", "records (ms)", "rollup (ms)", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Compare the per-record spending series with the day-bucketed query.
+
+Usage: python benchmarks/bench_daily_spending.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+from datetime import datetime, timedelta
+
+from common import best_of, print_table, reset_records, seed_records, setup_instance
+
+setup_instance()
+
+from sqlalchemy.orm import joinedload
+
+from bagels.managers import records
+from bagels.models.record import Record
+
+
+def legacy_get_spending(start_date, end_date, cumulative=False) -> list[float]:
+    """The previous implementation: ORM load of the window, buckets in Python."""
+    session = records.Session()
+    try:
+        window = (
+            session.query(Record)
+            .filter(
+                Record.isIncome == False,  # noqa: E712
+                Record.date >= start_date,
+                Record.date < end_date,
+                Record.isTransfer == False,  # noqa: E712
+            )
+            .options(joinedload(Record.splits))
+            .all()
+        )
+        daily_spending = {}
+        for record in window:
+            date_key = record.date.date()
+            actual_spend = record.amount - sum(split.amount for split in record.splits)
+            daily_spending[date_key] = daily_spending.get(date_key, 0) + actual_spend
+
+        current_date = start_date.date()
+        today = datetime.today().date()
+        result = []
+        running_total = 0
+        while current_date <= end_date.date():
+            if current_date <= today:
+                daily_amount = daily_spending.get(current_date, 0)
+                if cumulative:
+                    running_total += daily_amount
+                    result.append(running_total)
+                else:
+                    result.append(daily_amount)
+            current_date += timedelta(days=1)
+        return result
+    finally:
+        session.close()
+
+
+def legacy_both(start, end):
+    """Both spending plots, as each used to fetch its own series."""
+    legacy_get_spending(start, end)
+    legacy_get_spending(start, end, cumulative=True)
+
+
+def new_both(start, end):
+    """Both spending plots, derived from one fetch."""
+    spending = records.get_daily_spending(start, end)
+    spending.tolist()
+    spending.cumsum().tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    end = today.replace(hour=23, minute=59, second=59)
+    windows = {"month": today - timedelta(days=30), "year": today - timedelta(days=365)}
+
+    rows = []
+    for size in args.sizes:
+        reset_records()
+        seed_records(size)
+        for name, start in windows.items():
+            old = legacy_get_spending(start, end)
+            new = records.get_spending(start, end)
+            drift = max(abs(a - b) for a, b in zip(old, new))
+            old_time = best_of(lambda: legacy_both(start, end), args.repeat)
+            new_time = best_of(lambda: new_both(start, end), args.repeat)
+            rows.append(
+                [
+                    f"{size:,}",
+                    name,
+                    f"{old_time * 1000:.1f}",
+                    f"{new_time * 1000:.1f}",
+                    f"{old_time / new_time:.1f}x",
+                    f"{drift:.2e}",
+                ]
+            )
+
+    print_table(
+        ["records", "window", "old (ms)", "new (ms)", "speedup", "max drift"], rows
+    )
+
+
+if __name__ == "__main__":
+    main()
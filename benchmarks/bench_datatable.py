@@ -0,0 +1,97 @@
+"""Compare filling the records DataTable row by row with its virtual row mode.
+
+Usage: python benchmarks/bench_datatable.py [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import asyncio
+import time
+
+from common import print_table, setup_instance
+
+setup_instance()
+
+from textual.app import App
+
+from bagels.components.datatable import DataTable, VirtualRow
+
+COLUMNS = (" ", "Category", "Amount", "Label", "Account")
+
+
+def make_rows(count: int) -> list[VirtualRow]:
+    return [
+        VirtualRow(
+            (" ", f"● Category {i % 20}", f"- {i % 997}.5", f"Record {i}", "Account"),
+            key=f"r-{i}",
+        )
+        for i in range(count)
+    ]
+
+
+class TableApp(App):
+    CSS = "DataTable { height: 40; }"
+
+    def compose(self):
+        yield DataTable(cursor_type="row")
+
+
+async def measure(rows: list[VirtualRow], virtual: bool) -> tuple[float, float]:
+    """Returns the seconds to fill the table, and to render a frame mid-table."""
+    app = TableApp()
+    async with app.run_test(size=(120, 50)) as pilot:
+        table = app.query_one(DataTable)
+        table.add_columns(*COLUMNS)
+        started = time.perf_counter()
+        if virtual:
+            table.set_row_provider(len(rows), rows.__getitem__)
+        else:
+            for cells, key, style_name in rows:
+                table.add_row(*cells, key=key, style_name=style_name)
+        await pilot.pause()  # column widths and the virtual size settle on idle
+        fill = time.perf_counter() - started
+
+        table.move_cursor(row=len(rows) // 2)
+        await pilot.pause()
+        started = time.perf_counter()
+        table._line_cache.clear()
+        table.render_lines(table.region.reset_offset)
+        frame = time.perf_counter() - started
+    return fill, frame
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    args = parser.parse_args()
+
+    table_rows = []
+    for size in args.sizes:
+        rows = make_rows(size)
+        old_fill, old_frame = asyncio.run(measure(rows, virtual=False))
+        new_fill, new_frame = asyncio.run(measure(rows, virtual=True))
+        table_rows.append(
+            [
+                f"{size:,}",
+                f"{old_fill * 1000:.1f}",
+                f"{new_fill * 1000:.1f}",
+                f"{old_frame * 1000:.2f}",
+                f"{new_frame * 1000:.2f}",
+            ]
+        )
+
+    print_table(
+        [
+            "rows",
+            "add_row fill (ms)",
+            "virtual fill (ms)",
+            "add_row frame (ms)",
+            "virtual frame (ms)",
+        ],
+        table_rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compare searching all periods with a LIKE scan against the full-text label index.
+
+Usage: python benchmarks/bench_label_search.py [--sizes 100000 1000000]
+"""
+
+import argparse
+
+from common import best_of, print_table, reset_records, seed_records, setup_instance
+
+setup_instance()
+
+from bagels.components.modules.records._table_builder import RECORDS_PAGE_SIZE
+from bagels.managers import records
+from bagels.models.database.app import Session
+from bagels.models.record import Record
+
+SEARCHES = ["din", "coffee", "rent 12"]
+
+
+def like_search(search: str):
+    """The search before the index: a LIKE scan of every label, newest first."""
+    session = Session()
+    try:
+        return (
+            session.query(Record)
+            .filter(Record.label.ilike(f"%{search}%"))
+            .order_by(Record.dateDay.desc(), Record.createdAt.desc(), Record.id.desc())
+            .limit(RECORDS_PAGE_SIZE)
+            .all()
+        )
+    finally:
+        session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        reset_records()
+        seed_records(size)
+        for search in SEARCHES:
+            like_time = best_of(lambda: like_search(search), args.repeat)
+            page_time = best_of(
+                lambda: records.get_records(
+                    label=search, all_periods=True, limit=RECORDS_PAGE_SIZE
+                ),
+                args.repeat,
+            )
+            ranked_time = best_of(lambda: records.search_records(search), args.repeat)
+            rows.append(
+                [
+                    f"{size:,}",
+                    repr(search),
+                    f"{len(records.search_records(search, limit=size)):,}",
+                    f"{like_time * 1000:.1f}",
+                    f"{page_time * 1000:.1f}",
+                    f"{ranked_time * 1000:.1f}",
+                ]
+            )
+
+    print_table(
+        [
+            "records",
+            "search",
+            "matches",
+            "LIKE page (ms)",
+            "index page (ms)",
+            "ranked top 50 (ms)",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Compare the SQL analytics queries with the in-memory ledger snapshot.
+
+Usage: python benchmarks/bench_ledger_snapshot.py [--sizes 100000 1000000]
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from common import best_of, print_table, reset_records, seed_records, setup_instance
+
+setup_instance()
+
+from bagels.managers import categories, records, utils
+from bagels.managers.cache import query_cache
+from bagels.managers.snapshot import LedgerSnapshot
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    query_cache.enabled = False
+
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    end = today.replace(hour=23, minute=59, second=59)
+    month, year = today - timedelta(days=30), today - timedelta(days=365)
+
+    rows = []
+    for size in args.sizes:
+        reset_records()
+        seed_records(size)
+        start = time.perf_counter()
+        snapshot = LedgerSnapshot().load()
+        load_time = time.perf_counter() - start
+        print(
+            f"{size:,} records: loaded in {load_time:.2f}s, "
+            f"{snapshot.nbytes / 1024**2:.1f} MB"
+        )
+
+        cases = {
+            "period figures (year)": (
+                lambda: utils.get_period_figures(
+                    offset_type="year", offset=0, isIncome=False
+                ),
+                lambda: snapshot.period_figures(
+                    offset_type="year", offset=0, isIncome=False
+                ),
+            ),
+            "category totals (year)": (
+                lambda: categories.get_all_categories_records(0, "year", False),
+                lambda: snapshot.category_totals(0, "year", False),
+            ),
+            "daily spending (month)": (
+                lambda: records.get_daily_spending(month, end),
+                lambda: snapshot.daily_spending(month, end),
+            ),
+            "daily balance (year)": (
+                lambda: records.get_daily_balance(year, end),
+                lambda: snapshot.daily_balance(year, end),
+            ),
+        }
+        for name, (sql, vectorized) in cases.items():
+            sql_time = best_of(sql, args.repeat)
+            snapshot_time = best_of(vectorized, args.repeat)
+            rows.append(
+                [
+                    f"{size:,}",
+                    name,
+                    f"{sql_time * 1000:.1f}",
+                    f"{snapshot_time * 1000:.1f}",
+                    f"{sql_time / snapshot_time:.1f}x",
+                ]
+            )
+
+        # An edit touching one record, applied incrementally
+        records.update_record(int(snapshot.id[0]), {"amount": 1.0})
+        start = time.perf_counter()
+        snapshot.refresh()
+        print(
+            f"  refresh after one edit: {(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+
+    print_table(["records", "query", "sql (ms)", "snapshot (ms)", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
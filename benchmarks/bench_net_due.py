@@ -0,0 +1,90 @@
+"""Compare the per-person net due subqueries with the grouped query.
+
+Usage: python benchmarks/bench_net_due.py [--persons 1000] [--splits 100000]
+"""
+
+import argparse
+
+from common import best_of, print_table, reset_records, seed_records, setup_instance
+
+setup_instance()
+
+from sqlalchemy import func, select
+
+from bagels.managers import persons
+from bagels.models.person import Person
+from bagels.models.record import Record
+from bagels.models.split import Split
+
+# seed_records never splits transfers, which are 5% of its records
+SPLIT_RECORDS = 0.95
+
+
+def legacy_get_persons_with_net_due():
+    """The previous implementation: two correlated subqueries per person."""
+    session = persons.Session()
+    try:
+
+        def unpaid(is_income):
+            return func.coalesce(
+                select(func.sum(Split.amount))
+                .select_from(Split)
+                .join(Record)
+                .where(
+                    Split.personId == Person.id,
+                    Record.isIncome == is_income,
+                    Split.isPaid == False,  # noqa: E712
+                )
+                .correlate(Person)
+                .scalar_subquery(),
+                0,
+            )
+
+        stmt = (
+            select(Person, (unpaid(False) - unpaid(True)).label("due"))
+            .where(Person.deletedAt.is_(None))
+            .order_by(Person.name)
+        )
+        return session.execute(stmt).all()
+    finally:
+        session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--persons", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--splits", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = []
+    for splits in args.splits:
+        for person_count in args.persons:
+            reset_records()
+            seed_records(
+                round(splits / SPLIT_RECORDS), persons=person_count, split_ratio=1.0
+            )
+            old = {person.id: due for person, due in legacy_get_persons_with_net_due()}
+            new = {
+                person.id: person.due for person in persons.get_persons_with_net_due()
+            }
+            assert old.keys() == new.keys()
+            drift = max((abs(old[key] - new[key]) for key in old), default=0.0)
+            old_time = best_of(legacy_get_persons_with_net_due, args.repeat)
+            new_time = best_of(persons.get_persons_with_net_due, args.repeat)
+            rows.append(
+                [
+                    f"{person_count:,}",
+                    f"{splits:,}",
+                    f"{old_time * 1000:.1f}",
+                    f"{new_time * 1000:.1f}",
+                    f"{old_time / new_time:.1f}x",
+                    f"{drift:.2e}",
+                ]
+            )
+
+    print_table(["persons", "splits", "old (ms)", "new (ms)", "speedup", "drift"], rows)
+
+
+if __name__ == "__main__":
+    main()
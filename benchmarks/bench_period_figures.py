@@ -0,0 +1,91 @@
+"""Compare the per-record period figures with the single SQL aggregate.
+
+Usage: python benchmarks/bench_period_figures.py [--sizes 10000 100000]
+"""
+
+import argparse
+
+from common import best_of, print_table, reset_records, seed_records, setup_instance
+
+setup_instance()
+
+from bagels.config import CONFIG
+from bagels.managers import utils
+from bagels.models.category import Category, Nature
+from bagels.models.record import Record
+
+
+def legacy_get_period_figures(
+    accountId=None, offset_type=None, offset=None, isIncome=None, nature=None
+):
+    """The previous implementation: ORM load of the period plus lazy split loads."""
+    session = utils.Session()
+    try:
+        query = session.query(Record)
+        if accountId is not None:
+            query = query.filter(Record.accountId == accountId)
+        if offset_type is not None and offset is not None:
+            start, end = utils.get_start_end_of_period(offset, offset_type)
+            query = query.filter(Record.date >= start, Record.date < end)
+        if nature is not None:
+            query = query.join(Record.category).filter(Category.nature == nature)
+
+        total = 0
+        for record in query.all():
+            if isIncome is not None and record.isTransfer:
+                continue
+            if isIncome is not None and record.isIncome != isIncome:
+                continue
+            record_amount = record.amount - sum(split.amount for split in record.splits)
+            if not record.isTransfer:
+                if record.isIncome:
+                    total += record_amount
+                else:
+                    total -= record_amount
+        return abs(round(total, CONFIG.defaults.round_decimals))
+    finally:
+        session.close()
+
+
+# What the Insights and Budgets pages ask for on a rebuild
+CASES = {
+    "month income": dict(offset_type="month", offset=0, isIncome=True),
+    "month expense": dict(offset_type="month", offset=0, isIncome=False),
+    "year expense": dict(offset_type="year", offset=0, isIncome=False),
+    "month need": dict(
+        offset_type="month", offset=0, isIncome=False, nature=Nature.NEED
+    ),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        reset_records()
+        seed_records(size)
+        for name, kwargs in CASES.items():
+            old = legacy_get_period_figures(**kwargs)
+            new = utils.get_period_figures(**kwargs)
+            old_time = best_of(lambda: legacy_get_period_figures(**kwargs), args.repeat)
+            new_time = best_of(lambda: utils.get_period_figures(**kwargs), args.repeat)
+            rows.append(
+                [
+                    f"{size:,}",
+                    name,
+                    f"{old_time * 1000:.1f}",
+                    f"{new_time * 1000:.1f}",
+                    f"{old_time / new_time:.1f}x",
+                    f"{abs(old - new):.2e}",
+                ]
+            )
+
+    print_table(["records", "case", "old (ms)", "new (ms)", "speedup", "drift"], rows)
+
+
+if __name__ == "__main__":
+    main()
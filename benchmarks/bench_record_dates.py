@@ -0,0 +1,80 @@
+"""Compare function-based date sorting and filtering with the indexed dateDay column.
+
+Usage: python benchmarks/bench_record_dates.py [--size 500000]
+"""
+
+import argparse
+from datetime import datetime, timedelta
+
+from common import best_of, print_table, seed_records, setup_instance
+
+setup_instance()
+
+from sqlalchemy import func, select
+
+from bagels.managers.utils import get_day_range
+from bagels.models.database.app import db_engine
+from bagels.models.record import Record
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    seed_records(args.size)
+
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    year_start, year_end = today - timedelta(days=365), today
+    first_day, after_last_day = get_day_range(year_start, year_end)
+    day = today - timedelta(days=30)
+
+    statements = {
+        "sort year": (
+            select(Record.id)
+            .filter(
+                Record.date >= year_start, Record.date < year_end + timedelta(days=1)
+            )
+            .order_by(func.date(Record.date).desc(), Record.createdAt.desc()),
+            select(Record.id)
+            .filter(Record.dateDay >= first_day, Record.dateDay < after_last_day)
+            .order_by(Record.dateDay.desc(), Record.createdAt.desc()),
+        ),
+        "filter one day": (
+            select(Record.id).filter(func.date(Record.date) == day.date()),
+            select(Record.id).filter(Record.dateDay == day.date().isoformat()),
+        ),
+        "group days of year": (
+            select(func.date(Record.date), func.sum(Record.amount))
+            .filter(
+                Record.date >= year_start, Record.date < year_end + timedelta(days=1)
+            )
+            .group_by(func.date(Record.date)),
+            select(Record.dateDay, func.sum(Record.amount))
+            .filter(Record.dateDay >= first_day, Record.dateDay < after_last_day)
+            .group_by(Record.dateDay),
+        ),
+    }
+
+    rows = []
+    with db_engine.connect() as conn:
+        for name, (old, new) in statements.items():
+            assert len(conn.execute(old).all()) == len(conn.execute(new).all())
+            old_time = best_of(lambda: conn.execute(old).all(), args.repeat)
+            new_time = best_of(lambda: conn.execute(new).all(), args.repeat)
+            rows.append(
+                [
+                    name,
+                    f"{old_time * 1000:.1f}",
+                    f"{new_time * 1000:.1f}",
+                    f"{old_time / new_time:.1f}x",
+                ]
+            )
+
+    print(f"{args.size:,} records")
+    print_table(["query", "func.date (ms)", "dateDay (ms)", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Compare loading a whole period of records with loading it page by page.
+
+Usage: python benchmarks/bench_records_pages.py [--sizes 10000 100000]
+"""
+
+import argparse
+
+from common import best_of, print_table, reset_records, seed_records, setup_instance
+
+setup_instance()
+
+from bagels.components.modules.records._table_builder import RECORDS_PAGE_SIZE
+from bagels.managers import records
+
+
+def get_page(number: int):
+    """Returns the given page of this year's records, walking the keyset."""
+    after = None
+    for _ in range(number + 1):
+        page = records.get_records(
+            offset_type="year", limit=RECORDS_PAGE_SIZE, after=after
+        )
+        after = records.get_record_page_key(page[-1])
+    return page
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        reset_records()
+        seed_records(size)
+        year = len(records.get_records(offset_type="year"))
+        full_time = best_of(
+            lambda: records.get_records(offset_type="year"), args.repeat
+        )
+        first_time = best_of(lambda: get_page(0), args.repeat)
+        # the cost of one more page, ten pages in
+        tenth_time = best_of(lambda: get_page(10), args.repeat) - best_of(
+            lambda: get_page(9), args.repeat
+        )
+        rows.append(
+            [
+                f"{size:,}",
+                f"{year:,}",
+                f"{full_time * 1000:.1f}",
+                f"{first_time * 1000:.1f}",
+                f"{tenth_time * 1000:.1f}",
+            ]
+        )
+
+    print_table(
+        ["records", "in year", "whole year (ms)", "first page (ms)", "11th page (ms)"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Measure record write throughput under different SQLite pragma settings.
+
+Single inserts go through create_record, one commit per record. Bulk inserts
+write a batch of records in one transaction.
+
+Usage: python benchmarks/bench_write_throughput.py [--single 2000] [--bulk 100000]
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+from common import print_table, reset_records, setup_instance
+
+setup_instance()
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from bagels import config
+from bagels.managers import records
+from bagels.models.database.app import create_db_engine, db_engine
+from bagels.models.record import Record
+
+PROFILES = {
+    "sqlite defaults": config.Database(
+        journal_mode="delete",
+        synchronous="full",
+        cache_size=-2000,
+        mmap_size=0,
+        temp_store="default",
+    ),
+    "wal + full": config.Database(synchronous="full"),
+    "wal + normal (default)": config.Database(),
+}
+
+
+def record_data(i: int) -> dict:
+    return {
+        "label": f"Record {i}",
+        "amount": 10.0 + i % 100,
+        "date": datetime.now(),
+        "accountId": 1,
+        "categoryId": 1,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--single", type=int, default=2_000)
+    parser.add_argument("--bulk", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rows = []
+    for name, settings in PROFILES.items():
+        # Journal mode can only change while no other connection is open
+        config.CONFIG.database = settings
+        db_engine.dispose()
+        reset_records()
+        db_engine.dispose()
+        engine = create_db_engine()
+        records.Session = sessionmaker(bind=engine)
+
+        start = time.perf_counter()
+        for i in range(args.single):
+            records.create_record(record_data(i))
+        single_rate = args.single / (time.perf_counter() - start)
+
+        batch = [record_data(i) for i in range(args.bulk)]
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            conn.execute(insert(Record), batch)
+        bulk_rate = args.bulk / (time.perf_counter() - start)
+
+        engine.dispose()
+        rows.append([name, f"{single_rate:,.0f}", f"{bulk_rate:,.0f}"])
+
+    print_table(["profile", "single (records/s)", "bulk (records/s)"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Shared helpers for the benchmark scripts.
+
+Each benchmark runs against a throwaway database in a temporary app root, so
+the user's real ledger is never touched. Call `setup_instance()` before
+importing anything from `bagels.managers`.
+"""
+
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+
+# words seeded record labels are made of, so that label searches have realistic hit counts
+LABEL_WORDS = (
+    "coffee groceries dinner lunch rent fuel parking cinema gym pharmacy books "
+    "taxi train flight hotel insurance electricity water internet phone gift "
+    "bakery market restaurant takeaway subscription repair hardware clothes "
+    "shoes haircut dentist doctor tuition donation salary refund transfer"
+).split()
+
+
+def setup_instance():
+    """Point bagels at a temporary root, load the config and create the schema."""
+    from bagels.locations import set_custom_root
+
+    root = tempfile.mkdtemp(prefix="bagels-bench-")
+    set_custom_root(root)
+
+    from bagels.config import load_config
+
+    load_config()
+
+    from bagels.models.database.app import init_db
+
+    init_db()
+    return root
+
+
+def seed_records(
+    count: int,
+    accounts: int = 4,
+    persons: int = 20,
+    days: int = 3 * 365,
+    split_ratio: float = 0.1,
+    seed: int = 0,
+):
+    """Bulk insert `count` random records (and some splits) spread over `days` days up to today."""
+    from bagels.models.account import Account
+    from bagels.models.category import Category
+    from bagels.models.database.app import db_engine
+    from bagels.models.person import Person
+    from bagels.models.record import Record
+    from bagels.models.split import Split
+
+    rng = random.Random(seed)
+    label_rng = random.Random(seed + 1)  # keeps the other columns as before
+    now = datetime.now()
+    start = now - timedelta(days=days)
+
+    with db_engine.begin() as conn:
+        conn.execute(
+            insert(Account),
+            [
+                {"name": f"Account {i}", "beginningBalance": 1000.0, "hidden": False}
+                for i in range(accounts)
+            ],
+        )
+        conn.execute(insert(Person), [{"name": f"Person {i}"} for i in range(persons)])
+        account_ids = conn.scalars(
+            select(Account.id).filter(Account.name != "Outside source")
+        ).all()
+        person_ids = conn.scalars(select(Person.id)).all()
+        category_ids = conn.scalars(select(Category.id)).all()
+        first_id = conn.scalar(select(func.max(Record.id))) or 0
+
+        batch_size = 50_000
+        for batch_start in range(0, count, batch_size):
+            rows, splits = [], []
+            for i in range(batch_start, min(batch_start + batch_size, count)):
+                kind = rng.random()
+                is_transfer = kind < 0.05
+                is_income = not is_transfer and kind < 0.2
+                account_id = rng.choice(account_ids)
+                date = start + timedelta(seconds=rng.randint(0, days * 86400))
+                rows.append(
+                    {
+                        "label": f"{label_rng.choice(LABEL_WORDS).title()} "
+                        f"{label_rng.choice(LABEL_WORDS)} {i}",
+                        "amount": round(rng.uniform(1, 500), 2),
+                        "date": date,
+                        "accountId": account_id,
+                        "categoryId": None if is_transfer else rng.choice(category_ids),
+                        "isIncome": is_income,
+                        "isTransfer": is_transfer,
+                        "transferToAccountId": rng.choice(account_ids)
+                        if is_transfer
+                        else None,
+                        "createdAt": date,
+                        "updatedAt": date,
+                    }
+                )
+                if not is_transfer and rng.random() < split_ratio:
+                    splits.append(
+                        {
+                            "recordId": first_id + i + 1,
+                            "amount": round(rng.uniform(1, 20), 2),
+                            "personId": rng.choice(person_ids),
+                            "isPaid": rng.random() < 0.5,
+                            "accountId": account_id,
+                        }
+                    )
+            conn.execute(insert(Record), rows)
+            if splits:
+                conn.execute(insert(Split), splits)
+
+    # Core inserts bypass the ORM flush listeners that maintain derived tables
+    from bagels.managers.accounts import rebuild_account_balance_cache
+    from bagels.managers.records import rebuild_daily_rollup
+
+    rebuild_account_balance_cache()
+    rebuild_daily_rollup()
+
+
+def reset_records():
+    """Delete every record, split, person and seeded account."""
+    from bagels.models.account import Account
+    from bagels.models.database.app import db_engine
+    from bagels.models.person import Person
+    from bagels.models.record import Record
+    from bagels.models.split import Split
+
+    with db_engine.begin() as conn:
+        conn.execute(Split.__table__.delete())
+        conn.execute(Record.__table__.delete())
+        conn.execute(Person.__table__.delete())
+        conn.execute(Account.__table__.delete().where(Account.name != "Outside source"))
+
+
+def best_of(fn, repeat: int = 3) -> float:
+    """Return the fastest of `repeat` runs of `fn`, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def print_table(headers: list[str], rows: list[list]):
+    widths = [
+        max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)
+    ]
+    print("  ".join(str(h).rjust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(str(c).rjust(w) for c, w in zip(row, widths)))
@@ -1,5 +1,5 @@
 from pathlib import Path
-from time import sleep
+from time import perf_counter, sleep
 
 import click
 from rich.progress import (
@@ -43,9 +43,11 @@ def cli(ctx, at: Path | None, migrate: str | None, source: Path | None):
         if migrate == "actualbudget":
             try:
                 click.echo(f"Starting migration from {source}")
-                from bagels.models.database.app import init_db
+                from bagels.models.database.app import db_engine, init_db
 
                 init_db()
+                # Release pooled connections so the migrator can switch journal mode
+                db_engine.dispose()
 
                 from bagels.locations import database_file
                 from bagels.migrations.migrate_actualbudget import (
@@ -53,7 +55,33 @@ def cli(ctx, at: Path | None, migrate: str | None, source: Path | None):
                 )
 
                 migrator = BudgetToBagelsMigration(str(source), str(database_file()))
-                migrator.migrate()
+                with Progress(
+                    TextColumn("[progress.description]{task.description}"),
+                    BarColumn(),
+                    TaskProgressColumn(),
+                    TextColumn("{task.fields[rate]}"),
+                    TimeRemainingColumn(),
+                    transient=True,
+                ) as progress:
+                    task = progress.add_task("Migrating transactions...", rate="")
+                    started = perf_counter()
+
+                    def on_progress(done: int, total: int):
+                        rate = done / max(perf_counter() - started, 1e-9)
+                        progress.update(
+                            task,
+                            completed=done,
+                            total=total,
+                            rate=f"{rate:,.0f} rows/s",
+                        )
+
+                    migrator.migrate(on_progress=on_progress)
+
+                from bagels.managers.accounts import rebuild_account_balance_cache
+                from bagels.managers.records import rebuild_daily_rollup
+
+                rebuild_account_balance_cache()
+                rebuild_daily_rollup()
                 click.echo(click.style("Migration completed successfully!", fg="green"))
                 return
             except Exception as e:
@@ -123,5 +151,140 @@ def locate(thing_to_locate: str) -> None:
         print(database_file())
 
 
+@cli.command(name="verify-balances")
+@click.option(
+    "--repair/--no-repair",
+    default=True,
+    help="Overwrite drifted cached balances with the recomputed values.",
+)
+def verify_balances(repair: bool) -> None:
+    """Recompute account balances from scratch and compare them to the cache."""
+    from bagels.config import load_config
+
+    load_config()
+
+    from bagels.models.database.app import init_db
+
+    init_db()
+
+    from bagels.managers.accounts import get_account_by_id, verify_account_balances
+
+    drifted = verify_account_balances(repair=repair)
+    if not drifted:
+        click.echo(click.style("All account balances are consistent.", fg="green"))
+        return
+
+    for account_id, (cached, actual) in drifted.items():
+        account = get_account_by_id(account_id)
+        name = account.name if account else f"#{account_id}"
+        click.echo(f"{name}: cached {cached:.2f}, actual {actual:.2f}")
+    if repair:
+        click.echo(click.style(f"Repaired {len(drifted)} account(s).", fg="yellow"))
+    else:
+        click.echo(click.style(f"{len(drifted)} account(s) drifted.", fg="red"))
+
+
+@cli.command(name="rebuild-rollup")
+def rebuild_rollup() -> None:
+    """Recompute the daily rollup used by period figures from the records."""
+    from bagels.config import load_config
+
+    load_config()
+
+    from bagels.models.database.app import init_db
+
+    init_db()
+
+    from bagels.managers.records import rebuild_daily_rollup
+
+    started = perf_counter()
+    rebuild_daily_rollup()
+    click.echo(
+        click.style(
+            f"Rebuilt the daily rollup in {perf_counter() - started:.1f}s.", fg="green"
+        )
+    )
+
+
+@cli.command(name="import")
+@click.argument(
+    "file",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, path_type=Path),
+)
+@click.option(
+    "--profile",
+    "profile_name",
+    help="Import profile from the 'imports' section of the config file.",
+)
+@click.option(
+    "--format",
+    "file_format",
+    type=click.Choice(["csv", "ofx", "qif"]),
+    help="File format. Defaults to the profile's, then the file extension.",
+)
+@click.option("--account", help="Account name for rows that name no account.")
+@click.option("--batch-size", type=click.IntRange(min=1), help="Records per commit.")
+@click.pass_context
+def import_statement(
+    ctx,
+    file: Path,
+    profile_name: str | None,
+    file_format: str | None,
+    account: str | None,
+    batch_size: int | None,
+) -> None:
+    """Import transactions from a CSV, OFX or QIF bank export."""
+    from bagels.config import ImportProfile, load_config
+
+    load_config()
+
+    from bagels.config import CONFIG
+
+    if profile_name and profile_name not in CONFIG.imports:
+        raise click.UsageError(f"No import profile named '{profile_name}' in config")
+    profile = CONFIG.imports.get(profile_name) or ImportProfile()
+    if batch_size:
+        profile = profile.model_copy(update={"batch_size": batch_size})
+
+    from bagels.models.database.app import init_db
+
+    init_db()
+
+    from bagels.importers.statements import StatementImporter, get_peak_memory_mb
+
+    try:
+        importer = StatementImporter(profile, account)
+        with Progress(
+            TextColumn("[progress.description]{task.description}"), transient=True
+        ) as progress:
+            task = progress.add_task("Importing...")
+            stats = importer.run(
+                file,
+                file_format,
+                on_batch=lambda stats: progress.update(
+                    task,
+                    description=f"Imported {stats.imported:,} records "
+                    f"({stats.rows_per_second:,.0f} rows/s)",
+                ),
+            )
+    except (ValueError, UnicodeDecodeError) as e:
+        click.echo(click.style(f"Import failed: {e}", fg="red"))
+        ctx.exit(1)
+
+    for line_number, message in stats.errors:
+        click.echo(click.style(f"Line {line_number}: {message}", fg="yellow"))
+    click.echo(
+        click.style(
+            f"Imported {stats.imported:,} of {stats.read:,} rows "
+            f"({stats.skipped:,} skipped) in {stats.elapsed:.1f}s, "
+            f"{stats.rows_per_second:,.0f} rows/s.",
+            fg="green",
+        )
+    )
+    peak = get_peak_memory_mb()
+    if peak is not None:
+        click.echo(f"Peak memory: {peak:,.0f} MB")
+
+
 if __name__ == "__main__":
     cli()
@@ -252,6 +252,14 @@ class RowRenderables(NamedTuple):
     cells: list[RenderableType]
 
 
+class VirtualRow(NamedTuple):
+    """A row returned by the row provider of a virtual DataTable."""
+
+    cells: Iterable[Any]
+    key: str | None = None
+    style_name: str | None = None
+
+
 class DataTable(ScrollView, Generic[CellType], can_focus=True):
     """A tabular widget that contains data."""
 
@@ -376,6 +384,9 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
     }
     """
 
+    VIRTUAL_OVERSCAN: ClassVar[int] = 10
+    """Rows materialized above and below the view of a virtual table."""
+
     show_header = Reactive(True)
     show_row_labels = Reactive(True)
     fixed_rows = Reactive(0)
@@ -760,6 +771,12 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
         """Whether or not the user has supplied any rows with labels."""
         self._label_column = Column(self._label_column_key, Text(), auto_width=True)
         """The largest content width out of all row labels in the table."""
+        self._row_provider: Callable[[int], VirtualRow] | None = None
+        """Returns the row at an index, when the table is in virtual mode."""
+        self._virtual_row_count = 0
+        """The number of rows of the row provider."""
+        self._width_sample_size = 200
+        """The number of virtual rows measured to size the columns."""
 
         self.show_header = show_header
         """Show/hide the header row (the row of column labels)."""
@@ -810,8 +827,15 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
     @property
     def row_count(self) -> int:
         """The number of rows currently present in the DataTable."""
+        if self._row_provider is not None:
+            return self._virtual_row_count
         return len(self.rows)
 
+    @property
+    def is_virtual(self) -> bool:
+        """Whether rows come from a row provider rather than `add_row`."""
+        return self._row_provider is not None
+
     @property
     def _y_offsets(self) -> list[tuple[RowKey, int]]:
         """Contains a 2-tuple for each line (not row!) of the DataTable. Given a
@@ -831,6 +855,8 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
     @property
     def _total_row_height(self) -> int:
         """The total height of all rows within the DataTable"""
+        if self._row_provider is not None:
+            return self._virtual_row_count
         return len(self._y_offsets)
 
     def update_cell(
@@ -989,7 +1015,7 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
         """
         if not self.is_valid_row_index(row_index):
             raise RowDoesNotExist(f"Row index {row_index!r} is not valid.")
-        row_key = self._row_locations.get_key(row_index)
+        row_key = self._get_row_key(row_index)
         return self.get_row(row_key)
 
     def get_row_index(self, row_key: RowKey | str) -> int:
@@ -1249,16 +1275,16 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
         if not self.is_valid_coordinate(coordinate):
             raise CellDoesNotExist(f"No cell exists at {coordinate!r}.")
         row_index, column_index = coordinate
-        row_key = self._row_locations.get_key(row_index)
+        row_key = self._get_row_key(row_index)
         column_key = self._column_locations.get_key(column_index)
         return CellKey(row_key, column_key)
 
     def _highlight_row(self, row_index: int) -> None:
         """Apply highlighting to the row at the given index, and post event."""
         self.refresh_row(row_index)
-        is_valid_row = row_index < len(self._data)
+        is_valid_row = row_index < self.row_count
         if is_valid_row:
-            row_key = self._row_locations.get_key(row_index)
+            row_key = self._get_row_key(row_index)
             self.post_message(DataTable.RowHighlighted(self, row_index, row_key))
 
     def _highlight_column(self, column_index: int) -> None:
@@ -1479,8 +1505,7 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
             return Region(0, 0, 0, 0)
 
         row_index, column_index = coordinate
-        row_key = self._row_locations.get_key(row_index)
-        row = self.rows[row_key]
+        row = self._get_row_metadata(row_index)
 
         # The x-coordinate of a cell is the sum of widths of the data cells to the left
         # plus the width of the render width of the longest row label.
@@ -1494,7 +1519,7 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
         column_key = self._column_locations.get_key(column_index)
         width = self.columns[column_key].get_render_width(self)
         height = row.height
-        y = sum(ordered_row.height for ordered_row in self.ordered_rows[:row_index])
+        y = self._get_row_y(row_index)
         if self.show_header:
             y += self.header_height
         cell_region = Region(x, y, width, height)
@@ -1505,14 +1530,12 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
         if not self.is_valid_row_index(row_index):
             return Region(0, 0, 0, 0)
 
-        rows = self.rows
-        row_key = self._row_locations.get_key(row_index)
-        row = rows[row_key]
+        row = self._get_row_metadata(row_index)
         row_width = (
             sum(column.get_render_width(self) for column in self.columns.values())
             + self._row_label_column_width
         )
-        y = sum(ordered_row.height for ordered_row in self.ordered_rows[:row_index])
+        y = self._get_row_y(row_index)
         if self.show_header:
             y += self.header_height
         row_region = Region(0, y, row_width, row.height)
@@ -1547,11 +1570,13 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
         Returns:
             The `DataTable` instance.
         """
-        self._clear_caches()
-        self._y_offsets.clear()
+        self._row_provider = None
+        self._virtual_row_count = 0
         self._data.clear()
         self.rows.clear()
         self._row_locations = TwoWayDict({})
+        self._clear_caches()
+        self._y_offsets.clear()
         if columns:
             self.columns.clear()
             self._column_locations = TwoWayDict({})
@@ -1649,6 +1674,9 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
                 of its current location in the DataTable (it could have moved after
                 being added due to sorting or insertion/deletion of other rows).
         """
+        if self._row_provider is not None:
+            raise ValueError("Rows of a virtual DataTable come from its row provider.")
+
         row_key = RowKey(key)
         if row_key in self._row_locations:
             raise DuplicateKey(f"The row key {row_key!r} already exists.")
@@ -1731,6 +1759,203 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
             row_keys.append(row_key)
         return row_keys
 
+    def set_row_provider(
+        self,
+        row_count: int,
+        get_row: Callable[[int], VirtualRow],
+        *,
+        width_sample_size: int = 200,
+    ) -> Self:
+        """Switch the table to virtual mode, where rows come from a callback.
+
+        Only the rows in view, plus `VIRTUAL_OVERSCAN` rows on each side, are
+        materialized, so the cost of a frame does not depend on the row count.
+        Virtual rows are a line high and have no labels. Columns added with a
+        width keep it, the others are sized from a sample of the rows.
+
+        Args:
+            row_count: The number of rows.
+            get_row: Returns the `VirtualRow` at an index.
+            width_sample_size: The number of rows to measure for column widths.
+
+        Returns:
+            The `DataTable` instance.
+        """
+        self._row_provider = get_row
+        self._virtual_row_count = 0
+        self._width_sample_size = width_sample_size
+        self._forget_virtual_rows()
+        self.update_row_count(row_count)
+        return self
+
+    def update_row_count(self, row_count: int) -> Self:
+        """Set the number of rows of a virtual table, e.g. after rows were appended.
+
+        Rows that were already materialized are kept, so this should only be
+        used when the existing rows are unchanged. Otherwise, use
+        `refresh_row_provider`.
+
+        Args:
+            row_count: The new number of rows.
+
+        Returns:
+            The `DataTable` instance.
+        """
+        previous_count = self._virtual_row_count
+        self._virtual_row_count = row_count
+        if row_count > previous_count:
+            self._sample_column_widths(range(previous_count, row_count))
+        else:
+            self._forget_virtual_rows()
+        self.cursor_coordinate = self.cursor_coordinate
+        if previous_count == 0 and row_count and self.columns:
+            if self.show_cursor and self.cursor_type != "none":
+                self._highlight_cursor()
+        self._require_update_dimensions = True
+        self.check_idle()
+        self.refresh()
+        return self
+
+    def refresh_row_provider(self, row_count: int | None = None) -> Self:
+        """Drop the materialized rows of a virtual table, after its rows changed.
+
+        Args:
+            row_count: The new number of rows, if it changed.
+
+        Returns:
+            The `DataTable` instance.
+        """
+        if row_count is None:
+            row_count = self._virtual_row_count
+        # Measure the rows again from scratch, as their cells may have changed
+        self._virtual_row_count = 0
+        self._forget_virtual_rows()
+        self.update_row_count(row_count)
+        return self
+
+    def splice_rows(self, index: int, removed: int, inserted: int) -> Self:
+        """Tell a virtual table that rows were removed and inserted at an index.
+
+        The provider must already return the new rows. Rows materialized after the
+        change keep their cells and move with it, and so does the cursor.
+
+        Args:
+            index: The index of the first removed or inserted row.
+            removed: The number of rows that were removed at the index.
+            inserted: The number of rows that were inserted in their place.
+
+        Returns:
+            The `DataTable` instance.
+        """
+        shift = inserted - removed
+        moved_rows: dict[RowKey, int] = {}
+        for row_key in list(self._row_locations):
+            row_index = self._row_locations.get(row_key)
+            if row_index < index:
+                continue
+            del self._row_locations[row_key]
+            if row_index < index + removed:
+                del self.rows[row_key]
+                del self._data[row_key]
+            else:
+                moved_rows[row_key] = row_index + shift
+        for row_key, row_index in moved_rows.items():
+            self._row_locations[row_key] = row_index
+
+        cursor_row, cursor_column = self.cursor_coordinate
+        # The cursor is on a different row if its own row was replaced
+        cursor_replaced = (
+            index <= cursor_row < index + removed or self._virtual_row_count == 0
+        )
+        if cursor_row >= index + removed:
+            cursor_row += shift
+        self._virtual_row_count += shift
+        self._sample_column_widths(range(index, index + inserted))
+        self._update_count += 1
+        self.cursor_coordinate = Coordinate(cursor_row, cursor_column)
+        if cursor_replaced and self.show_cursor and self.cursor_type != "none":
+            self._highlight_cursor()
+        self._require_update_dimensions = True
+        self.check_idle()
+        self.refresh()
+        return self
+
+    def _forget_virtual_rows(self) -> None:
+        self._data.clear()
+        self.rows.clear()
+        self._row_locations = TwoWayDict({})
+        self._update_count += 1
+
+    def _get_row_key(self, row_index: int) -> RowKey | None:
+        """The key of the row at an index, materializing it if the table is virtual."""
+        row_key = self._row_locations.get_key(row_index)
+        if row_key is None and self._row_provider is not None:
+            if 0 <= row_index < self._virtual_row_count:
+                row_key = self._materialize_row(row_index)
+        return row_key
+
+    def _get_row_metadata(self, row_index: int) -> Row:
+        row_key = self._get_row_key(row_index)
+        if row_key is None:
+            raise RowDoesNotExist(f"Row index {row_index!r} is not valid.")
+        return self.rows[row_key]
+
+    def _get_row_y(self, row_index: int) -> int:
+        """The y-coordinate of the top of a row, below the header."""
+        if self._row_provider is not None:
+            return row_index
+        return sum(ordered_row.height for ordered_row in self.ordered_rows[:row_index])
+
+    def _materialize_row(self, row_index: int) -> RowKey:
+        """Store the virtual row at an index like a row added with `add_row`."""
+        cells, key, style_name = self._row_provider(row_index)
+        row_key = RowKey(key)
+        if row_key in self._row_locations:
+            # The row is now at another index: the provider's rows have moved
+            del self._row_locations[row_key]
+        self._row_locations[row_key] = row_index
+        self._data[row_key] = {
+            column.key: cell
+            for column, cell in zip_longest(self.ordered_columns, cells)
+        }
+        self.rows[row_key] = Row(row_key, 1, None, False, style_name)
+        return row_key
+
+    def _trim_virtual_rows(self) -> None:
+        """Drop the materialized rows that are out of view, but for the cursor row."""
+        scroll_y = int(self.scroll_y)
+        first = scroll_y - self.VIRTUAL_OVERSCAN
+        last = scroll_y + self.size.height + self.VIRTUAL_OVERSCAN
+        if len(self.rows) <= (last - first) + 1:
+            return
+        cursor_row = self.cursor_row
+        for row_key in list(self._row_locations):
+            row_index = self._row_locations.get(row_key)
+            if not first <= row_index < last and row_index != cursor_row:
+                del self._row_locations[row_key]
+                del self.rows[row_key]
+                del self._data[row_key]
+
+    def _sample_column_widths(self, row_indices: range) -> None:
+        """Widen auto-width columns to fit a sample of the given virtual rows."""
+        if not row_indices:
+            return
+        console = self.app.console
+        step = max(1, len(row_indices) // self._width_sample_size)
+        columns = self.ordered_columns
+        widened = False
+        for row_index in row_indices[::step]:
+            cells, _, _ = self._row_provider(row_index)
+            for column, cell in zip(columns, cells):
+                if cell is None or not column.auto_width:
+                    continue
+                width = measure(console, default_cell_formatter(cell), 1)
+                if width > column.content_width:
+                    column.content_width = width
+                    widened = True
+        if widened:
+            self._update_count += 1
+
     def remove_row(self, row_key: RowKey | str) -> None:
         """Remove a row (identified by a key) from the DataTable.
 
@@ -1901,7 +2126,7 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
         Returns:
             True if the row index is within the bounds of the table.
         """
-        return 0 <= row_index < len(self.rows)
+        return 0 <= row_index < self.row_count
 
     def is_valid_column_index(self, column_index: int) -> bool:
         """Return a boolean indicating whether the column_index is within table bounds.
@@ -1947,12 +2172,10 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
         if cache_key in self._ordered_row_cache:
             ordered_rows = self._ordered_row_cache[cache_key]
         else:
-            row_indices = range(num_rows)
-            ordered_rows = []
-            for row_index in row_indices:
-                row_key = self._row_locations.get_key(row_index)
-                row = self.rows[row_key]
-                ordered_rows.append(row)
+            # Rows of a virtual table are materialized on the way
+            ordered_rows = [
+                self._get_row_metadata(row_index) for row_index in range(num_rows)
+            ]
             self._ordered_row_cache[cache_key] = ordered_rows
         return ordered_rows
 
@@ -1980,7 +2203,7 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
             return RowRenderables(None, header_row)
 
         ordered_row = self.get_row_at(row_index)
-        row_key = self._row_locations.get_key(row_index)
+        row_key = self._get_row_key(row_index)
         if row_key is None:
             return RowRenderables(None, [])
         row_metadata = self.rows.get(row_key)
@@ -2048,7 +2271,7 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
         if is_header_cell:
             row_key = self._header_row_key
         else:
-            row_key = self._row_locations.get_key(row_index)
+            row_key = self._get_row_key(row_index)
 
         column_key = self._column_locations.get_key(column_index)
         cell_cache_key: CellCacheKey = (
@@ -2314,11 +2537,16 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
             Row key and line (y) offset within cell.
         """
         header_height = self.header_height
-        y_offsets = self._y_offsets
         if self.show_header:
             if y < header_height:
                 return self._header_row_key, y
             y -= header_height
+        if self._row_provider is not None:
+            # Virtual rows are a line high, so the line is the row index
+            if y >= self._virtual_row_count:
+                raise LookupError("Y coord {y!r} is greater than total height")
+            return self._get_row_key(y), 0
+        y_offsets = self._y_offsets
         if y > len(y_offsets):
             raise LookupError("Y coord {y!r} is greater than total height")
 
@@ -2384,19 +2612,17 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
 
     def render_lines(self, crop: Region) -> list[Strip]:
         self._pseudo_class_state = self.get_pseudo_class_state()
+        if self._row_provider is not None:
+            self._trim_virtual_rows()
         return super().render_lines(crop)
 
     def render_line(self, y: int) -> Strip:
         width, height = self.size
         scroll_x, scroll_y = self.scroll_offset
 
-        fixed_row_keys: list[RowKey] = [
-            self._row_locations.get_key(row_index)
-            for row_index in range(self.fixed_rows)
-        ]
-
         fixed_rows_height = sum(
-            self.get_row_height(row_key) for row_key in fixed_row_keys
+            self._get_row_metadata(row_index).height
+            for row_index in range(min(self.fixed_rows, self.row_count))
         )
         if self.show_header:
             fixed_rows_height += self.get_row_height(self._header_row_key)
@@ -2455,7 +2681,7 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
         else:
             # Get the row metadata
             try:
-                row = self.ordered_rows[row_index]
+                row = self._get_row_metadata(row_index)
                 if row.style_name is not None:
                     # Apply custom style if specified
                     row_style = self.get_component_styles(
@@ -2471,7 +2697,7 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
                     ).rich_style
                 else:
                     row_style = base_style
-            except IndexError:
+            except (IndexError, RowDoesNotExist):
                 row_style = base_style
 
         return row_style
@@ -2499,7 +2725,10 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
         that is occupied by fixed rows and columns respectively. Fixed rows and columns
         are rows and columns that do not participate in scrolling."""
         top = self.header_height if self.show_header else 0
-        top += sum(row.height for row in self.ordered_rows[: self.fixed_rows])
+        top += sum(
+            self._get_row_metadata(row_index).height
+            for row_index in range(min(self.fixed_rows, self.row_count))
+        )
         left = (
             sum(
                 column.get_render_width(self)
@@ -2604,7 +2833,7 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
             )
             self.post_message(message)
         elif is_row_label_click:
-            row = self.ordered_rows[row_index]
+            row = self._get_row_metadata(row_index)
             message = DataTable.RowLabelSelected(
                 self, row.key, row_index, label=row.label
             )
@@ -2628,8 +2857,8 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
             offset = 0
             rows_to_scroll = 0
             row_index, _ = self.cursor_coordinate
-            for ordered_row in self.ordered_rows[row_index:]:
-                offset += ordered_row.height
+            for index in range(row_index, self.row_count):
+                offset += self._get_row_metadata(index).height
                 rows_to_scroll += 1
                 if offset > height:
                     break
@@ -2652,8 +2881,8 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
             offset = 0
             rows_to_scroll = 0
             row_index, _ = self.cursor_coordinate
-            for ordered_row in self.ordered_rows[: row_index + 1]:
-                offset += ordered_row.height
+            for index in range(row_index + 1):
+                offset += self._get_row_metadata(index).height
                 rows_to_scroll += 1
                 if offset > height:
                     break
@@ -2767,7 +2996,7 @@ class DataTable(ScrollView, Generic[CellType], can_focus=True):
         """Post the appropriate message for a selection based on the `cursor_type`."""
         cursor_coordinate = self.cursor_coordinate
         cursor_type = self.cursor_type
-        if len(self._data) == 0:
+        if self.row_count == 0:
             return
         cell_key = self.coordinate_to_cell_key(cursor_coordinate)
         if cursor_type == "cell":
@@ -0,0 +1,126 @@
+"""Loads the data of a page's modules off the event loop.
+
+A module taking part splits its rebuild in two halves:
+
+- `get_queries()` runs on the event loop and returns the reads the module
+  needs, as a dict of name to zero-argument callable. The callables capture
+  the current filters, so they can run in any thread.
+- `apply_data(data)` runs on the event loop with the dict of name to result,
+  and updates the widgets.
+
+`ModuleLoader.load` runs the queries of several modules concurrently in a
+thread pool, from a Textual worker, and applies each module's results once
+they are all in. Every load, and every synchronous `rebuild`, bumps the
+module's generation, so results overtaken by a newer rebuild are dropped
+instead of shown.
+
+Modules of one load that make the same cached read share a single query,
+and the SQL statements each load issued are logged.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Callable
+
+from textual.widget import Widget
+
+from bagels.managers.cache import QueryStats, track_queries
+
+# sqlite serializes writers, not readers, so a few threads are plenty
+MAX_QUERY_THREADS = 4
+
+_executor = ThreadPoolExecutor(
+    max_workers=MAX_QUERY_THREADS, thread_name_prefix="bagels-query"
+)
+
+
+def run_queries(queries: dict[str, Callable]) -> dict:
+    """Runs queries concurrently and returns their results by name."""
+    if len(queries) <= 1:
+        return {name: query() for name, query in queries.items()}
+    # each query runs in a copy of the context, so that `track_queries` counts it
+    futures = {
+        name: _executor.submit(copy_context().run, query)
+        for name, query in queries.items()
+    }
+    return {name: future.result() for name, future in futures.items()}
+
+
+class LoadedModule:
+    """Mixin of modules whose data is loaded by a `ModuleLoader`.
+
+    Modules override the `get_queries` and `apply_data` hooks. This is not an
+    ABC, as Textual widgets have a metaclass of their own.
+    """
+
+    _load_generation = 0
+
+    def get_queries(self) -> dict[str, Callable]:
+        """Hook returning the reads of the module. None by default."""
+        return {}
+
+    def apply_data(self, data: dict) -> None:
+        """Hook updating the widgets with the results of `get_queries`.
+
+        Does nothing by default.
+        """
+
+    def start_load(self) -> int:
+        """Supersedes the loads in progress, and returns the new load's generation."""
+        self._load_generation += 1
+        return self._load_generation
+
+    def is_current_load(self, generation: int) -> bool:
+        return generation == self._load_generation
+
+    def rebuild(self) -> None:
+        """Loads the data and updates the widgets, blocking until done."""
+        self.start_load()
+        self.apply_data(run_queries(self.get_queries()))
+
+
+class ModuleLoader:
+    def __init__(self, page: Widget, name: str):
+        self.page = page
+        self.group = f"{name}-loader"
+        self.last_stats: QueryStats | None = None
+
+    def load(self, modules: list[LoadedModule]) -> None:
+        """Rebuilds the modules in the background, superseding earlier loads."""
+        pending = []
+        for module in modules:
+            pending.append((module, module.start_load(), module.get_queries()))
+        # not exclusive: an overtaken load may still carry the only results of
+        # modules the newer one does not rebuild
+        self.page.run_worker(lambda: self._run(pending), thread=True, group=self.group)
+
+    def _run(self, pending: list) -> None:
+        queries = {
+            (index, name): query
+            for index, (_, _, module_queries) in enumerate(pending)
+            for name, query in module_queries.items()
+        }
+        started = time.perf_counter()
+        with track_queries() as stats:
+            results = run_queries(queries)
+        elapsed = time.perf_counter() - started
+        loaded = [
+            (
+                module,
+                generation,
+                {name: results[index, name] for name in module_queries},
+            )
+            for index, (module, generation, module_queries) in enumerate(pending)
+        ]
+        self.page.app.call_from_thread(self._apply, loaded, stats, elapsed)
+
+    def _apply(self, loaded: list, stats: QueryStats, elapsed: float) -> None:
+        self.last_stats = stats
+        self.page.app.log(
+            f"{self.group}: {len(loaded)} modules loaded in {elapsed * 1000:.0f} ms, {stats}"
+        )
+        for module, generation, data in loaded:
+            # a newer load or rebuild of this module has started since
+            if module.is_current_load(generation):
+                module.apply_data(data)
@@ -5,6 +5,7 @@ from textual.containers import Container, ScrollableContainer
 from textual.widgets import Label, ListItem, ListView, Static
 
 from bagels.components.indicators import EmptyIndicator
+from bagels.components.loader import LoadedModule
 from bagels.config import CONFIG
 from bagels.forms.account_forms import AccountForm
 from bagels.managers.accounts import (
@@ -51,7 +52,7 @@ class AccountsList(ListView):
         )
 
 
-class AccountMode(ScrollableContainer):
+class AccountMode(LoadedModule, ScrollableContainer):
     BINDINGS = [
         (CONFIG.hotkeys.new, "new", "New account"),
         (CONFIG.hotkeys.delete, "delete", "Archive account"),
@@ -77,9 +78,12 @@ class AccountMode(ScrollableContainer):
     # region Builder
     # -------------- Builder ------------- #
 
-    def rebuild(self) -> None:
+    def get_queries(self) -> dict:
+        return {"accounts": get_all_accounts_with_balance}
+
+    def apply_data(self, data: dict) -> None:
         net_balance = 0
-        for account in get_all_accounts_with_balance():
+        for account in data["accounts"]:
             net_balance += account.balance
             # Update balance
             self.query_one(f"#account-{account.id}-balance").update(
@@ -1,10 +1,12 @@
+from functools import partial
+
 from textual.app import ComposeResult
 from textual.containers import Container, Horizontal
 from textual.widgets import Button, Input, Label, Static
 
+from bagels.components.loader import LoadedModule
 from bagels.config import CONFIG, write_state
 from bagels.managers.utils import (
-    dynamic_cache,
     get_income_to_use,
     get_period_figures,
     try_method_query_one,
@@ -12,7 +14,7 @@ from bagels.managers.utils import (
 from bagels.models.category import Nature
 
 
-class Budgets(Static):
+class Budgets(LoadedModule, Static):
     can_focus = True
 
     def __init__(self, page_parent, *args, **kwargs) -> None:
@@ -76,7 +78,19 @@ class Budgets(Static):
     # region Builders
     # ------------- Builders ------------- #
 
-    def rebuild(self) -> None:
+    def get_queries(self) -> dict:
+        offset = self.page_parent.offset
+        expenses = partial(
+            get_period_figures, isIncome=False, offset=offset, offset_type="month"
+        )
+        return {
+            "net_income": partial(get_income_to_use, offset),
+            "net_expenses": expenses,
+            "expenses_must": partial(expenses, nature=Nature.MUST),
+            "expenses_need": partial(expenses, nature=Nature.NEED),
+        }
+
+    def apply_data(self, data: dict) -> None:
         self.savings_assess_metric = CONFIG.state.budgeting.savings_assess_metric
         try_method_query_one(self, "#savings-row > .selected", "set_classes", [""])
         try_method_query_one(
@@ -109,14 +123,11 @@ class Budgets(Static):
         else:
             input.value = str(CONFIG.state.budgeting.wants_spending_amount)
             input.restrict = restrict_amount
-        self._rebuild_income_bar()
+        self._rebuild_income_bar(data)
 
-    def _rebuild_income_bar(self) -> None:
-        offset = self.page_parent.offset
-        net_income = dynamic_cache(get_income_to_use, offset)
-        net_expenses = dynamic_cache(
-            get_period_figures, isIncome=False, offset=offset, offset_type="month"
-        )
+    def _rebuild_income_bar(self, data: dict) -> None:
+        net_income = data["net_income"]
+        net_expenses = data["net_expenses"]
         amount_to_save = round(
             net_income * CONFIG.state.budgeting.savings_percentage
             if self.savings_assess_metric.startswith("percentage")
@@ -130,26 +141,8 @@ class Budgets(Static):
             else CONFIG.state.budgeting.wants_spending_amount,
             CONFIG.defaults.round_decimals,
         )
-        expenses_must = round(
-            dynamic_cache(
-                get_period_figures,
-                isIncome=False,
-                offset=offset,
-                offset_type="month",
-                nature=Nature.MUST,
-            ),
-            CONFIG.defaults.round_decimals,
-        )
-        expenses_need = round(
-            dynamic_cache(
-                get_period_figures,
-                isIncome=False,
-                offset=offset,
-                offset_type="month",
-                nature=Nature.NEED,
-            ),
-            CONFIG.defaults.round_decimals,
-        )
+        expenses_must = round(data["expenses_must"], CONFIG.defaults.round_decimals)
+        expenses_need = round(data["expenses_need"], CONFIG.defaults.round_decimals)
         expenses_want = round(
             net_expenses - expenses_must - expenses_need,
             CONFIG.defaults.round_decimals,
@@ -3,6 +3,7 @@ from textual.binding import Binding
 from textual.widgets import Static
 
 from bagels.components.datatable import DataTable
+from bagels.components.loader import LoadedModule
 from bagels.config import CONFIG
 from bagels.forms.category_form import CategoryForm
 from bagels.managers.categories import (
@@ -16,7 +17,7 @@ from bagels.modals.confirmation import ConfirmationModal
 from bagels.modals.input import InputModal
 
 
-class Categories(Static):
+class Categories(LoadedModule, Static):
     can_focus = True
 
     COLUMNS = ("", "Name", "Nature")
@@ -56,7 +57,10 @@ class Categories(Static):
     # region Builders
     # ------------- Builders ------------- #
 
-    def rebuild(self) -> None:
+    def get_queries(self) -> dict:
+        return {"categories": get_all_categories_tree}
+
+    def apply_data(self, data: dict) -> None:
         table: DataTable = self.query_one("#categories-table")
         # empty_indicator: Static = self.query_one(".empty-indicator")
 
@@ -64,7 +68,7 @@ class Categories(Static):
         if not table.columns:
             table.add_columns(*self.COLUMNS)
 
-        categories = get_all_categories_tree()
+        categories = data["categories"]
         if categories:
             for category, node, depth in categories:
                 char = " "
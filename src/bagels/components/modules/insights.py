@@ -1,7 +1,10 @@
+from functools import partial
+
 from textual.app import ComposeResult
 from textual.containers import Container, Horizontal
 from textual.widgets import Label, Static
 
+from bagels.components.loader import LoadedModule
 from bagels.components.percentage_bar import PercentageBar, PercentageBarItem
 from bagels.config import CONFIG
 from bagels.managers.categories import get_all_categories_records
@@ -11,7 +14,7 @@ from bagels.managers.utils import (
 )
 
 
-class Insights(Static):
+class Insights(LoadedModule, Static):
     can_focus = True
 
     def __init__(self, parent: Static, *args, **kwargs) -> None:
@@ -28,16 +31,41 @@ class Insights(Static):
     # region Builder
     # -------------- Builder ------------- #
 
-    def rebuild(self) -> None:
+    def get_queries(self) -> dict:
+        offset = self.page_parent.filter["offset"]
+        offset_type = self.page_parent.filter["offset_type"]
+        is_income = self.page_parent.mode["isIncome"]
+        account_id = None
+        if self.page_parent.filter["byAccount"]:
+            account_id = self.page_parent.mode["accountId"]["default_value"]
+        return {
+            "period_net": partial(
+                get_period_figures,
+                offset=offset,
+                offset_type=offset_type,
+                accountId=account_id,
+                isIncome=is_income,
+            ),
+            "category_records": partial(
+                get_all_categories_records,
+                offset=offset,
+                offset_type=offset_type,
+                is_income=is_income,
+                account_id=account_id,
+            ),
+        }
+
+    def apply_data(self, data: dict) -> None:
         self.use_account = self.page_parent.filter["byAccount"]
-        period_net = self._update_labels()
-        items = self.get_percentage_bar_items(period_net)
+        period_net = data["period_net"]
+        self._update_labels(period_net)
+        items = self.get_percentage_bar_items(data["category_records"], period_net)
         self.percentage_bar.set_total(period_net, False)
         self.percentage_bar.set_items(items)
         # data = self.get_period_barchart_data()
         # self.period_barchart.set_data(data)
 
-    def _update_labels(self) -> None:
+    def _update_labels(self, period_net) -> None:
         current_filter_label = self.query_one(".current-filter-label")
         period_net_label = self.query_one(".period-net")
         period_average_label = self.query_one(".period-average")
@@ -56,21 +84,6 @@ class Insights(Static):
             )
         average_label.update(f"{label} per day")
 
-        if self.use_account:
-            params = {
-                "offset": self.page_parent.filter["offset"],
-                "offset_type": self.page_parent.filter["offset_type"],
-                "accountId": self.page_parent.mode["accountId"]["default_value"],
-                "isIncome": mode_isIncome,
-            }
-        else:
-            params = {
-                "offset": self.page_parent.filter["offset"],
-                "offset_type": self.page_parent.filter["offset_type"],
-                "isIncome": mode_isIncome,
-            }
-
-        period_net = get_period_figures(**params)
         period_average = get_period_average(
             period_net,
             offset=self.page_parent.filter["offset"],
@@ -79,26 +92,11 @@ class Insights(Static):
         period_net_label.update(str(period_net))
         period_average_label.update(str(period_average))
 
-        return period_net
-
     def get_percentage_bar_items(
-        self, period_net=1, limit: int = 5
+        self, category_records, period_net=1, limit: int = 5
     ) -> list[PercentageBarItem]:
         if period_net == 0:
             return []
-        if self.use_account:
-            category_records = get_all_categories_records(
-                offset=self.page_parent.filter["offset"],
-                offset_type=self.page_parent.filter["offset_type"],
-                is_income=self.page_parent.mode["isIncome"],
-                account_id=self.page_parent.mode["accountId"]["default_value"],
-            )
-        else:
-            category_records = get_all_categories_records(
-                offset=self.page_parent.filter["offset"],
-                offset_type=self.page_parent.filter["offset_type"],
-                is_income=self.page_parent.mode["isIncome"],
-            )
 
         # Sort categories by percentage in descending order
         items = []
@@ -4,6 +4,7 @@ from textual.widgets import Static
 
 from bagels.components.datatable import DataTable
 from bagels.components.indicators import EmptyIndicator
+from bagels.components.loader import LoadedModule
 from bagels.config import CONFIG
 from bagels.forms.person_forms import PersonForm
 from bagels.managers.persons import (
@@ -15,7 +16,7 @@ from bagels.modals.confirmation import ConfirmationModal
 from bagels.modals.input import InputModal
 
 
-class People(Static):
+class People(LoadedModule, Static):
     COLUMNS = ("Name", "Net due")
 
     BINDINGS = [
@@ -44,7 +45,10 @@ class People(Static):
     # region Builders
     # ------------- Builders ------------- #
 
-    def rebuild(self) -> None:
+    def get_queries(self) -> dict:
+        return {"people": get_persons_with_net_due}
+
+    def apply_data(self, data: dict) -> None:
         table: DataTable = self.query_one("#people-table")
         empty_indicator: Static = self.query_one(".empty-indicator")
 
@@ -52,7 +56,7 @@ class People(Static):
         if not table.columns:
             table.add_columns(*self.COLUMNS)
 
-        people = get_persons_with_net_due()
+        people = data["people"]
         if people:
             for person in people:
                 table.add_row(person.name, person.due, key=person.id)
@@ -1,26 +1,33 @@
 from typing import ClassVar
 
+from textual import work
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.containers import Container
 from textual.events import DescendantBlur, DescendantFocus
 from textual.reactive import reactive
 from textual.widgets import Button, Input, Static, Switch
+from textual.worker import get_current_worker
 
 from bagels.components.datatable import DataTable
 from bagels.components.indicators import EmptyIndicator
+from bagels.components.loader import LoadedModule
 from bagels.components.modules.records._cud import RecordCUD
 from bagels.components.modules.records._table_builder import RecordTableBuilder
 from bagels.config import CONFIG
 from bagels.forms.person_forms import PersonForm
 
 
+# seconds without typing before the filters are applied
+FILTER_DEBOUNCE = 0.25
+
+
 class DisplayMode:
     DATE = "d"
     PERSON = "p"
 
 
-class Records(RecordCUD, RecordTableBuilder, Static):
+class Records(RecordCUD, RecordTableBuilder, LoadedModule, Static):
     DEFAULT_CSS = """\
 Records .label-highlight-match {
     color: $accent-lighten-2;
@@ -69,15 +76,18 @@ Records .label-highlight-match {
         super().__setattr__("border_title", "Records")
         self.page_parent = parent
         self.person_form = PersonForm()
+        self._filter_timer = None
         self.FILTERS = {
             "category": lambda: self.query_one("#filter-category").value,
             "amount": lambda: self.query_one("#filter-amount").value,
             "label": lambda: self.query_one("#filter-label").value,
             "enabled": lambda: self.query_one("#toggle-filter").value,
+            "all_periods": lambda: self.query_one("#toggle-all-periods").value,
         }
 
     def on_mount(self) -> None:
         self.rebuild()
+        self.watch(self.table, "scroll_y", self._on_table_scroll, init=False)
 
     # region Callbacks
     # ------------- Callbacks ------------ #
@@ -90,6 +100,11 @@ Records .label-highlight-match {
         else:
             self.current_row = None
             self.current_row_index = None
+        self.load_more_records(current_row_index)
+
+    def _on_table_scroll(self, scroll_y: float) -> None:
+        # rows are a line high, so the last visible row is about this far down
+        self.load_more_records(int(scroll_y) + self.table.size.height)
 
     def watch_displayMode(self, displayMode: DisplayMode) -> None:
         self.query_one("#display-date").classes = (
@@ -126,10 +141,37 @@ Records .label-highlight-match {
 
     def on_input_changed(self, event: Input.Changed) -> None:
         if self.FILTERS["enabled"]():
-            self.rebuild(focus=False)
+            # wait for a pause in typing, rather than querying on every key
+            if self._filter_timer is not None:
+                self._filter_timer.stop()
+            self._filter_timer = self.set_timer(FILTER_DEBOUNCE, self._start_filtering)
+
+    def _start_filtering(self) -> None:
+        self._filter_timer = None
+        self._fetch_filtered(
+            self.start_load(),
+            self._get_view(),
+            self.displayMode,
+            self._get_record_params(),
+        )
+
+    @work(thread=True, exclusive=True, group="records-filter")
+    def _fetch_filtered(
+        self, generation: int, view: tuple, display_mode: str, params: dict
+    ) -> None:
+        # exclusive: starting a newer filter cancels this one
+        prefetched = self._fetch_view_records(display_mode, params)
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self._show_filtered, generation, view, prefetched)
+
+    def _show_filtered(self, generation: int, view: tuple, prefetched: list) -> None:
+        # drop results of a superseded filter, or of a view that has since changed
+        if not self.is_current_load(generation) or view != self._get_view():
+            return
+        self.apply_data({"first_page": prefetched})
 
     def on_switch_changed(self, event: Switch.Changed) -> None:
-        self.rebuild(focus=False)
+        self.rebuild()
 
     def on_descendant_focus(self, event: DescendantFocus) -> None:
         if event.widget.id.startswith("filter-"):
@@ -160,7 +202,12 @@ Records .label-highlight-match {
                     restrict=r"^(>=|>|=|<=|<)?\d*\.?\d*$",
                 )
                 yield Input(id="filter-label", placeholder="Filter label")
-                yield Switch(id="toggle-filter", animate=False)
+                yield Switch(id="toggle-filter", animate=False, tooltip="Filter")
+                yield Switch(
+                    id="toggle-all-periods",
+                    animate=False,
+                    tooltip="Search all periods",
+                )
         self.table = DataTable(
             id="records-table",
             cursor_type="row",
@@ -16,6 +16,7 @@ from bagels.managers.records import (
     update_record_and_splits,
 )
 from bagels.managers.splits import get_split_by_id, update_split
+from bagels.managers.utils import unit_of_work
 from bagels.modals.confirmation import ConfirmationModal
 from bagels.modals.input import InputModal
 from bagels.modals.record import RecordModal
@@ -28,9 +29,13 @@ class RecordCUD:
         def check_result(result) -> None:
             if result:
                 try:
-                    create_record_and_splits(result["record"], result["splits"])
-                    if result["createTemplate"]:
-                        create_template_from_record(result["record"])
+                    # the record, its splits and its template, or none of them
+                    with unit_of_work() as session:
+                        create_record_and_splits(
+                            result["record"], result["splits"], session
+                        )
+                        if result["createTemplate"]:
+                            create_template_from_record(result["record"], session)
                 except Exception as e:
                     self.app.notify(
                         title="Error", message=f"{e}", severity="error", timeout=10
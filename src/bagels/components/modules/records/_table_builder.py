@@ -1,19 +1,27 @@
 from datetime import timedelta
+from functools import partial
+from itertools import chain
 
 from rich.text import Text
+from textual.coordinate import Coordinate
 
-from bagels.components.datatable import DataTable
+from bagels.components.datatable import DataTable, VirtualRow
 from bagels.components.indicators import EmptyIndicator
 from bagels.config import CONFIG
 from bagels.managers.persons import (
     get_persons_with_splits,
 )
 from bagels.managers.records import (
-    get_record_total_split_amount,
+    get_record_page_key,
     get_records,
 )
 from bagels.utils.format import format_date_to_readable
 
+# Records are loaded in pages of this many, the next page being fetched once the
+# cursor or scroll position is within LOAD_AHEAD_ROWS rows of the end
+RECORDS_PAGE_SIZE = 200
+LOAD_AHEAD_ROWS = 50
+
 
 class DisplayMode:
     DATE = "d"
@@ -21,33 +29,185 @@ class DisplayMode:
 
 
 class RecordTableBuilder:
-    def rebuild(self, focus=True) -> None:
+    def get_queries(self) -> dict:
+        if not hasattr(self, "table"):
+            return {}
+        params = self._get_record_params()
+        if self._can_update_rows():
+            until = self._page_after if self._has_more_records else None
+            return {
+                "changed_rows": partial(
+                    self._fetch_view_records, self.displayMode, params, None, until
+                )
+            }
+        return {
+            "first_page": partial(self._fetch_view_records, self.displayMode, params)
+        }
+
+    def apply_data(self, data: dict) -> None:
         if not hasattr(self, "table"):
             return
+        if "changed_rows" in data:
+            # Same period, filters and layout: only the records changed
+            self._update_rows(self.table, data["changed_rows"])
+        else:
+            self._built_view = self._get_view()
+            self._build_rows(self.table, data["first_page"])
+        self._show_table()
+
+    def _can_update_rows(self) -> bool:
+        return self.table.is_virtual and self._get_view() == getattr(
+            self, "_built_view", None
+        )
+
+    def _show_table(self) -> None:
         table = self.table
         empty_indicator: EmptyIndicator = self.query_one(".empty-indicator")
+        empty_indicator.display = not table.row_count
+        table.display = not not table.row_count
+        # leave the focus in the filters while they are being edited
+        if not self.query_one("#filter-container").has_focus_within:
+            if table.display:
+                table.focus()
+            else:
+                self.focus()
+
+    def _get_view(self) -> tuple:
+        """What the rows are built from, besides the records themselves."""
+        filters = (
+            (
+                self.FILTERS["category"](),
+                self.FILTERS["amount"](),
+                self.FILTERS["label"](),
+                self.FILTERS["all_periods"](),
+            )
+            if self.FILTERS["enabled"]()
+            else None
+        )
+        return (
+            self.displayMode,
+            self.show_splits,
+            self.page_parent.filter["offset"],
+            self.page_parent.filter["offset_type"],
+            self.page_parent.filter["byAccount"]
+            and self.page_parent.mode["accountId"]["default_value"],
+            filters,
+        )
+
+    def _build_rows(self, table: DataTable, prefetched: list = None) -> None:
         self._initialize_table(table)
-        records = self._fetch_records()
+        self._fill_rows(prefetched=prefetched)
+        match self.displayMode:
+            case DisplayMode.DATE:
+                # keep the cursor where it was, even if that is past the first page
+                current_row_index = getattr(self, "current_row_index", None) or 0
+                while self._has_more_records and (
+                    len(self._table_rows) <= current_row_index + LOAD_AHEAD_ROWS
+                ):
+                    self._load_next_page()
+        # the table draws its rows from this list, and only those in view
+        table.set_row_provider(
+            len(self._table_rows), lambda row_index: self._table_rows[row_index]
+        )
+
+        if hasattr(self, "current_row_index"):
+            table.move_cursor(row=self.current_row_index)
 
+    def _update_rows(self, table: DataTable, prefetched: list = None) -> None:
+        """Rebuilds the rows and applies only the differences to the table.
+
+        Args:
+            table (DataTable): The records table.
+            prefetched (list, optional): The records up to the last one loaded, or the persons in person view, already fetched.
+        """
+        old_rows = self._table_rows
+        has_more_records = self._has_more_records
+        # reload the records up to the last one loaded, or all of them if the
+        # period was fully loaded, so that rows past the edit keep their index
+        until = self._page_after if has_more_records else None
+        self._fill_rows(limit=None, until=until, prefetched=prefetched)
+        self._has_more_records = has_more_records
+        self._apply_row_diff(table, old_rows, self._table_rows)
+
+    def _fill_rows(
+        self,
+        limit: int | None = RECORDS_PAGE_SIZE,
+        until: tuple = None,
+        prefetched: list = None,
+    ) -> None:
+        self._table_rows = []
+        self._has_more_records = False
         match self.displayMode:
             case DisplayMode.PERSON:
-                self._build_person_view(table, records)
+                self._build_person_view(self._table_rows, prefetched)
             case DisplayMode.DATE:
-                self._build_date_view(table, records)
+                self._page_after = None
+                self._prev_group = None
+                self._load_next_page(limit, until, prefetched)
             case _:
                 pass
 
-        if hasattr(self, "current_row_index"):
-            table.move_cursor(row=self.current_row_index)
-        empty_indicator.display = not table.rows
-        table.display = not not table.rows
-        if focus:
-            if table.display:
-                table.focus()
-            else:
-                self.focus()
+    def _apply_row_diff(
+        self, table: DataTable, old_rows: list[VirtualRow], new_rows: list[VirtualRow]
+    ) -> None:
+        """Turns the table's old_rows into new_rows, matching rows by key.
+
+        Rows before the first and after the last changed key stay in place, with
+        only their changed cells updated. The block in between is spliced.
+        """
+        shared = min(len(old_rows), len(new_rows))
+        start = 0
+        while start < shared and old_rows[start].key == new_rows[start].key:
+            start += 1
+        end = 0
+        while end < shared - start and old_rows[-1 - end].key == new_rows[-1 - end].key:
+            end += 1
+
+        removed = len(old_rows) - end - start
+        inserted = len(new_rows) - end - start
+        if removed or inserted:
+            table.splice_rows(start, removed, inserted)
+
+        shift = len(new_rows) - len(old_rows)
+        for old_index in chain(range(start), range(len(old_rows) - end, len(old_rows))):
+            new_index = old_index + shift if old_index >= start else old_index
+            old_row, new_row = old_rows[old_index], new_rows[new_index]
+            if old_row == new_row:
+                continue
+            if old_row.style_name != new_row.style_name:
+                table.splice_rows(new_index, 1, 1)
+                continue
+            for column_index, (old_cell, new_cell) in enumerate(
+                zip(old_row.cells, new_row.cells)
+            ):
+                if old_cell != new_cell:
+                    table.update_cell_at(Coordinate(new_index, column_index), new_cell)
+
+    def load_more_records(self, row_index: int) -> None:
+        """Loads the next page of records if row_index is close to the last row."""
+        if not getattr(self, "_has_more_records", False):
+            return
+        if row_index >= len(self._table_rows) - LOAD_AHEAD_ROWS:
+            self._load_next_page()
+            self.table.update_row_count(len(self._table_rows))
+
+    def _load_next_page(
+        self,
+        limit: int | None = RECORDS_PAGE_SIZE,
+        until: tuple = None,
+        records: list = None,
+    ) -> None:
+        if records is None:
+            records = self._fetch_records(
+                after=self._page_after, limit=limit, until=until
+            )
+        self._has_more_records = len(records) == limit
+        if records:
+            self._page_after = get_record_page_key(records[-1])
+        self._build_date_view(self._table_rows, records)
 
-    def _fetch_records(self):
+    def _get_record_params(self) -> dict:
+        """The period, account and filters of the records to show."""
         params = {
             "offset": self.page_parent.filter["offset"],
             "offset_type": self.page_parent.filter["offset_type"],
@@ -58,10 +218,37 @@ class RecordTableBuilder:
             params["category_piped_names"] = self.FILTERS["category"]()
             params["operator_amount"] = self.FILTERS["amount"]()
             params["label"] = self.FILTERS["label"]()
+            if self.FILTERS["all_periods"]():
+                # search every record, paged like a period
+                params["all_periods"] = True
+        return params
+
+    def _fetch_records(
+        self,
+        after: tuple = None,
+        limit: int | None = RECORDS_PAGE_SIZE,
+        until: tuple = None,
+    ):
         return get_records(
-            **params,
+            **self._get_record_params(), limit=limit, after=after, until=until
         )
 
+    @staticmethod
+    def _fetch_view_records(
+        display_mode: str,
+        params: dict,
+        limit: int | None = RECORDS_PAGE_SIZE,
+        until: tuple = None,
+    ) -> list:
+        """Fetches what the row builders take as `prefetched`. Safe to call from a thread."""
+        match display_mode:
+            case DisplayMode.PERSON:
+                return get_persons_with_splits(
+                    **{k: v for k, v in params.items() if k != "account_id"}
+                )
+            case _:
+                return get_records(**params, limit=limit, until=until)
+
     def _initialize_table(self, table: DataTable) -> None:
         table.clear()
         table.columns.clear()
@@ -91,8 +278,16 @@ class RecordTableBuilder:
         return text
 
     # region Date view
-    def _build_date_view(self, table: DataTable, records: list) -> None:
-        prev_group = None
+    def _build_date_view(self, rows: list[VirtualRow], records: list) -> None:
+        # the previous group carries over from the last page, so that a group
+        # spanning a page boundary gets a single header
+        prev_group = self._prev_group
+        # records of all periods are grouped by month, like those of a year
+        group_by = (
+            "year"
+            if self.FILTERS["enabled"]() and self.FILTERS["all_periods"]()
+            else self.page_parent.filter["offset_type"]
+        )
         for record in records:
             flow_icon = self._get_flow_icon(len(record.splits) > 0, record.isIncome)
 
@@ -105,7 +300,7 @@ class RecordTableBuilder:
 
             # Add group header based on filter type
             group_string = None
-            match self.page_parent.filter["offset_type"]:
+            match group_by:
                 case "year":
                     # Group by month
                     group_string = record.date.strftime("%B %Y")
@@ -136,21 +331,21 @@ class RecordTableBuilder:
 
             if group_string and prev_group != group_string:
                 prev_group = group_string
-                self._add_group_header_row(table, group_string)
+                self._add_group_header_row(rows, group_string)
 
             # Add main record row
-            table.add_row(
-                " ",
-                category_string,
-                amount_string,
-                label_string,
-                account_string,
-                key=f"r-{str(record.id)}",
+            rows.append(
+                VirtualRow(
+                    (" ", category_string, amount_string, label_string, account_string),
+                    key=f"r-{str(record.id)}",
+                )
             )
 
             # Add split rows if applicable
             if record.splits and self.show_splits:
-                self._add_split_rows(table, record, flow_icon)
+                self._add_split_rows(rows, record, flow_icon)
+
+        self._prev_group = prev_group
 
     def _get_flow_icon(self, recordHasSplits: bool, is_income: bool) -> str:
         if recordHasSplits and not self.show_splits:
@@ -181,9 +376,7 @@ class RecordTableBuilder:
             category_string = f"[{color_tag}]{CONFIG.symbols.category_color}[/{color_tag}] {record.category.name}"
 
             if record.splits and not self.show_splits:
-                amount_self = round(
-                    record.amount - get_record_total_split_amount(record.id), 2
-                )
+                amount_self = round(self._get_amount_self(record), 2)
                 amount_string = f"{flow_icon} {amount_self}"
             else:
                 amount_string = f"{flow_icon} {record.amount}"
@@ -192,16 +385,22 @@ class RecordTableBuilder:
 
         return category_string, amount_string, account_string
 
+    @staticmethod
+    def _get_amount_self(record) -> float:
+        # the splits are loaded with the records, so this issues no query
+        return record.amount - sum(split.amount for split in record.splits)
+
     def _add_group_header_row(
-        self, table: DataTable, string: str, key: str = None
+        self, rows: list[VirtualRow], string: str, key: str = None
     ) -> None:
-        table.add_row("//", string, "", "", "", style_name="group-header", key=key)
+        rows.append(
+            VirtualRow(("//", string, "", "", ""), key=key, style_name="group-header")
+        )
 
-    def _add_split_rows(self, table: DataTable, record, flow_icon: str) -> None:
+    def _add_split_rows(self, rows: list[VirtualRow], record, flow_icon: str) -> None:
         color = record.category.color.lower()
         amount_self = round(
-            record.amount - get_record_total_split_amount(record.id),
-            CONFIG.defaults.round_decimals,
+            self._get_amount_self(record), CONFIG.defaults.round_decimals
         )
         split_flow_icon = (
             f"[red]{CONFIG.symbols.amount_negative}[/red]"
@@ -219,23 +418,25 @@ class RecordTableBuilder:
                 else Text("-")
             )
 
-            table.add_row(
-                " ",
-                f"{line_char} {paid_status_icon} {split.person.name}",
-                f"{split_flow_icon} {split.amount}",
-                date_string,
-                split.account.name if split.account else "-",
-                key=f"s-{str(split.id)}",
+            rows.append(
+                VirtualRow(
+                    (
+                        " ",
+                        f"{line_char} {paid_status_icon} {split.person.name}",
+                        f"{split_flow_icon} {split.amount}",
+                        date_string,
+                        split.account.name if split.account else "-",
+                    ),
+                    key=f"s-{str(split.id)}",
+                )
             )
 
         # Add net amount row
-        table.add_row(
-            "",
-            f"{finish_line_char} Self total",
-            f"= {amount_self}",
-            "",
-            "",
-            style_name="net",
+        rows.append(
+            VirtualRow(
+                ("", f"{finish_line_char} Self total", f"= {amount_self}", "", ""),
+                style_name="net",
+            )
         )
 
     def _get_split_status_icon(self, split) -> str:
@@ -246,27 +447,17 @@ class RecordTableBuilder:
 
     # region Person view
 
-    def _fetch_person_records(self) -> list:
-        params = {
-            "offset": self.page_parent.filter["offset"],
-            "offset_type": self.page_parent.filter["offset_type"],
-        }
-        if self.FILTERS["enabled"]():
-            params["category_piped_names"] = self.FILTERS["category"]()
-            params["operator_amount"] = self.FILTERS["amount"]()
-            params["label"] = self.FILTERS["label"]()
-        return get_persons_with_splits(**params)
-
-    def _build_person_view(self, table: DataTable, _) -> None:
-        persons = self._fetch_person_records()
+    def _build_person_view(self, rows: list[VirtualRow], persons: list = None) -> None:
+        if persons is None:
+            persons = self._fetch_view_records(
+                DisplayMode.PERSON, self._get_record_params()
+            )
 
         # Display each person and their splits
         for person in persons:
             if person.splits:  # Person has splits for this month
                 # Add person header
-                self._add_group_header_row(
-                    table, person.name, key=f"p-{str(person.id)}"
-                )
+                self._add_group_header_row(rows, person.name, key=f"p-{str(person.id)}")
 
                 # Add splits for this person
                 total_unpaid = 0  # Initialize total unpaid amount for this person
@@ -301,15 +492,19 @@ class RecordTableBuilder:
 
                     label_string = self._get_label_string(record.label)
 
-                    table.add_row(
-                        " ",
-                        f"{paid_icon} {date}",
-                        record_date,
-                        category,
-                        amount,
-                        account,
-                        label_string,
-                        key=f"s-{split.id}",
+                    rows.append(
+                        VirtualRow(
+                            (
+                                " ",
+                                f"{paid_icon} {date}",
+                                record_date,
+                                category,
+                                amount,
+                                account,
+                                label_string,
+                            ),
+                            key=f"s-{split.id}",
+                        )
                     )
 
                 # Add total row for this person showing unpaid amount. We reverse the color indicator.
@@ -319,12 +514,16 @@ class RecordTableBuilder:
                     total_display = f"[green]{abs(total_unpaid)}[/green]"
                 else:
                     total_display = f"[red]{abs(total_unpaid)}[/red]"
-                table.add_row(
-                    " ",
-                    "[bold]Total Unpaid[/bold]",
-                    "",
-                    "",
-                    f"[bold]{total_display}[/bold]",
-                    "",
-                    key=f"t-{str(person.id)}",
+                rows.append(
+                    VirtualRow(
+                        (
+                            " ",
+                            "[bold]Total Unpaid[/bold]",
+                            "",
+                            "",
+                            f"[bold]{total_display}[/bold]",
+                            "",
+                        ),
+                        key=f"t-{str(person.id)}",
+                    )
                 )
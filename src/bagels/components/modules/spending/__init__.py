@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta
+from functools import partial
 
 import dateutil
 from textual.app import ComposeResult
@@ -8,6 +9,7 @@ from textual.reactive import Reactive, reactive
 from textual.widgets import Button, Label, Static
 
 from bagels.components.indicators import EmptyIndicator
+from bagels.components.loader import LoadedModule
 from bagels.components.modules.spending.plots import (
     BalancePlot,
     SpendingPlot,
@@ -20,7 +22,7 @@ from bagels.managers.utils import get_start_end_of_period
 from bagels.utils.format import format_period_to_readable
 
 
-class Spending(Static):
+class Spending(LoadedModule, Static):
     PLOT_TYPES = [SpendingTrajectoryPlot, SpendingPlot, BalancePlot]
 
     can_focus = True
@@ -64,7 +66,21 @@ class Spending(Static):
             except ValueError:
                 pass
 
-    def rebuild(self) -> None:
+    def _get_period(self) -> tuple[datetime, datetime]:
+        start_of_period, end_of_period = get_start_end_of_period(
+            self.page_parent.offset, "month"
+        )
+        if self._plots[self.current_plot].supports_cross_periods:
+            start_of_period = start_of_period - dateutil.relativedelta.relativedelta(
+                months=self.periods - 1
+            )
+        return start_of_period, end_of_period
+
+    def get_queries(self) -> dict:
+        plot = self._plots[self.current_plot]
+        return {"data": partial(plot.get_data, *self._get_period())}
+
+    def apply_data(self, data: dict) -> None:
         empty = self.query_one(EmptyIndicator)
         plotext = self.query_one(PlotextPlot)
         zoom_in_button = self.query_one("#zoom-in")
@@ -73,9 +89,7 @@ class Spending(Static):
         plotext.display = False  # make plotext update by toggling display... for some reason. Maybe a bug? Who knows.
         plot = self._plots[self.current_plot]
 
-        start_of_period, end_of_period = get_start_end_of_period(
-            self.page_parent.offset, "month"
-        )
+        start_of_period, end_of_period = self._get_period()
         self.app.log(
             f"The plot type {plot.name} has support for cross periods: {plot.supports_cross_periods}"
         )
@@ -90,9 +104,6 @@ class Spending(Static):
         )
 
         if plot.supports_cross_periods:
-            start_of_period = start_of_period - dateutil.relativedelta.relativedelta(
-                months=self.periods - 1
-            )
             zoom_in_button.display = True
             zoom_out_button.display = True
             if self.periods == 1:
@@ -110,9 +121,7 @@ class Spending(Static):
         plt.clear_data()
         plt.clear_figure()
 
-        # ------------- get data ------------- #
-
-        data = plot.get_data(start_of_period, end_of_period)
+        data = data["data"]
         total_days = (
             end_of_period - start_of_period
         ).days + 1  # add one to include the end date
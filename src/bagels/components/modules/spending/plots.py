@@ -1,16 +1,11 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from functools import lru_cache
 
 import numpy as np
 
 from bagels.components.tplot.plot import Plot
 from bagels.config import CONFIG
-from bagels.managers.records import (
-    get_daily_balance,
-    get_spending,
-    get_spending_trend,
-)
+from bagels.managers.records import get_daily_balance, get_daily_spending
 from bagels.managers.utils import get_income_to_use
 
 
@@ -46,9 +41,8 @@ class BasePlot(ABC):
 class SpendingPlot(BasePlot):
     name: str = "Spending"
 
-    @lru_cache
     def get_data(self, start_of_period, end_of_period):
-        return get_spending(start_of_period, end_of_period)
+        return get_daily_spending(start_of_period, end_of_period).tolist()
 
     def plot(
         self,
@@ -67,9 +61,8 @@ class SpendingPlot(BasePlot):
 class SpendingTrajectoryPlot(BasePlot):
     name: str = "Spending Trajectory"
 
-    @lru_cache
     def get_data(self, start_of_period, end_of_period):
-        return get_spending_trend(start_of_period, end_of_period)
+        return np.cumsum(get_daily_spending(start_of_period, end_of_period)).tolist()
 
     def plot(
         self,
@@ -131,7 +124,6 @@ class BalancePlot(BasePlot):
     name: str = "Balance"
     supports_cross_periods = True
 
-    @lru_cache
     def get_data(self, start_of_period, end_of_period):
         return get_daily_balance(start_of_period, end_of_period)
 
@@ -100,6 +100,40 @@ class BudgetingStates(BaseModel):
     )
 
 
+class Database(BaseModel):
+    journal_mode: Literal["wal", "delete", "truncate", "persist", "memory"] = "wal"
+    synchronous: Literal["off", "normal", "full", "extra"] = "normal"
+    cache_size: int = -64000  # negative values are KiB, so 64 MB
+    mmap_size: int = Field(ge=0, default=268435456)  # 256 MB
+    temp_store: Literal["default", "file", "memory"] = "memory"
+
+
+class Analytics(BaseModel):
+    # answer insights, budgets and plots from an in-memory copy of the ledger
+    ledger_snapshot: bool = False
+
+
+class ImportProfile(BaseModel):
+    format: Literal["csv", "ofx", "qif"] | None = None  # None infers from extension
+    # record field -> CSV column, for date, label, amount, category and account
+    columns: dict[str, str] = {
+        "date": "date",
+        "label": "label",
+        "amount": "amount",
+        "category": "category",
+        "account": "account",
+    }
+    delimiter: str = ","
+    encoding: str = "utf-8-sig"
+    date_format: str = "%Y-%m-%d"  # CSV and QIF only, OFX dates are standard
+    decimal_separator: str = "."
+    invert_amounts: bool = False  # for exports where spending is positive
+    account: str | None = None  # used for rows that name no account
+    # used for rows that name no category, "Uncategorized" if unset
+    default_category: str | None = None
+    batch_size: int = Field(gt=0, default=5000)  # records per commit
+
+
 class State(BaseModel):
     theme: str = "dark"
     check_for_updates: bool = True
@@ -111,6 +145,9 @@ class Config(BaseModel):
     hotkeys: Hotkeys = Hotkeys()
     symbols: Symbols = Symbols()
     defaults: Defaults = Defaults()
+    database: Database = Database()
+    analytics: Analytics = Analytics()
+    imports: dict[str, ImportProfile] = {}
     state: State = State()
 
     def __init__(self, **data):
@@ -181,7 +218,11 @@ class Config(BaseModel):
     @classmethod
     def get_default(cls):
         return cls(
-            hotkeys=Hotkeys(), symbols=Symbols(), defaults=Defaults(), state=State()
+            hotkeys=Hotkeys(),
+            symbols=Symbols(),
+            defaults=Defaults(),
+            database=Database(),
+            state=State(),
         )
 
 
@@ -4,6 +4,7 @@ from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.widgets import Label, Static
 
+from bagels.components.loader import ModuleLoader
 from bagels.components.modules.accountmode import AccountMode
 from bagels.components.modules.datemode import DateMode
 from bagels.components.modules.incomemode import IncomeMode
@@ -88,6 +89,7 @@ class Home(Static):
         self.record_module = Records(parent=self)
         self.insights_module = Insights(parent=self)
         self.templates_module = Templates(parent=self)
+        self.loader = ModuleLoader(self, "home")
 
     def on_mount(self) -> None:
         pass
@@ -95,14 +97,15 @@ class Home(Static):
     # -------------- Helpers ------------- #
 
     def rebuild(self, templates=False) -> None:
-        self.insights_module.rebuild()
-        self.accounts_module.rebuild()
         self.income_mode_module.rebuild()
         self.date_mode_module.rebuild()
+        modules = [self.insights_module, self.accounts_module]
         if self.isReady:
-            self.record_module.rebuild()
+            modules.append(self.record_module)
             if templates:
                 self.templates_module.rebuild(reset_state=True)
+        # the modules update as their data arrives, without blocking input
+        self.loader.load(modules)
 
     def get_filter_label(self) -> str:
         return format_period_to_readable(self.filter)
@@ -203,7 +206,7 @@ class Home(Static):
     def action_toggle_income_mode(self) -> None:
         self.mode["isIncome"] = not self.mode["isIncome"]
         self.income_mode_module.rebuild()
-        self.insights_module.rebuild()
+        self.loader.load([self.insights_module])
 
     def _select_account(self, dir: int = 0, id: int = None) -> None:
         if id is not None:
@@ -221,10 +224,10 @@ class Home(Static):
             self.mode["accountId"]["default_value"] = self.accounts[new_index].id
             self.mode["accountId"]["default_value_text"] = self.accounts[new_index].name
 
-        self.accounts_module.rebuild()
-        self.insights_module.rebuild()
+        modules = [self.accounts_module, self.insights_module]
         if self.filter["byAccount"]:
-            self.record_module.rebuild()
+            modules.append(self.record_module)
+        self.loader.load(modules)
 
     def action_select_prev_account(self) -> None:
         self._select_account(-1)
@@ -237,8 +240,7 @@ class Home(Static):
 
     def action_toggle_use_account(self) -> None:
         self.filter["byAccount"] = not self.filter["byAccount"]
-        self.insights_module.rebuild()
-        self.record_module.rebuild()
+        self.loader.load([self.insights_module, self.record_module])
 
     # region Templates
     # ------------- Template ------------- #
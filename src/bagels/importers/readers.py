@@ -0,0 +1,119 @@
+"""Streaming readers for bank statement exports.
+
+Each reader yields one (line number, row) pair per transaction and reads its
+file line by line, so memory use does not grow with the file. Rows use the
+keys date, label, amount, category and account; any may be missing.
+"""
+
+import csv
+import re
+from datetime import datetime
+from pathlib import Path
+
+from bagels.config import ImportProfile
+
+FORMATS = ("csv", "ofx", "qif")
+_EXTENSIONS = {".csv": "csv", ".ofx": "ofx", ".qfx": "ofx", ".qif": "qif"}
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)")
+_OFX_DATE = re.compile(r"\d{8}(\d{6})?")
+
+
+def detect_format(path: Path) -> str:
+    file_format = _EXTENSIONS.get(path.suffix.lower())
+    if file_format is None:
+        raise ValueError(
+            f"Cannot tell the format of '{path.name}', pass one of {', '.join(FORMATS)}"
+        )
+    return file_format
+
+
+def read_csv(file, profile: ImportProfile):
+    """Yields rows of a CSV file, renamed from the profile's columns."""
+    reader = csv.reader(file, delimiter=profile.delimiter)
+    header = next(reader, [])
+    positions = [
+        (field, header.index(column))
+        for field, column in profile.columns.items()
+        if column in header
+    ]
+    missing = {"date", "amount"} - {field for field, _ in positions}
+    if missing:
+        raise ValueError(
+            f"CSV header has no column for {', '.join(sorted(missing))}, check the import profile"
+        )
+
+    for row in reader:
+        if not row:
+            continue
+        yield (
+            reader.line_num,
+            {
+                field: row[position]
+                for field, position in positions
+                if position < len(row) and row[position]
+            },
+        )
+
+
+def _parse_ofx_date(value: str) -> datetime:
+    match = _OFX_DATE.match(value)
+    if not match:
+        raise ValueError(f"Invalid OFX date '{value}'")
+    digits = match.group(0)
+    return datetime.strptime(digits, "%Y%m%d%H%M%S" if len(digits) == 14 else "%Y%m%d")
+
+
+def read_ofx(file, profile: ImportProfile):
+    """Yields the <STMTTRN> transactions of an OFX (SGML or XML) file."""
+    transaction = None
+    count = 0
+    for line in file:
+        for closing, tag, value in _OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if closing and transaction is not None:
+                    count += 1
+                    yield count, transaction
+                    transaction = None
+                elif not closing:
+                    transaction = {}
+            elif transaction is not None and not closing and value.strip():
+                value = value.strip()
+                if tag == "DTPOSTED":
+                    transaction["date"] = _parse_ofx_date(value)
+                elif tag == "TRNAMT":
+                    transaction["amount"] = value
+                elif tag == "NAME" or (tag == "MEMO" and "label" not in transaction):
+                    transaction["label"] = value
+
+
+def read_qif(file, profile: ImportProfile):
+    """Yields the transactions of a QIF file, one per "^"-terminated block."""
+    transaction = {}
+    start = None
+    for line_number, line in enumerate(file, start=1):
+        line = line.rstrip("\r\n")
+        if not line or line.startswith("!"):
+            continue
+        code, value = line[0], line[1:].strip()
+        start = start or line_number
+        if code == "^":
+            if transaction:
+                yield start, transaction
+            transaction, start = {}, None
+        elif code == "D":
+            # Quicken writes 2-digit years as 1/15'24
+            transaction["date"] = value.replace("'", "/")
+        elif code in "TU":
+            transaction["amount"] = value
+        elif code == "P" or (code == "M" and "label" not in transaction):
+            transaction["label"] = value
+        elif code == "L" and not value.startswith("["):
+            # bracketed categories are transfers to another account
+            transaction["category"] = value
+    if transaction:
+        yield start, transaction
+
+
+READERS = {"csv": read_csv, "ofx": read_ofx, "qif": read_qif}
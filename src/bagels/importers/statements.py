@@ -0,0 +1,221 @@
+"""Imports bank statement exports into records, in batches.
+
+Rows stream from the file into a batch of at most `batch_size` records, which
+is written with `bulk_create_records` and committed before the next batch is
+read. Memory therefore stays bounded by the batch size, whatever the file size.
+"""
+
+import re
+import sys
+import time
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+from sqlalchemy import select
+
+from bagels.config import ImportProfile
+from bagels.importers.readers import READERS, detect_format
+from bagels.managers.records import bulk_create_records
+from bagels.models.account import Account
+from bagels.models.category import Category, Nature
+from bagels.models.database.app import Session
+
+MAX_REPORTED_ERRORS = 10
+
+# for rows that name no category, when the profile sets no default_category,
+# as in the ActualBudget migration
+FALLBACK_CATEGORY = "Uncategorized"
+
+
+class ImportStats:
+    def __init__(self):
+        self.read = 0
+        self.imported = 0
+        self.skipped = 0
+        self.errors = []  # (line number, message), first MAX_REPORTED_ERRORS only
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+    def skip(self, line_number: int, message: str):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line_number, message))
+
+
+class NameLookup:
+    """Case-insensitive name to ID lookup, loaded once per import."""
+
+    def __init__(self, session, model):
+        self._ids = {}
+        stmt = select(model.name, model.id).filter(model.deletedAt.is_(None))
+        for name, model_id in session.execute(stmt.order_by(model.id)):
+            self._ids.setdefault(name.strip().lower(), model_id)
+
+    def get(self, name: str | None):
+        if not name:
+            return None
+        return self._ids.get(name.strip().lower())
+
+
+def get_peak_memory_mb() -> float | None:
+    """Returns the peak resident memory of this process, where the OS reports it."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def parse_amount(value: str, decimal_separator: str = ".") -> float:
+    """Parses amounts such as "1,234.56", "-12.00", "$12" or "(12.00)"."""
+    if decimal_separator == ".":
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    value = value.strip()
+    negative = "-" in value or ("(" in value and value.endswith(")"))
+    digits = re.sub(rf"[^\d{re.escape(decimal_separator)}]", "", value)
+    if not digits:
+        raise ValueError(f"Invalid amount '{value}'")
+    amount = float(digits.replace(decimal_separator, "."))
+    return -amount if negative else amount
+
+
+@lru_cache(maxsize=4096)  # statements repeat the same few dates many times
+def _parse_date(value, date_format: str) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.strptime(value.strip(), date_format)
+    except ValueError:
+        return datetime.fromisoformat(value.strip())
+
+
+class StatementImporter:
+    def __init__(self, profile: ImportProfile, account: str | None = None):
+        self.profile = profile
+        session = Session()
+        try:
+            self.accounts = NameLookup(session, Account)
+            self.categories = NameLookup(session, Category)
+        finally:
+            session.close()
+
+        self.default_account_id = self._resolve_required(
+            self.accounts, account or profile.account, "account"
+        )
+        self.default_category_id = self._resolve_required(
+            self.categories, profile.default_category, "category"
+        )
+
+    @staticmethod
+    def _resolve_required(lookup: NameLookup, name: str | None, kind: str):
+        if name is None:
+            return None
+        model_id = lookup.get(name)
+        if model_id is None:
+            raise ValueError(f"No {kind} named '{name}'")
+        return model_id
+
+    def to_record(self, row: dict) -> dict | None:
+        """Converts a reader row to record data. Returns None for zero amounts."""
+        if "date" not in row or "amount" not in row:
+            raise ValueError("Missing date or amount")
+
+        amount = parse_amount(row["amount"], self.profile.decimal_separator)
+        if self.profile.invert_amounts:
+            amount = -amount
+        if amount == 0:
+            return None
+
+        account_id = self.default_account_id
+        if "account" in row:
+            account_id = self.accounts.get(row["account"])
+            if account_id is None:
+                raise ValueError(f"Unknown account '{row['account']}'")
+        if account_id is None:
+            raise ValueError("No account, set one in the profile or with --account")
+
+        if row.get("category"):
+            category_id = self.categories.get(row["category"])
+            if category_id is None:
+                raise ValueError(f"Unknown category '{row['category']}'")
+        else:
+            category_id = self._get_default_category_id()
+
+        return {
+            "label": row.get("label") or "Imported transaction",
+            "amount": abs(amount),
+            "date": _parse_date(row["date"], self.profile.date_format),
+            "accountId": account_id,
+            "categoryId": category_id,
+            "isIncome": amount > 0,
+        }
+
+    def _get_default_category_id(self) -> int:
+        """The profile's default category, or else the fallback category, created on first use."""
+        if self.default_category_id is None:
+            self.default_category_id = self.categories.get(FALLBACK_CATEGORY)
+        if self.default_category_id is None:
+            session = Session()
+            try:
+                category = Category(
+                    name=FALLBACK_CATEGORY, nature=Nature.WANT, color="#808080"
+                )
+                session.add(category)
+                session.commit()
+                self.default_category_id = category.id
+            finally:
+                session.close()
+        return self.default_category_id
+
+    def run(
+        self, path: Path, file_format: str | None = None, on_batch=None
+    ) -> ImportStats:
+        """Imports a statement file, committing every `batch_size` records.
+
+        Args:
+            path (Path): The statement file.
+            file_format (str, optional): csv, ofx or qif. Defaults to the profile's format, then the file extension.
+            on_batch (Callable[[ImportStats], None], optional): Called after each committed batch.
+        """
+        file_format = file_format or self.profile.format or detect_format(path)
+        reader = READERS[file_format]
+        stats = ImportStats()
+        batch = []
+
+        def flush():
+            bulk_create_records(batch)
+            stats.imported += len(batch)
+            stats.elapsed = time.perf_counter() - stats.started
+            batch.clear()
+            if on_batch:
+                on_batch(stats)
+
+        with open(path, newline="", encoding=self.profile.encoding) as file:
+            for line_number, row in reader(file, self.profile):
+                stats.read += 1
+                try:
+                    record = self.to_record(row)
+                except ValueError as e:
+                    stats.skip(line_number, str(e))
+                    continue
+                if record is None:
+                    stats.skipped += 1
+                    continue
+                batch.append(record)
+                if len(batch) >= self.profile.batch_size:
+                    flush()
+            if batch:
+                flush()
+
+        stats.elapsed = time.perf_counter() - stats.started
+        return stats
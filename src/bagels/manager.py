@@ -4,6 +4,7 @@ from textual.containers import Center, Container
 from textual.widgets import Static
 
 from bagels.components.bagel import Bagel
+from bagels.components.loader import ModuleLoader
 from bagels.components.modules.budgets import Budgets
 from bagels.components.modules.categories import Categories
 from bagels.components.modules.people import People
@@ -27,6 +28,7 @@ class Manager(Static):
         self.categories_module = Categories()
         self.budgets_module = Budgets(page_parent=self)
         self.people_module = People()
+        self.loader = ModuleLoader(self, "manager")
 
     def on_mount(self) -> None:
         pass
@@ -35,10 +37,14 @@ class Manager(Static):
 
     def rebuild(self) -> None:
         if self.isReady:
-            self.spendings_module.rebuild()
-            self.categories_module.rebuild()
-            self.budgets_module.rebuild()
-            self.people_module.rebuild()
+            self.loader.load(
+                [
+                    self.spendings_module,
+                    self.categories_module,
+                    self.budgets_module,
+                    self.people_module,
+                ]
+            )
 
     # region Callbacks
     # ------------- Callbacks ------------ #
@@ -46,13 +52,11 @@ class Manager(Static):
     def action_inc_offset(self) -> None:
         if self.offset < 0:
             self.offset += 1
-            self.spendings_module.rebuild()
-            self.budgets_module.rebuild()
+            self.loader.load([self.spendings_module, self.budgets_module])
 
     def action_dec_offset(self) -> None:
         self.offset -= 1
-        self.spendings_module.rebuild()
-        self.budgets_module.rebuild()
+        self.loader.load([self.spendings_module, self.budgets_module])
 
     # region View
     # --------------- View --------------- #
@@ -1,46 +1,42 @@
 from datetime import datetime
+from math import isclose
 
-from sqlalchemy import select
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import delete, func, select
 
 from bagels.config import CONFIG
+from bagels.managers.utils import session_scope
 from bagels.models.account import Account
-from bagels.models.database.app import db_engine
-from bagels.models.record import Record
-from bagels.models.split import Split
-
-Session = sessionmaker(bind=db_engine)
+from bagels.models.account_balance import AccountBalance, get_balance_movements_query
+from bagels.models.database.app import Session
 
 
 # region Create
 
 
-def create_account(data):
-    session = Session()
-    try:
+def create_account(data, session=None):
+    with session_scope(Session, session) as session:
         new_account = Account(**data)
         session.add(new_account)
-        session.commit()
+        session.flush()
         session.refresh(new_account)
-        session.expunge(new_account)
         return new_account
-    finally:
-        session.close()
 
 
 # region Read
 
 
-def get_account_balance(accountId, session=None):
-    """Returns the net balance of an account.
+def get_account_balances(account_ids=None, session=None) -> dict[int, float]:
+    """Returns the net balance of accounts, keyed by account ID.
 
     Rules:
     - Consider all record "account" and split "account"
     - Records with isTransfer should consider both "account" and "transferToAccount"
     - Records and splits should be considered separately, unlike net figures which consider records and splits together.
 
+    Movements are read from the account balance cache, see `rebuild_account_balance_cache`.
+
     Args:
-        accountId (int): The ID of the account to get the balance
+        account_ids (list[int], optional): The IDs of the accounts to get the balance of. If None, all accounts.
         session (Session, optional): SQLAlchemy session to use. If None, creates a new session.
     """
     if session is None:
@@ -50,57 +46,91 @@ def get_account_balance(accountId, session=None):
         should_close = False
 
     try:
-        # Initialize balance
-        balance = (
-            session.query(Account)
-            .filter(Account.id == accountId)
-            .first()
-            .beginningBalance
-        )
+        stmt = select(
+            Account.id,
+            Account.beginningBalance + func.coalesce(AccountBalance.netAmount, 0),
+        ).outerjoin(AccountBalance, AccountBalance.accountId == Account.id)
+        if account_ids is not None:
+            stmt = stmt.filter(Account.id.in_(account_ids))
+
+        return {
+            account_id: round(balance, CONFIG.defaults.round_decimals)
+            for account_id, balance in session.execute(stmt)
+        }
+    finally:
+        if should_close:
+            session.close()
+
+
+def _compute_net_movements(session) -> dict[int, float]:
+    movements = get_balance_movements_query()
+    stmt = (
+        select(movements.c.accountId, func.sum(movements.c.amount))
+        .filter(movements.c.accountId.isnot(None))
+        .group_by(movements.c.accountId)
+    )
+    return dict(session.execute(stmt).all())
 
-        # Get all records for this account
-        records = session.query(Record).filter(Record.accountId == accountId).all()
-
-        # Calculate balance from records
-        for record in records:
-            if record.isTransfer:
-                # For transfers, subtract full amount (transfers out)
-                balance -= record.amount
-            elif record.isIncome:
-                # For income records, add full amount
-                balance += record.amount
-            else:
-                # For expense records, subtract full amount
-                balance -= record.amount
-
-        # Get all records where this account is the transfer destination
-        transfer_to_records = (
-            session.query(Record)
-            .filter(Record.transferToAccountId == accountId, Record.isTransfer == True)  # noqa
-            .all()
-        )
 
-        # Add transfers into this account
-        for record in transfer_to_records:
-            balance += record.amount
+def verify_account_balances(repair=False, session=None) -> dict[int, tuple]:
+    """Recomputes every account's movements from scratch and compares them to the cache.
 
-        # Get all splits where this account is specified
-        splits = session.query(Split).filter(Split.accountId == accountId).all()
+    Args:
+        repair (bool): Whether to overwrite the cache with the recomputed values.
+        session (Session, optional): SQLAlchemy session to use. If None, creates a new session.
 
-        # Add paid splits (they represent money coming into this account)
-        for split in splits:
-            if split.isPaid:
-                if split.record.isIncome:
-                    balance -= split.amount
-                else:
-                    balance += split.amount
+    Returns:
+        dict: account ID to (cached, actual) net amount, for each account that drifted.
+    """
+    if session is None:
+        session = Session()
+        should_close = True
+    else:
+        should_close = False
 
-        return round(balance, CONFIG.defaults.round_decimals)
+    try:
+        actual = _compute_net_movements(session)
+        cached = dict(
+            session.execute(
+                select(AccountBalance.accountId, AccountBalance.netAmount)
+            ).all()
+        )
+        drifted = {
+            account_id: (cached.get(account_id, 0), actual.get(account_id, 0))
+            for account_id in cached.keys() | actual.keys()
+            if not isclose(
+                cached.get(account_id, 0), actual.get(account_id, 0), abs_tol=1e-6
+            )
+        }
+
+        if repair and drifted:
+            session.execute(delete(AccountBalance))
+            session.add_all(
+                AccountBalance(accountId=account_id, netAmount=amount)
+                for account_id, amount in actual.items()
+            )
+            session.commit()
+        return drifted
     finally:
         if should_close:
             session.close()
 
 
+def rebuild_account_balance_cache(session=None) -> None:
+    """Fills the account balance cache from scratch."""
+    verify_account_balances(repair=True, session=session)
+
+
+def get_account_balance(accountId, session=None):
+    """Returns the net balance of an account. See `get_account_balances` for the rules.
+
+    Args:
+        accountId (int): The ID of the account to get the balance
+        session (Session, optional): SQLAlchemy session to use. If None, creates a new session.
+    """
+    return get_account_balances([accountId], session)[accountId]
+
+
 def _get_base_accounts_query(get_hidden=False):
     stmt = select(Account).filter(Account.deletedAt.is_(None))
     if not get_hidden:
@@ -133,8 +163,9 @@ def get_all_accounts_with_balance(get_hidden=False):
     try:
         stmt = _get_base_accounts_query(get_hidden)
         accounts = session.scalars(stmt).all()
+        balances = get_account_balances([a.id for a in accounts], session)
         for account in accounts:
-            account.balance = get_account_balance(account.id, session)
+            account.balance = balances[account.id]
         return accounts
     finally:
         session.close()
@@ -159,32 +190,25 @@ def get_account_by_id(account_id):
 # region Update
 
 
-def update_account(account_id, data):
-    session = Session()
-    try:
+def update_account(account_id, data, session=None):
+    with session_scope(Session, session) as session:
         account = session.get(Account, account_id)
         if account:
             for key, value in data.items():
                 setattr(account, key, value)
-            session.commit()
+            session.flush()
             session.refresh(account)
-            session.expunge(account)
         return account
-    finally:
-        session.close()
 
 
 # region Delete
 
 
-def delete_account(account_id):
-    session = Session()
-    try:
+def delete_account(account_id, session=None):
+    with session_scope(Session, session) as session:
         account = session.get(Account, account_id)
         if account:
             account.deletedAt = datetime.now()
-            session.commit()
+            session.flush()
             return True
         return False
-    finally:
-        session.close()
@@ -0,0 +1,254 @@
+"""Result cache for manager read functions.
+
+Results are keyed by function, arguments and the current data version. The
+version is bumped whenever a transaction that wrote to the database commits,
+whichever manager (or bulk import) made the write, so a cached result is
+never served after the data it was computed from has changed.
+
+Concurrent misses of the same key are coalesced into one call, and
+`track_queries` counts what the reads inside a block cost, e.g. per rebuild.
+"""
+
+import inspect
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from copy import deepcopy
+from datetime import date
+from functools import wraps
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from bagels.config import CONFIG
+
+_WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "REPLACE", "CREATE", "DROP", "ALTER")
+
+_version = 0
+_version_lock = threading.Lock()
+
+
+def data_version() -> int:
+    return _version
+
+
+def _config_key() -> tuple:
+    """The settings that reads depend on, besides their arguments and the data."""
+    return (
+        CONFIG.defaults.first_day_of_week,
+        CONFIG.defaults.round_decimals,
+        CONFIG.analytics.ledger_snapshot,
+    )
+
+
+def bump_data_version() -> None:
+    """Invalidates every cached result."""
+    global _version
+    with _version_lock:
+        _version += 1
+    query_cache.clear()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _track_writes(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip()[:7].upper().startswith(_WRITE_STATEMENTS):
+        conn.info["has_writes"] = True
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statements(conn, cursor, statement, parameters, context, executemany):
+    stats = _tracked_stats.get()
+    if stats is not None:
+        stats.add("statements")
+
+
+@event.listens_for(Engine, "commit")
+def _bump_on_commit(conn):
+    if conn.info.pop("has_writes", False):
+        bump_data_version()
+
+
+@event.listens_for(Engine, "rollback")
+def _discard_on_rollback(conn):
+    conn.info.pop("has_writes", None)
+
+
+class QueryStats:
+    """SQL statements and cache lookups of the reads in a `track_queries` block."""
+
+    def __init__(self):
+        self.statements = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+
+    def add(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.statements} SQL statements, {self.hits} cache hits, "
+            f"{self.misses} misses, {self.coalesced} coalesced"
+        )
+
+
+_tracked_stats: ContextVar[QueryStats | None] = ContextVar(
+    "tracked_stats", default=None
+)
+
+
+@contextmanager
+def track_queries():
+    """Counts the SQL statements and cache lookups of the reads inside the block.
+
+    The count is kept in a context variable, so it follows the reads into
+    threads that run them in a copy of the context, like the module loader.
+    """
+    stats = QueryStats()
+    token = _tracked_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _tracked_stats.reset(token)
+
+
+def _track(counter: str) -> None:
+    stats = _tracked_stats.get()
+    if stats is not None:
+        stats.add(counter)
+
+
+class QueryCache:
+    """A bounded LRU of read results with hit and miss counts."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries = OrderedDict()
+        self._pending = {}  # key -> Future of a value being computed
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns (True, value) on a hit and (False, None) on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def get_or_compute(self, key, compute):
+        """Returns the value of key, calling compute on a miss.
+
+        If another thread is already computing the key, this waits for its
+        value instead of running the same query again.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                _track("hits")
+                return self._entries[key]
+            self.misses += 1
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = Future()
+                computing = True
+            else:
+                self.coalesced += 1
+                computing = False
+        if not computing:
+            _track("coalesced")
+            return pending.result()
+
+        _track("misses")
+        try:
+            value = compute()
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        else:
+            pending.set_result(value)
+            self.put(key, value)
+            return value
+        finally:
+            with self._lock:
+                del self._pending[key]
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "size": len(self._entries),
+            "version": _version,
+        }
+
+    @contextmanager
+    def disabled(self):
+        """Bypasses the cache inside the block, e.g. for tests."""
+        enabled, self.enabled = self.enabled, False
+        try:
+            yield
+        finally:
+            self.enabled = enabled
+
+
+query_cache = QueryCache()
+
+
+def cached(func):
+    """Caches a manager read function's results until the next write.
+
+    Calls given a session are not cached, since they may see uncommitted
+    changes, nor are calls with unhashable arguments. Today's date is part of
+    the key because periods such as "this month" are relative to it, and so
+    are the settings that change how results are computed or rounded.
+
+    Every caller gets its own copy of the result, so changing it in place
+    does not change what later callers read.
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+    signature = inspect.signature(func)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not query_cache.enabled:
+            return func(*args, **kwargs)
+        bound = signature.bind(*args, **kwargs)
+        if bound.arguments.get("session") is not None:
+            return func(*args, **kwargs)
+        bound.apply_defaults()
+        key = (
+            name,
+            tuple(bound.arguments.items()),
+            date.today(),
+            _config_key(),
+            _version,
+        )
+        try:
+            hash(key)
+        except TypeError:  # unhashable arguments
+            return func(*args, **kwargs)
+        return deepcopy(query_cache.get_or_compute(key, lambda: func(*args, **kwargs)))
+
+    return wrapper
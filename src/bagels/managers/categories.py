@@ -1,15 +1,20 @@
+from dataclasses import dataclass
 from datetime import datetime
 
 from rich.text import Text
 from sqlalchemy import desc, func, select
-from sqlalchemy.orm import joinedload, sessionmaker
-
-from bagels.managers.utils import get_start_end_of_period
+from sqlalchemy.orm import aliased, joinedload
+
+from bagels.managers.cache import cached
+from bagels.managers.snapshot import get_ledger_snapshot, use_ledger_snapshot
+from bagels.managers.utils import (
+    get_day_range,
+    get_start_end_of_period,
+    session_scope,
+)
 from bagels.models.category import Category
-from bagels.models.database.app import db_engine
-from bagels.models.record import Record
-
-Session = sessionmaker(bind=db_engine)
+from bagels.models.daily_rollup import DailyRollup
+from bagels.models.database.app import Session
 
 
 # region Get
@@ -91,102 +96,113 @@ def get_category_by_id(category_id):
         session.close()
 
 
+@dataclass(frozen=True)
+class CategoryTotal:
+    id: int
+    name: str
+    color: str
+    amount: float
+
+
+@cached
 def get_all_categories_records(
     offset: int = 0,
     offset_type: str = "month",
     is_income: bool = True,
     subcategories: bool = False,
     account_id: int = None,
-):
+) -> list[CategoryTotal]:
     """
     Retrieve all categories with their net income or expenses, sorted by total amount.
     """
+    if use_ledger_snapshot():
+        return _get_snapshot_categories_records(
+            offset, offset_type, is_income, subcategories, account_id
+        )
+
     session = Session()
     try:
         start_of_period, end_of_period = get_start_end_of_period(offset, offset_type)
 
-        stmt = select(Record).options(joinedload(Record.category))
+        first_day, after_last_day = get_day_range(start_of_period, end_of_period)
+        conditions = [
+            DailyRollup.day >= first_day,
+            DailyRollup.day < after_last_day,
+            DailyRollup.isIncome == is_income,
+        ]
         if account_id is not None:
-            stmt = stmt.filter(Record.accountId == account_id)
-        stmt = stmt.filter(
-            Record.date >= start_of_period,
-            Record.date < end_of_period,
-            Record.isIncome == is_income,
-        )
-
-        category_totals = {}
-        records = session.scalars(stmt).all()
-        for record in records:
-            split_total = sum(split.amount for split in record.splits)
-            record_amount = record.amount - split_total
-
-            if record.category is None:
-                continue
-
-            category_id = record.categoryId
-            if not subcategories and record.category.parentCategoryId:
-                category_id = record.category.parentCategoryId
-
-            if category_id not in category_totals:
-                category_totals[category_id] = 0
-            category_totals[category_id] += record_amount
+            conditions.append(DailyRollup.accountId == account_id)
+
+        # Rollup rows are totalled under their own category, or under its
+        # parent when subcategories are rolled up
+        record_category = aliased(Category)
+        if subcategories:
+            group_id = record_category.id
+        else:
+            group_id = func.coalesce(
+                record_category.parentCategoryId, record_category.id
+            )
 
+        total = func.sum(DailyRollup.amount - DailyRollup.splitAmount).label("total")
         stmt = (
-            select(Category)
-            .filter(
-                Category.id.in_(category_totals.keys()), Category.deletedAt.is_(None)
-            )
-            .options(joinedload(Category.parentCategory))
+            select(Category.id, Category.name, Category.color, total)
+            .select_from(DailyRollup)
+            .join(record_category, DailyRollup.categoryId == record_category.id)
+            .join(Category, Category.id == group_id)
+            .filter(*conditions, Category.deletedAt.is_(None))
+            .group_by(Category.id)
+            .having(total != 0)
+            .order_by(total.desc(), Category.id)
         )
-        categories = session.scalars(stmt).all()
-        for category in categories:
-            category.amount = category_totals[category.id]
+        return [CategoryTotal(*row) for row in session.execute(stmt)]
+    finally:
+        session.close()
 
-        categories = [cat for cat in categories if cat.amount != 0]
-        categories.sort(key=lambda cat: cat.amount, reverse=True)
 
-        return categories
+def _get_snapshot_categories_records(*args) -> list[CategoryTotal]:
+    totals = get_ledger_snapshot().category_totals(*args)
+    session = Session()
+    try:
+        stmt = select(Category.id, Category.name, Category.color).filter(
+            Category.id.in_([category_id for category_id, _ in totals])
+        )
+        categories = {row.id: row for row in session.execute(stmt)}
+        return [
+            CategoryTotal(*categories[category_id], amount)
+            for category_id, amount in totals
+        ]
     finally:
         session.close()
 
 
 # region Create
-def create_category(data):
+def create_category(data, session=None):
     """Create a new category."""
-    session = Session()
-    try:
+    with session_scope(Session, session) as session:
         new_category = Category(**data)
         session.add(new_category)
-        session.commit()
+        session.flush()
         session.refresh(new_category)
-        session.expunge(new_category)
         return new_category
-    finally:
-        session.close()
 
 
 # region Update
-def update_category(category_id, data):
+def update_category(category_id, data, session=None):
     """Update a category by its ID."""
-    session = Session()
-    try:
+    with session_scope(Session, session) as session:
         category = session.get(Category, category_id)
         if category:
             for key, value in data.items():
                 setattr(category, key, value)
-            session.commit()
+            session.flush()
             session.refresh(category)
-            session.expunge(category)
         return category
-    finally:
-        session.close()
 
 
 # region Delete
-def delete_category(category_id):
+def delete_category(category_id, session=None):
     """Delete a category by marking it and its subcategories as deleted."""
-    session = Session()
-    try:
+    with session_scope(Session, session) as session:
         category = session.get(Category, category_id)
         if category:
             category.deletedAt = datetime.now()
@@ -198,10 +214,7 @@ def delete_category(category_id):
             for subcategory in subcategories:
                 subcategory.deletedAt = datetime.now()
 
-            session.commit()
+            session.flush()
             session.refresh(category)
-            session.expunge(category)
             return True
         return False
-    finally:
-        session.close()
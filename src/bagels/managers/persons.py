@@ -1,33 +1,32 @@
 from dataclasses import dataclass
 
-from sqlalchemy import and_, func, select
-from sqlalchemy.orm import contains_eager, sessionmaker
-
-from bagels.managers.utils import get_operator_amount, get_start_end_of_period
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import contains_eager
+
+from bagels.managers.utils import (
+    get_operator_amount,
+    get_start_end_of_period,
+    session_scope,
+)
 from bagels.models.category import Category
-from bagels.models.database.app import db_engine
+from bagels.models.database.app import Session
 from bagels.models.person import Person
 from bagels.models.record import Record
+from bagels.models.record_search import label_filter
 from bagels.models.split import Split
 
-Session = sessionmaker(bind=db_engine)
-
 
 # region Create
 
 
-def create_person(data):
+def create_person(data, session=None):
     """Create a new person entry in the database."""
-    session = Session()
-    try:
+    with session_scope(Session, session) as session:
         new_person = Person(**data)
         session.add(new_person)
-        session.commit()
+        session.flush()
         session.refresh(new_person)
-        session.expunge(new_person)
         return new_person
-    finally:
-        session.close()
 
 
 # region Read
@@ -57,12 +56,11 @@ def get_persons_with_splits(
     category_piped_names: str = None,
     operator_amount: str = None,
     label: str = None,
+    all_periods: bool = False,
 ):
-    """Get all persons with their splits for the specified period."""
+    """Get all persons with their splits for the specified period, or for all periods."""
     session = Session()
     try:
-        start_of_period, end_of_period = get_start_end_of_period(offset, offset_type)
-
         # Build the base query
         stmt = (
             select(Person)
@@ -79,9 +77,13 @@ def get_persons_with_splits(
         )
 
         # Apply date filter
-        stmt = stmt.filter(
-            and_(Record.date >= start_of_period, Record.date < end_of_period)
-        )
+        if not all_periods:
+            start_of_period, end_of_period = get_start_end_of_period(
+                offset, offset_type
+            )
+            stmt = stmt.filter(
+                and_(Record.date >= start_of_period, Record.date < end_of_period)
+            )
 
         # Apply category filter
         if category_piped_names not in [None, ""]:
@@ -96,7 +98,10 @@ def get_persons_with_splits(
 
         # Apply label filter
         if label not in [None, ""]:
-            stmt = stmt.filter(Record.label.ilike(f"%{label}%"))
+            if all_periods:
+                stmt = stmt.filter(label_filter(session, label))
+            else:
+                stmt = stmt.filter(Record.label.ilike(f"%{label}%"))
 
         # Apply ordering and distinct
         stmt = stmt.order_by(Record.date.asc()).distinct()
@@ -114,42 +119,28 @@ class PersonWithDue:
 
 
 def get_persons_with_net_due() -> list[Person]:
-    """Retrieve all persons with their net due amount."""
+    """Retrieve all persons with their net due amount.
+
+    The due of a person is what they owe for unpaid splits of expenses, less
+    what is owed to them for unpaid splits of income.
+    """
     session = Session()
     try:
-        stmt = (
+        unpaid = (
             select(
-                Person,
-                (
-                    func.coalesce(
-                        select(func.sum(Split.amount))
-                        .select_from(Split)
-                        .join(Record)
-                        .where(
-                            Split.personId == Person.id,
-                            Record.isIncome == False,  # noqa: E712
-                            Split.isPaid == False,  # noqa: E712
-                        )
-                        .correlate(Person)
-                        .scalar_subquery(),
-                        0,
-                    )
-                    - func.coalesce(
-                        select(func.sum(Split.amount))
-                        .select_from(Split)
-                        .join(Record)
-                        .where(
-                            Split.personId == Person.id,
-                            Record.isIncome == True,  # noqa: E712
-                            Split.isPaid == False,  # noqa: E712
-                        )
-                        .correlate(Person)
-                        .scalar_subquery(),
-                        0,
-                    )
+                Split.personId,
+                func.sum(
+                    case((Record.isIncome, -Split.amount), else_=Split.amount)
                 ).label("due"),
             )
-            .select_from(Person)
+            .join(Record)
+            .where(Split.isPaid == False)  # noqa: E712
+            .group_by(Split.personId)
+            .subquery()
+        )
+        stmt = (
+            select(Person, func.coalesce(unpaid.c.due, 0).label("due"))
+            .outerjoin(unpaid, unpaid.c.personId == Person.id)
             .where(Person.deletedAt.is_(None))
             .order_by(Person.name)
         )
@@ -167,29 +158,24 @@ def get_persons_with_net_due() -> list[Person]:
 # region Update
 
 
-def update_person(person_id, data) -> Person:
+def update_person(person_id, data, session=None) -> Person:
     """Update a person's information by their ID."""
-    session = Session()
-    try:
+    with session_scope(Session, session) as session:
         person = session.get(Person, person_id)
         if person:
             for key, value in data.items():
                 setattr(person, key, value)
-            session.commit()
+            session.flush()
             session.refresh(person)
-            session.expunge(person)
         return person
-    finally:
-        session.close()
 
 
 # region Delete
 
 
-def delete_person(person_id) -> bool:
+def delete_person(person_id, session=None) -> bool:
     """Delete a person - if they have splits, soft delete by setting deletedAt, otherwise hard delete."""
-    session = Session()
-    try:
+    with session_scope(Session, session) as session:
         person = session.get(Person, person_id)
         if person:
             # Check if person has any splits
@@ -205,8 +191,6 @@ def delete_person(person_id) -> bool:
                 # Hard delete if person has no splits
                 session.delete(person)
 
-            session.commit()
+            session.flush()
             return True
         return False
-    finally:
-        session.close()
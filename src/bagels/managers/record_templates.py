@@ -1,31 +1,26 @@
 from sqlalchemy import select
-from sqlalchemy.orm import joinedload, sessionmaker
-from bagels.models.database.app import db_engine
+from sqlalchemy.orm import joinedload
+from bagels.managers.utils import session_scope
+from bagels.models.database.app import Session
 from bagels.models.record_template import RecordTemplate
 
-Session = sessionmaker(bind=db_engine)
-
 
 # region c
-def create_template(data):
-    session = Session()
-    try:
+def create_template(data, session=None):
+    with session_scope(Session, session) as session:
         new_template = RecordTemplate(**data)
         session.add(new_template)
-        session.commit()
+        session.flush()
         session.refresh(new_template)
-        session.expunge(new_template)
         return new_template
-    finally:
-        session.close()
 
 
-def create_template_from_record(record):
+def create_template_from_record(record, session=None):
     data = {}
     for x in ["label", "amount", "accountId", "categoryId", "isIncome"]:
         data[x] = record[x]
 
-    return create_template(data)
+    return create_template(data, session)
 
 
 # region r
@@ -90,24 +85,19 @@ def get_adjacent_template(recordtemplate_id, direction):
 
 
 # region u
-def update_template(recordtemplate_id, data):
-    session = Session()
-    try:
+def update_template(recordtemplate_id, data, session=None):
+    with session_scope(Session, session) as session:
         recordtemplate = session.get(RecordTemplate, recordtemplate_id)
         if recordtemplate:
             for key, value in data.items():
                 setattr(recordtemplate, key, value)
-            session.commit()
+            session.flush()
             session.refresh(recordtemplate)
-            session.expunge(recordtemplate)
         return recordtemplate
-    finally:
-        session.close()
 
 
-def swap_template_order(recordtemplate_id, direction="next"):
-    session = Session()
-    try:
+def swap_template_order(recordtemplate_id, direction="next", session=None):
+    with session_scope(Session, session) as session:
         recordtemplate = session.get(RecordTemplate, recordtemplate_id)
 
         if recordtemplate:
@@ -132,18 +122,14 @@ def swap_template_order(recordtemplate_id, direction="next"):
 
                 recordtemplate.order = -swap_template.order
                 swap_template.order = current_order
-                session.commit()
+                session.flush()
                 session.refresh(recordtemplate)
-                session.expunge(recordtemplate)
         return recordtemplate
-    finally:
-        session.close()
 
 
 # region d
-def delete_template(recordtemplate_id):
-    session = Session()
-    try:
+def delete_template(recordtemplate_id, session=None):
+    with session_scope(Session, session) as session:
         recordtemplate = session.get(RecordTemplate, recordtemplate_id)
         if recordtemplate:
             # Get all templates with higher order
@@ -167,8 +153,6 @@ def delete_template(recordtemplate_id):
             for i, template in enumerate(templates):
                 template.order = recordtemplate.order + i
 
-            session.commit()
+            session.flush()
             return True
         return False
-    finally:
-        session.close()
@@ -1,49 +1,185 @@
-from datetime import datetime, timedelta
-
-from sqlalchemy import func
-from sqlalchemy.orm import joinedload, sessionmaker
-
+from datetime import date, datetime, timedelta
+from math import isclose
+
+import numpy as np
+from sqlalchemy import case, delete, func, insert, literal, select, tuple_
+from sqlalchemy.orm import joinedload, selectinload
+
+from bagels.managers.cache import cached
+from bagels.managers.snapshot import (
+    get_ledger_snapshot,
+    track_inserted_records,
+    use_ledger_snapshot,
+)
 from bagels.managers.splits import create_split, get_splits_by_record_id, update_split
-from bagels.managers.utils import get_operator_amount, get_start_end_of_period
+from bagels.managers.utils import (
+    get_day_range,
+    get_operator_amount,
+    get_start_end_of_period,
+    session_scope,
+)
 from bagels.models.account import Account
+from bagels.models.account_balance import apply_inserted_movements
 from bagels.models.category import Category
-from bagels.models.database.app import db_engine
+from bagels.models.daily_rollup import (
+    DailyRollup,
+    apply_inserted_rollups,
+    get_rollup_query,
+)
+from bagels.models.database.app import Session
 from bagels.models.record import Record
+from bagels.models.record_search import (
+    get_match_query,
+    is_label_indexed,
+    label_fts,
+    label_filter,
+    label_rank,
+    matches,
+)
 from bagels.models.split import Split
 
-Session = sessionmaker(bind=db_engine)
-
 
 # region Create
-def create_record(record_data: dict):
-    session = Session()
-    try:
+def create_record(record_data: dict, session=None):
+    with session_scope(Session, session) as session:
         record = Record(**record_data)
         session.add(record)
-        session.commit()
+        session.flush()
         session.refresh(record)
-        session.expunge(record)
         return record
-    finally:
-        session.close()
 
 
-def create_record_and_splits(record_data: dict, splits_data: list[dict]):
-    session = Session()
-    try:
-        record = create_record(record_data)
+def create_record_and_splits(record_data: dict, splits_data: list[dict], session=None):
+    """Creates a record and its splits in one transaction."""
+    with session_scope(Session, session) as session:
+        record = create_record(record_data, session)
         for split in splits_data:
             split["recordId"] = record.id
-            create_split(split)
+            create_split(split, session)
         return record
-    finally:
-        session.close()
+
+
+def _column_default(column):
+    default = column.default
+    if default is None:
+        return None
+    if default.is_callable:
+        return default.arg(None)
+    return default.arg
+
+
+def _insert_many(connection, table, rows: list[dict], **column_values) -> None:
+    """Inserts rows with a single driver-level executemany.
+
+    Parameters are bound here, once per column, instead of by SQLAlchemy for
+    every row, which dominates the cost of large imports. Columns missing
+    from a row take their Python-side default, or None. `column_values` gives
+    a column's value for every row as a list, overriding the rows.
+    """
+    dialect = connection.dialect
+    keys = set().union(*rows) | column_values.keys()
+    compiled = insert(table).compile(dialect=dialect, column_keys=keys)
+    columns = [table.c[key] for key in compiled.positiontup]
+
+    # Built column by column, so each bind processor is mapped over a list and
+    # defaults are processed once
+    values_by_column = []
+    for column in columns:
+        process = column.type.dialect_impl(dialect).bind_processor(dialect)
+        if column.key in column_values:
+            values = column_values[column.key]
+        elif column.key in keys:
+            default = _column_default(column)
+            values = [row.get(column.key, default) for row in rows]
+        else:
+            default = _column_default(column)
+            values_by_column.append(
+                [process(default) if process else default] * len(rows)
+            )
+            continue
+        values_by_column.append(list(map(process, values)) if process else values)
+    params = list(zip(*values_by_column))
+    connection.exec_driver_sql(str(compiled), params)
+
+
+def _begin_immediate(connection) -> None:
+    """Takes the database write lock now, rather than at the first INSERT.
+
+    pysqlite only opens a transaction before DML statements, so until then
+    reads see no lock, and DDL is committed on its own. A transaction it has
+    already opened has run DML, and so holds the write lock.
+    """
+    if not connection.connection.driver_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def bulk_create_records(
+    records_data: list[dict],
+    session=None,
+    batch_size: int = 5000,
+    defer_indexes: bool = False,
+) -> list[int]:
+    """Creates many records and their splits in one transaction.
+
+    Rows are written with batched executemany INSERT statements instead of
+    one ORM flush per record.
+
+    Args:
+        records_data (list[dict]): Record fields, each with an optional "splits" list of split fields.
+        session (Session, optional): SQLAlchemy session to use. If None, creates a new session.
+        batch_size (int): Number of records per INSERT batch.
+        defer_indexes (bool): Drop the record and split indexes during the insert and rebuild them once at the end. Faster for imports much larger than the existing ledger.
+
+    Returns:
+        list[int]: IDs of the created records, in input order.
+    """
+    record_table, split_table = Record.__table__, Split.__table__
+    indexes = [*record_table.indexes, *split_table.indexes] if defer_indexes else []
+
+    with session_scope(Session, session) as session:
+        connection = session.connection()
+        _begin_immediate(connection)
+        for index in indexes:
+            index.drop(connection)
+
+        # IDs are allocated up front rather than read back with RETURNING:
+        # ordered RETURNING makes SQLite fall back to one statement per row.
+        # The write lock taken above keeps other writers from allocating them.
+        next_id = (connection.scalar(select(func.max(record_table.c.id))) or 0) + 1
+        record_ids = []
+        for start in range(0, len(records_data), batch_size):
+            batch = records_data[start : start + batch_size]
+            ids = list(range(next_id + start, next_id + start + len(batch)))
+            rows = [
+                {k: v for k, v in data.items() if k != "splits"}
+                if "splits" in data
+                else data
+                for data in batch
+            ]
+            _insert_many(connection, record_table, rows, id=ids)
+
+            splits, split_record_ids = [], []
+            for record_id, data in zip(ids, batch):
+                for split in data.get("splits") or []:
+                    splits.append(split)
+                    split_record_ids.append(record_id)
+            if splits:
+                _insert_many(connection, split_table, splits, recordId=split_record_ids)
+            record_ids.extend(ids)
+
+        for index in indexes:
+            index.create(connection)
+
+        if record_ids:
+            apply_inserted_movements(session, record_ids[0], record_ids[-1])
+            apply_inserted_rollups(session, record_ids[0], record_ids[-1])
+            track_inserted_records(session, record_ids[0], record_ids[-1])
+        return record_ids
 
 
 # region Get
-def get_record_by_id(record_id: int, populate_splits: bool = False):
-    session = Session()
-    try:
+def get_record_by_id(record_id: int, populate_splits: bool = False, session=None):
+    with session_scope(Session, session) as session:
         query = session.query(Record).options(
             joinedload(Record.category), joinedload(Record.account)
         )
@@ -57,17 +193,26 @@ def get_record_by_id(record_id: int, populate_splits: bool = False):
 
         record = query.get(record_id)
         return record
-    finally:
-        session.close()
 
 
-def get_record_total_split_amount(record_id: int):
-    session = Session()
-    try:
-        splits = get_splits_by_record_id(record_id)
-        return sum(split.amount for split in splits)
-    finally:
-        session.close()
+def get_record_total_split_amount(record_id: int, session=None):
+    splits = get_splits_by_record_id(record_id, session)
+    return sum(split.amount for split in splits)
+
+
+# get_records order, and the position of a record in it
+_PAGE_KEY = (Record.dateDay, Record.createdAt, Record.id)
+
+# what the records table shows of each record
+_RECORD_LOADS = (
+    joinedload(Record.category),
+    joinedload(Record.account),
+    joinedload(Record.transferToAccount),
+    # a separate query, so that limit applies to records and not to splits
+    selectinload(Record.splits).options(
+        joinedload(Split.account), joinedload(Split.person)
+    ),
+)
 
 
 def get_records(
@@ -77,22 +222,44 @@ def get_records(
     category_piped_names: str = None,
     operator_amount: str = None,
     label: str = None,
+    limit: int = None,
+    after: tuple = None,
+    until: tuple = None,
+    all_periods: bool = False,
 ):
+    """Gets the records of a period, newest first.
+
+    Records are ordered by (dateDay, createdAt, id), so a period can be read in
+    pages: pass the `get_record_page_key` of the last record of a page as
+    `after` to get the records that follow it.
+
+    Args:
+        limit (int, optional): Return at most this many records.
+        after (tuple, optional): Only return records after this page key.
+        until (tuple, optional): Only return records up to and including this page key.
+        all_periods (bool): Ignore the period and return records of any date. The label is then searched with the full-text index, matching words that start with each of its words.
+    """
     session = Session()
     try:
-        query = session.query(Record).options(
-            joinedload(Record.category),
-            joinedload(Record.account),
-            joinedload(Record.transferToAccount),
-            joinedload(Record.splits).options(
-                joinedload(Split.account), joinedload(Split.person)
-            ),
-        )
+        query = session.query(Record).options(*_RECORD_LOADS)
 
-        start_of_period, end_of_period = get_start_end_of_period(offset, offset_type)
-        query = query.filter(
-            Record.date >= start_of_period, Record.date < end_of_period
-        )
+        if not all_periods:
+            start_of_period, end_of_period = get_start_end_of_period(
+                offset, offset_type
+            )
+            first_day, after_last_day = get_day_range(start_of_period, end_of_period)
+            query = query.filter(Record.dateDay >= first_day)
+            if after is None:
+                query = query.filter(Record.dateDay < after_last_day)
+        if after is not None:
+            # the plain dateDay bound lets SQLite seek the index to the page
+            query = query.filter(
+                Record.dateDay <= after[0], tuple_(*_PAGE_KEY) < _page_key_bound(after)
+            )
+        if until is not None:
+            query = query.filter(
+                Record.dateDay >= until[0], tuple_(*_PAGE_KEY) >= _page_key_bound(until)
+            )
 
         if account_id not in [None, ""]:
             query = query.filter(Record.accountId == account_id)
@@ -106,11 +273,14 @@ def get_records(
             if operator and amount:
                 query = query.filter(Record.amount.op(operator)(amount))
         if label not in [None, ""]:
-            query = query.filter(Record.label.ilike(f"%{label}%"))
+            if all_periods:
+                query = query.filter(label_filter(session, label))
+            else:
+                query = query.filter(Record.label.ilike(f"%{label}%"))
 
-        createdAt_column = getattr(Record, "createdAt")
-        date_column = func.date(getattr(Record, "date"))
-        query = query.order_by(date_column.desc(), createdAt_column.desc())
+        query = query.order_by(*(column.desc() for column in _PAGE_KEY))
+        if limit is not None:
+            query = query.limit(limit)
 
         records = query.all()
         return records
@@ -118,190 +288,290 @@ def get_records(
         session.close()
 
 
-def _get_spending_records(session, start_date, end_date):
-    """Common function to fetch records for spending calculations"""
-    return (
-        session.query(Record)
-        .filter(
-            Record.isIncome == False,  # noqa: E712
-            Record.date >= start_date,
-            Record.date < end_date,
-            Record.isTransfer == False,  # noqa: E712
-        )
-        .options(joinedload(Record.splits))
-        .all()
+def _page_key_bound(page_key: tuple):
+    # typed, so that dates are bound in the format they are stored in
+    return tuple_(
+        *(literal(value, column.type) for column, value in zip(_PAGE_KEY, page_key))
     )
 
 
-def _calculate_daily_spending(records, start_date, end_date, cumulative=False):
-    """Calculate daily spending with optional cumulative sum"""
-    daily_spending = {}
-    for record in records:
-        date_key = record.date.date()
-        splits_sum = sum(split.amount for split in record.splits)
-        actual_spend = record.amount - splits_sum
-        daily_spending[date_key] = daily_spending.get(date_key, 0) + actual_spend
-
-    current_date = start_date.date()
-    end_date_normalized = end_date.date()
-    today = datetime.today().date()
-    result = []
-    running_total = 0
-
-    while current_date <= end_date_normalized:
-        if current_date <= today:
-            daily_amount = daily_spending.get(current_date, 0)
-            if cumulative:
-                running_total += daily_amount
-                result.append(running_total)
-            else:
-                result.append(daily_amount)
-        current_date += timedelta(days=1)
+def get_record_page_key(record) -> tuple:
+    """Returns the position of a record in `get_records` order, for `after`."""
+    return tuple(getattr(record, column.key) for column in _PAGE_KEY)
 
-    return result
 
+def search_records(search: str, limit: int = 50, offset: int = 0):
+    """Searches the labels of records of all periods, best matches first.
 
-def get_spending(start_date, end_date) -> list[float]:
-    """Gets a list of spent amounts for each day in the period, less split amounts of the records"""
+    Each word of the search matches label words that start with it, so
+    "din fri" finds "Dinner with friends". Equally ranked records come newest
+    first.
+
+    Args:
+        search (str): The words to look for.
+        limit (int): Return at most this many records.
+        offset (int): Skip this many of the best matches, to get further pages.
+    """
     session = Session()
     try:
-        records = _get_spending_records(session, start_date, end_date)
-        return _calculate_daily_spending(
-            records, start_date, end_date, cumulative=False
-        )
+        query = session.query(Record).options(*_RECORD_LOADS)
+        newest_first = [column.desc() for column in _PAGE_KEY]
+        if is_label_indexed(session) and get_match_query(search) is not None:
+            query = (
+                query.join(label_fts, label_fts.c.rowid == Record.id)
+                .filter(matches(search))
+                .order_by(label_rank(), *newest_first)
+            )
+        else:
+            query = query.filter(label_filter(session, search)).order_by(*newest_first)
+        return query.limit(limit).offset(offset).all()
     finally:
         session.close()
 
 
-def get_spending_trend(start_date, end_date) -> list[float]:
-    """Gets a cumulative list of spent amounts for each day in the period"""
-    session = Session()
-    try:
-        records = _get_spending_records(session, start_date, end_date)
-        return _calculate_daily_spending(records, start_date, end_date, cumulative=True)
-    finally:
-        session.close()
+@cached
+def get_daily_spending(start_date, end_date) -> np.ndarray:
+    """Gets the amount spent on each day of the period up to today, less split amounts.
+
+    Days are read from the daily rollup, so the cost follows the number of days.
+    """
+    if use_ledger_snapshot():
+        return get_ledger_snapshot().daily_spending(start_date, end_date)
 
+    last_day = min(end_date.date(), datetime.today().date())
+    days = (last_day - start_date.date()).days + 1
+    if days <= 0:
+        return np.zeros(0)
 
-def is_record_all_splits_paid(record_id: int):
     session = Session()
     try:
-        splits = get_splits_by_record_id(record_id)
-        return all(split.isPaid for split in splits)
+        first_day, after_last_day = get_day_range(start_date, end_date)
+        day_spending = session.execute(
+            select(
+                DailyRollup.day,
+                func.sum(DailyRollup.amount - DailyRollup.splitAmount),
+            )
+            .filter(
+                DailyRollup.day >= first_day,
+                DailyRollup.day < after_last_day,
+                DailyRollup.isIncome == False,  # noqa: E712
+                DailyRollup.isTransfer == False,  # noqa: E712
+            )
+            .group_by(DailyRollup.day)
+        ).all()
+
+        spending = np.zeros(days)
+        for day_string, amount in day_spending:
+            index = (date.fromisoformat(day_string) - start_date.date()).days
+            if index < days:
+                spending[index] = amount
+        return spending
     finally:
         session.close()
 
 
-def get_daily_balance(start_date, end_date) -> list[float]:
-    """Gets a list of account balances for each day in the period"""
-    # Calculating net beginning balance
+def get_spending(start_date, end_date) -> list[float]:
+    """Gets a list of spent amounts for each day in the period, less split amounts of the records"""
+    return get_daily_spending(start_date, end_date).tolist()
 
-    # Handle records up till start_date, then process each day one by one.
 
-    # Records.isIncome ? add : subtract
+def get_spending_trend(start_date, end_date) -> list[float]:
+    """Gets a cumulative list of spent amounts for each day in the period"""
+    return np.cumsum(get_daily_spending(start_date, end_date)).tolist()
+
+
+def is_record_all_splits_paid(record_id: int, session=None):
+    splits = get_splits_by_record_id(record_id, session)
+    return all(split.isPaid for split in splits)
+
+
+def _get_outside_source_ids(session) -> list[int]:
+    return session.scalars(
+        select(Account.id).filter(Account.name == "Outside source")
+    ).all()
+
 
-    # for Record.splits => Record.isIncome ? subtract Split.amount : add Split.amount
+def _get_split_totals_subquery():
+    return (
+        select(Split.recordId, func.sum(Split.amount).label("total"))
+        .group_by(Split.recordId)
+        .subquery()
+    )
 
-    # Record.isTransfer ? Record.transferToAccount.name == "Outside source" ? subtract : Record.account.name == "Outside source" ? add : ignore
 
-    # return result
+def _balance_effect_expression(outside_ids, split_totals):
+    """SQL equivalent of a record's effect on the net balance of all accounts.
+
+    - Transfers only matter when money enters or leaves through "Outside source".
+    - Income adds and expenses subtract the record amount less its splits.
+    """
+    split_total = func.coalesce(split_totals.c.total, 0)
+    return case(
+        (
+            Record.isTransfer,
+            case(
+                (Record.transferToAccountId.in_(outside_ids), -Record.amount),
+                (Record.accountId.in_(outside_ids), Record.amount),
+                else_=0,
+            ),
+        ),
+        (Record.isIncome, Record.amount - split_total),
+        else_=split_total - Record.amount,
+    )
+
+
+@cached
+def get_daily_balance(start_date, end_date) -> list[float]:
+    """Gets a list of account balances for each day in the period"""
+    if use_ledger_snapshot():
+        return get_ledger_snapshot().daily_balance(start_date, end_date)
+
+    limit = min(end_date, datetime.today())
+    if limit < start_date:
+        return []
+    days = (limit - start_date).days + 1
+
     session = Session()
     try:
-        accounts = session.query(Account).filter(Account.deletedAt.is_(None)).all()
-        total_balance = sum(a.beginningBalance for a in accounts)
-        old_records = (
-            session.query(Record)
-            .filter(
-                Record.date < start_date, Record.accountId.in_([a.id for a in accounts])
+        accounts = select(Account.id).filter(Account.deletedAt.is_(None))
+        split_totals = _get_split_totals_subquery()
+        effect = _balance_effect_expression(
+            _get_outside_source_ids(session), split_totals
+        )
+
+        def _effect_query(*columns):
+            return (
+                select(*columns)
+                .select_from(Record)
+                .outerjoin(split_totals, split_totals.c.recordId == Record.id)
+                .filter(Record.accountId.in_(accounts))
             )
-            .options(
-                joinedload(Record.splits),
-                joinedload(Record.account),
-                joinedload(Record.transferToAccount),
+
+        # Opening balance: beginning balances plus everything before the window
+        beginning_balance = session.scalar(
+            select(func.coalesce(func.sum(Account.beginningBalance), 0)).filter(
+                Account.deletedAt.is_(None)
             )
-            .all()
         )
-
-        def adjust_balance(r):
-            if r.isTransfer:
-                if r.transferToAccount and r.transferToAccount.name == "Outside source":
-                    return -r.amount
-                if r.account and r.account.name == "Outside source":
-                    return r.amount
-                return 0
-            if r.isIncome:
-                return r.amount - sum(s.amount for s in r.splits)
-            return -r.amount + sum(s.amount for s in r.splits)
-
-        for rec in old_records:
-            total_balance += adjust_balance(rec)
-
-        results = []
-        current = start_date
-        today = datetime.today()
-        while current <= end_date:
-            if current > today:
-                break
-            day_records = (
-                session.query(Record)
-                .filter(
-                    func.date(Record.date) == current.date(),
-                    Record.accountId.in_([a.id for a in accounts]),
-                )
-                .options(
-                    joinedload(Record.splits),
-                    joinedload(Record.account),
-                    joinedload(Record.transferToAccount),
-                )
-                .all()
+        opening_effect = session.scalar(
+            _effect_query(func.coalesce(func.sum(effect), 0)).filter(
+                Record.date < start_date
             )
-            day_effect = sum(adjust_balance(dr) for dr in day_records)
-            total_balance += day_effect
-            results.append(total_balance)
-            current += timedelta(days=1)
-        return results
+        )
+
+        # Per-day deltas inside the window, bucketed by calendar day
+        first_day, after_last_day = get_day_range(
+            start_date, start_date + timedelta(days=days - 1)
+        )
+        day_effects = session.execute(
+            _effect_query(Record.dateDay, func.sum(effect))
+            .filter(Record.dateDay >= first_day, Record.dateDay < after_last_day)
+            .group_by(Record.dateDay)
+        ).all()
+
+        deltas = np.zeros(days)
+        for day_string, amount in day_effects:
+            index = (date.fromisoformat(day_string) - start_date.date()).days
+            deltas[index] = amount
+
+        return (beginning_balance + opening_effect + np.cumsum(deltas)).tolist()
     finally:
         session.close()
 
 
+def verify_daily_rollup(repair=False, session=None) -> dict[tuple, tuple]:
+    """Recomputes the daily rollup from the records and compares it to the stored rows.
+
+    Args:
+        repair (bool): Whether to overwrite the stored rows with the recomputed ones.
+        session (Session, optional): SQLAlchemy session to use. If None, creates a new session.
+
+    Returns:
+        dict: rollup key to (stored, actual) (amount, splitAmount, count), for each row that drifted.
+    """
+    with session_scope(Session, session) as session:
+        key_columns = (
+            DailyRollup.day,
+            DailyRollup.accountId,
+            DailyRollup.categoryId,
+            DailyRollup.isIncome,
+            DailyRollup.isTransfer,
+        )
+        stored = {
+            tuple(row[:5]): tuple(row[5:])
+            for row in session.execute(
+                select(
+                    *key_columns,
+                    DailyRollup.amount,
+                    DailyRollup.splitAmount,
+                    DailyRollup.count,
+                )
+            )
+        }
+        actual = {
+            tuple(row[:5]): tuple(row[5:])
+            for row in session.execute(get_rollup_query())
+        }
+        missing = (0.0, 0.0, 0)
+        drifted = {
+            key: (stored.get(key, missing), actual.get(key, missing))
+            for key in stored.keys() | actual.keys()
+            if not all(
+                isclose(a, b, abs_tol=1e-6)
+                for a, b in zip(stored.get(key, missing), actual.get(key, missing))
+            )
+        }
+
+        if repair and drifted:
+            _refill_daily_rollup(session)
+        return drifted
+
+
+def _refill_daily_rollup(session) -> None:
+    session.execute(delete(DailyRollup))
+    session.execute(
+        insert(DailyRollup).from_select(
+            [column.key for column in DailyRollup.__table__.columns],
+            get_rollup_query(),
+        )
+    )
+
+
+def rebuild_daily_rollup(session=None) -> None:
+    """Fills the daily rollup from scratch, in a single INSERT ... SELECT."""
+    with session_scope(Session, session) as session:
+        _refill_daily_rollup(session)
+
+
 # region Update
-def update_record(record_id: int, updated_data: dict):
-    session = Session()
-    try:
-        record = session.query(Record).get(record_id)
+def update_record(record_id: int, updated_data: dict, session=None):
+    with session_scope(Session, session) as session:
+        record = session.get(Record, record_id)
         if record:
             for key, value in updated_data.items():
                 setattr(record, key, value)
-            session.commit()
+            session.flush()
             session.refresh(record)
-            session.expunge(record)
         return record
-    finally:
-        session.close()
 
 
 def update_record_and_splits(
-    record_id: int, record_data: dict, splits_data: list[dict]
+    record_id: int, record_data: dict, splits_data: list[dict], session=None
 ):
-    session = Session()
-    try:
-        record = update_record(record_id, record_data)
-        record_splits = get_splits_by_record_id(record_id)
+    """Updates a record and its splits in one transaction."""
+    with session_scope(Session, session) as session:
+        record = update_record(record_id, record_data, session)
+        record_splits = get_splits_by_record_id(record_id, session)
         for index, split in enumerate(record_splits):
-            update_split(split.id, splits_data[index])
+            update_split(split.id, splits_data[index], session)
         return record
-    finally:
-        session.close()
 
 
 # region Delete
-def delete_record(record_id: int):
-    session = Session()
-    try:
-        record = session.query(Record).get(record_id)
+def delete_record(record_id: int, session=None):
+    with session_scope(Session, session) as session:
+        record = session.get(Record, record_id)
         if record:
             session.delete(record)
-            session.commit()
+            session.flush()
         return record
-    finally:
-        session.close()
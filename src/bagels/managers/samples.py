@@ -1,17 +1,13 @@
 from pathlib import Path
 import yaml
 
+from bagels.managers.records import bulk_create_records
 from bagels.models.account import Account
-from bagels.models.database.app import db_engine
+from bagels.models.database.app import Session
 from bagels.models.person import Person
-from bagels.models.record import Record
 from bagels.models.record_template import RecordTemplate
-from bagels.models.split import Split
-from sqlalchemy.orm import sessionmaker
 from sqlalchemy import select, func
 
-Session = sessionmaker(bind=db_engine)
-
 
 def create_sample_entries():
     yaml_path = Path(__file__).parent.parent / "static" / "sample_entries.yaml"
@@ -38,16 +34,7 @@ def create_sample_entries():
             people[person.id] = person
 
         # Create records
-        for record_data in sample_entries["records"]:
-            splits_data = record_data.pop("splits", None)
-            record = Record(**record_data)
-            session.add(record)
-            session.flush()
-
-            if splits_data:
-                for split_data in splits_data:
-                    split = Split(recordId=record.id, **split_data)
-                    session.add(split)
+        bulk_create_records(sample_entries["records"], session=session)
 
         # Create record templates
         for template_data in sample_entries["record_templates"]:
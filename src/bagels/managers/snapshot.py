@@ -0,0 +1,455 @@
+"""In-memory columnar copy of the ledger for analytics.
+
+`LedgerSnapshot` loads every record once into NumPy arrays, one per field,
+with split amounts pre-summed per record, and answers the period figure,
+category breakdown, daily spending and daily balance queries with vectorized
+operations instead of SQL. Records are bucketed by calendar day.
+
+Each snapshot keeps a journal of the records, categories and accounts changed
+by committed ORM flushes (and by `bulk_create_records`), and applies it before
+answering, reloading only the changed records. Writes that bypass both must
+call `invalidate()`.
+
+A million records take about 50 MB.
+"""
+
+import threading
+import weakref
+from datetime import date, datetime
+
+import numpy as np
+from sqlalchemy import Integer, cast, event, func, inspect, select
+from sqlalchemy.orm import Session as OrmSession
+
+from bagels.config import CONFIG
+from bagels.managers.utils import get_start_end_of_period
+from bagels.models.account import Account
+from bagels.models.category import Category, Nature
+from bagels.models.database.app import Session
+from bagels.models.record import Record
+from bagels.models.split import Split
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_NATURES = list(Nature)
+_FETCH_SIZE = 100_000
+_RELOAD_CHUNK = 5000
+# Above this share of changed records, a full reload is cheaper
+_FULL_RELOAD_RATIO = 0.2
+
+_RECORD_COLUMNS = [
+    ("id", np.int64),
+    ("day", np.int32),
+    ("amount", np.float64),
+    ("account_id", np.int32),
+    ("category_id", np.int32),
+    ("is_income", np.bool_),
+    ("is_transfer", np.bool_),
+    ("transfer_to", np.int32),
+    ("split_sum", np.float64),
+]
+_RECORD_DTYPE = np.dtype(_RECORD_COLUMNS)
+
+
+def day_number(value: date | datetime) -> int:
+    """Days since 1970-01-01, the unit of `LedgerSnapshot.day`."""
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.toordinal() - _EPOCH_ORDINAL
+
+
+def _lookup(table: np.ndarray, ids: np.ndarray, missing):
+    """Indexes `table` by `ids`, with `missing` for negative ids."""
+    values = np.full(len(ids), missing, dtype=table.dtype)
+    present = ids >= 0
+    values[present] = table[ids[present]]
+    return values
+
+
+# ---------- Change journal ---------- #
+
+_snapshots = weakref.WeakSet()
+
+
+class _Changes:
+    def __init__(self):
+        self.record_ids = set()
+        self.categories = False
+        self.accounts = False
+
+    def merge(self, other: "_Changes"):
+        self.record_ids |= other.record_ids
+        self.categories |= other.categories
+        self.accounts |= other.accounts
+
+    def __bool__(self):
+        return bool(self.record_ids or self.categories or self.accounts)
+
+
+def _session_changes(session) -> _Changes:
+    return session.info.setdefault("snapshot_changes", _Changes())
+
+
+def track_inserted_records(session, first_id: int, last_id: int) -> None:
+    """Journals records inserted outside the ORM, by their (inclusive) ID range."""
+    _session_changes(session).record_ids.update(range(first_id, last_id + 1))
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _track_flushed_changes(session, flush_context):
+    if not _snapshots:
+        return
+    changes = _session_changes(session)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Record):
+            changes.record_ids.add(obj.id)
+        elif isinstance(obj, Split):
+            history = inspect(obj).attrs.recordId.history
+            changes.record_ids.update(
+                record_id
+                for record_id in (obj.recordId, *history.deleted)
+                if record_id is not None
+            )
+        elif isinstance(obj, Category):
+            changes.categories = True
+        elif isinstance(obj, Account):
+            changes.accounts = True
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _publish_changes(session):
+    changes = session.info.pop("snapshot_changes", None)
+    if changes:
+        for snapshot in list(_snapshots):
+            snapshot._journal(changes)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("snapshot_changes", None)
+
+
+# ------------- Snapshot ------------- #
+
+
+class LedgerSnapshot:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._pending = _Changes()
+        self._loaded = False
+        _snapshots.add(self)
+
+    def _journal(self, changes: _Changes):
+        with self._lock:
+            self._pending.merge(changes)
+
+    # region Load
+    def load(self) -> "LedgerSnapshot":
+        """Loads the whole ledger, discarding any journaled changes."""
+        with self._lock:
+            self._pending = _Changes()
+            session = Session()
+            try:
+                self._load_categories(session)
+                self._load_accounts(session)
+                self._set_records(self._fetch_records(session))
+            finally:
+                session.close()
+            self._loaded = True
+        return self
+
+    def invalidate(self):
+        """Forces a full reload on next use, after writes the journal cannot see."""
+        with self._lock:
+            self._loaded = False
+
+    def refresh(self) -> "LedgerSnapshot":
+        """Applies the journaled changes, reloading only the changed records."""
+        with self._lock:
+            if not self._loaded:
+                return self.load()
+            if not self._pending:
+                return self
+            changes, self._pending = self._pending, _Changes()
+            if len(changes.record_ids) > _FULL_RELOAD_RATIO * max(len(self.id), 1):
+                return self.load()
+
+            session = Session()
+            try:
+                if changes.categories:
+                    self._load_categories(session)
+                if changes.accounts:
+                    self._load_accounts(session)
+                if changes.record_ids:
+                    self._reload_records(session, sorted(changes.record_ids))
+                if changes.categories:
+                    self._set_parent_categories()
+            finally:
+                session.close()
+        return self
+
+    def _records_query(self, record_ids=None):
+        split_totals = select(Split.recordId, func.sum(Split.amount).label("total"))
+        if record_ids is not None:
+            split_totals = split_totals.filter(Split.recordId.in_(record_ids))
+        split_totals = split_totals.group_by(Split.recordId).subquery()
+        stmt = (
+            select(
+                Record.id,
+                cast(func.julianday(Record.dateDay) - 2440587.5, Integer),
+                Record.amount,
+                Record.accountId,
+                func.coalesce(Record.categoryId, -1),
+                Record.isIncome,
+                Record.isTransfer,
+                func.coalesce(Record.transferToAccountId, -1),
+                func.coalesce(split_totals.c.total, 0.0),
+            )
+            .outerjoin(split_totals, split_totals.c.recordId == Record.id)
+            .order_by(Record.id)
+        )
+        if record_ids is not None:
+            stmt = stmt.filter(Record.id.in_(record_ids))
+        return stmt
+
+    def _fetch_records(self, session, stmt=None) -> np.ndarray:
+        # Rows are read from the driver cursor as plain tuples, in chunks, so
+        # no per-row Python objects outlive a chunk
+        connection = session.connection()
+        compiled = (stmt if stmt is not None else self._records_query()).compile(
+            dialect=connection.dialect, compile_kwargs={"render_postcompile": True}
+        )
+        params = compiled.construct_params()
+        cursor = connection.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(
+                str(compiled), [params[name] for name in compiled.positiontup]
+            )
+            chunks = []
+            while rows := cursor.fetchmany(_FETCH_SIZE):
+                chunks.append(np.array(rows, dtype=_RECORD_DTYPE))
+        finally:
+            cursor.close()
+        if not chunks:
+            return np.zeros(0, dtype=_RECORD_DTYPE)
+        return np.concatenate(chunks)
+
+    def _set_records(self, rows: np.ndarray):
+        for name, _ in _RECORD_COLUMNS:
+            setattr(self, name, np.ascontiguousarray(rows[name]))
+        self._set_parent_categories()
+
+    def _reload_records(self, session, record_ids: list[int]):
+        reloaded = [
+            self._fetch_records(
+                session,
+                self._records_query(record_ids[start : start + _RELOAD_CHUNK]),
+            )
+            for start in range(0, len(record_ids), _RELOAD_CHUNK)
+        ]
+        reloaded = np.concatenate(reloaded)
+
+        # Edited records are overwritten in place; the arrays are only rebuilt
+        # when records were added or deleted
+        positions = np.searchsorted(self.id, reloaded["id"])
+        found = positions < len(self.id)
+        found[found] = self.id[positions[found]] == reloaded["id"][found]
+        edited = reloaded[found]
+        for name, _ in _RECORD_COLUMNS:
+            getattr(self, name)[positions[found]] = edited[name]
+        self.parent_category_id[positions[found]] = _lookup(
+            self.category_parent, edited["category_id"], -1
+        )
+
+        added = reloaded[~found]
+        deleted = np.setdiff1d(np.array(record_ids, dtype=np.int64), reloaded["id"])
+        if len(added) or len(deleted):
+            keep = ~np.isin(self.id, deleted)
+            rows = np.empty(np.count_nonzero(keep) + len(added), dtype=_RECORD_DTYPE)
+            for name, _ in _RECORD_COLUMNS:
+                rows[name] = np.concatenate([getattr(self, name)[keep], added[name]])
+            # New IDs are usually above every loaded one, keeping the order
+            if len(added) and np.any(np.diff(rows["id"]) <= 0):
+                rows = rows[np.argsort(rows["id"], kind="stable")]
+            self._set_records(rows)
+
+    def _load_categories(self, session):
+        rows = session.execute(
+            select(
+                Category.id,
+                Category.parentCategoryId,
+                Category.nature,
+                Category.deletedAt,
+            )
+        ).all()
+        size = max((row.id for row in rows), default=0) + 1
+        self.category_parent = np.full(size, -1, dtype=np.int32)
+        self.category_nature = np.full(size, -1, dtype=np.int8)
+        self.category_deleted = np.ones(size, dtype=np.bool_)
+        for category_id, parent_id, nature, deleted_at in rows:
+            self.category_parent[category_id] = -1 if parent_id is None else parent_id
+            self.category_nature[category_id] = _NATURES.index(nature)
+            self.category_deleted[category_id] = deleted_at is not None
+
+    def _load_accounts(self, session):
+        rows = session.execute(
+            select(
+                Account.id, Account.name, Account.beginningBalance, Account.deletedAt
+            )
+        ).all()
+        size = max((row.id for row in rows), default=0) + 1
+        self.account_live = np.zeros(size, dtype=np.bool_)
+        self.account_outside = np.zeros(size, dtype=np.bool_)
+        self.account_beginning = np.zeros(size, dtype=np.float64)
+        for account_id, name, beginning, deleted_at in rows:
+            self.account_live[account_id] = deleted_at is None
+            self.account_outside[account_id] = name == "Outside source"
+            self.account_beginning[account_id] = beginning
+
+    def _set_parent_categories(self):
+        self.parent_category_id = _lookup(
+            self.category_parent, self.category_id, -1
+        ).astype(np.int32)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the record arrays."""
+        return sum(
+            getattr(self, name).nbytes
+            for name in (*dict(_RECORD_COLUMNS), "parent_category_id")
+        )
+
+    def __len__(self):
+        return len(self.id)
+
+    # region Queries
+    def _period_mask(self, offset_type=None, offset=None, account_id=None):
+        mask = np.ones(len(self.id), dtype=np.bool_)
+        if offset_type is not None and offset is not None:
+            start, end = get_start_end_of_period(offset, offset_type)
+            mask &= (self.day >= day_number(start)) & (self.day <= day_number(end))
+        if account_id is not None:
+            mask &= self.account_id == account_id
+        return mask
+
+    def _net_amount(self, mask) -> np.ndarray:
+        return self.amount[mask] - self.split_sum[mask]
+
+    def period_figures(
+        self, accountId=None, offset_type=None, offset=None, isIncome=None, nature=None
+    ) -> float:
+        """Same as `managers.utils.get_period_figures`."""
+        with self._lock:
+            mask = self._period_mask(offset_type, offset, accountId)
+            if nature is not None:
+                natures = _lookup(self.category_nature, self.category_id, -1)
+                mask &= natures == _NATURES.index(nature)
+            if isIncome is not None:
+                mask &= ~self.is_transfer & (self.is_income == isIncome)
+
+            net = self._net_amount(mask)
+            signed = np.where(
+                self.is_transfer[mask], 0.0, np.where(self.is_income[mask], net, -net)
+            )
+            total = float(signed.sum())
+        return abs(round(total, CONFIG.defaults.round_decimals))
+
+    def category_totals(
+        self,
+        offset: int = 0,
+        offset_type: str = "month",
+        is_income: bool = True,
+        subcategories: bool = False,
+        account_id: int = None,
+    ) -> list[tuple[int, float]]:
+        """(category ID, net total) pairs as in `get_all_categories_records`, largest first."""
+        with self._lock:
+            mask = self._period_mask(offset_type, offset, account_id)
+            mask &= self.is_income == is_income
+            if subcategories:
+                groups = self.category_id
+            else:
+                groups = np.where(
+                    self.parent_category_id >= 0,
+                    self.parent_category_id,
+                    self.category_id,
+                )
+            mask &= groups >= 0
+            totals = np.bincount(
+                groups[mask],
+                weights=self._net_amount(mask),
+                minlength=len(self.category_deleted),
+            )
+            category_ids = np.flatnonzero((totals != 0) & ~self.category_deleted)
+            order = np.lexsort((category_ids, -totals[category_ids]))
+            return [
+                (int(category_id), float(totals[category_id]))
+                for category_id in category_ids[order]
+            ]
+
+    def daily_spending(self, start_date, end_date) -> np.ndarray:
+        """Same as `managers.records.get_daily_spending`."""
+        first_day = day_number(start_date)
+        last_day = min(day_number(end_date), day_number(datetime.today()))
+        days = last_day - first_day + 1
+        if days <= 0:
+            return np.zeros(0)
+        with self._lock:
+            mask = ~self.is_income & ~self.is_transfer
+            mask &= (self.day >= first_day) & (self.day <= last_day)
+            return np.bincount(
+                self.day[mask] - first_day,
+                weights=self._net_amount(mask),
+                minlength=days,
+            )
+
+    def daily_balance(self, start_date, end_date) -> list[float]:
+        """Same as `managers.records.get_daily_balance`."""
+        first_day = day_number(start_date)
+        last_day = min(day_number(end_date), day_number(datetime.today()))
+        days = last_day - first_day + 1
+        if days <= 0 or start_date > datetime.today():
+            return []
+        with self._lock:
+            mask = _lookup(self.account_live, self.account_id, False)
+            net = self.amount - self.split_sum
+            transfer_effect = np.where(
+                _lookup(self.account_outside, self.transfer_to, False),
+                -self.amount,
+                np.where(
+                    _lookup(self.account_outside, self.account_id, False),
+                    self.amount,
+                    0.0,
+                ),
+            )
+            effect = np.where(
+                self.is_transfer,
+                transfer_effect,
+                np.where(self.is_income, net, -net),
+            )
+
+            opening = self.account_beginning[self.account_live].sum()
+            opening += effect[mask & (self.day < first_day)].sum()
+            in_window = mask & (self.day >= first_day) & (self.day <= last_day)
+            deltas = np.bincount(
+                self.day[in_window] - first_day,
+                weights=effect[in_window],
+                minlength=days,
+            )
+        return (opening + np.cumsum(deltas)).tolist()
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def use_ledger_snapshot() -> bool:
+    return CONFIG.analytics.ledger_snapshot
+
+
+def get_ledger_snapshot() -> LedgerSnapshot:
+    """The shared snapshot, loaded on first use and brought up to date on every call."""
+    global _snapshot
+    with _snapshot_lock:
+        if _snapshot is None:
+            _snapshot = LedgerSnapshot()
+    return _snapshot.refresh()
@@ -1,68 +1,49 @@
-from sqlalchemy.orm import sessionmaker
+from bagels.managers.utils import session_scope
+from bagels.models.database.app import Session
 from bagels.models.split import Split
-from bagels.models.database.app import db_engine
 
-Session = sessionmaker(bind=db_engine)
 
-
-def create_split(data):
-    session = Session()
-    try:
+def create_split(data, session=None):
+    with session_scope(Session, session) as session:
         new_split = Split(**data)
         session.add(new_split)
-        session.commit()
+        session.flush()
         session.refresh(new_split)
-        session.expunge(new_split)
         return new_split
-    finally:
-        session.close()
 
 
-def get_splits_by_record_id(record_id):
-    session = Session()
-    try:
+def get_splits_by_record_id(record_id, session=None):
+    with session_scope(Session, session) as session:
         return session.query(Split).filter_by(recordId=record_id).all()
-    finally:
-        session.close()
 
 
-def get_split_by_id(split_id):
-    session = Session()
-    try:
-        return session.query(Split).get(split_id)
-    finally:
-        session.close()
+def get_split_by_id(split_id, session=None):
+    with session_scope(Session, session) as session:
+        return session.get(Split, split_id)
 
 
-def update_split(split_id, updated_data):
-    session = Session()
-    try:
-        split = session.query(Split).get(split_id)
+def update_split(split_id, updated_data, session=None):
+    with session_scope(Session, session) as session:
+        split = session.get(Split, split_id)
         if split:
             for key, value in updated_data.items():
                 setattr(split, key, value)
-            session.commit()
+            session.flush()
         return split
-    finally:
-        session.close()
 
 
-def delete_split(split_id):
-    session = Session()
-    try:
-        split = session.query(Split).get(split_id)
+def delete_split(split_id, session=None):
+    with session_scope(Session, session) as session:
+        split = session.get(Split, split_id)
         if split:
             session.delete(split)
-            session.commit()
+            session.flush()
         return split
-    finally:
-        session.close()
 
 
-def delete_splits_by_record_id(record_id):
-    session = Session()
-    try:
-        session.query(Split).filter_by(recordId=record_id).delete()
-        session.commit()
-    finally:
-        session.close()
+def delete_splits_by_record_id(record_id, session=None):
+    with session_scope(Session, session) as session:
+        # Delete through the ORM so flush listeners keep derived data in sync
+        for split in session.query(Split).filter_by(recordId=record_id).all():
+            session.delete(split)
+        session.flush()
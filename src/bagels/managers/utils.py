@@ -1,20 +1,56 @@
 import re
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from functools import lru_cache
 
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import case, func, select
 from textual.widget import Widget
 
 from bagels.config import CONFIG
+from bagels.managers.cache import cached
 from bagels.models.category import Category
-from bagels.models.database.app import db_engine
-from bagels.models.record import Record
-
-Session = sessionmaker(bind=db_engine)
+from bagels.models.database.app import Session
+from bagels.models.daily_rollup import DailyRollup
 
 # --------------- query -------------- #
 
 
+@contextmanager
+def session_scope(session_factory, session=None):
+    """Yields `session` if given, otherwise a new session committed and closed on exit.
+
+    Manager functions accept an optional session and open it through this, so
+    callers can pass the session of a `unit_of_work` to defer the commit.
+    """
+    if session is not None:
+        yield session
+        return
+
+    session = session_factory(expire_on_commit=False)
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+@contextmanager
+def unit_of_work():
+    """Groups manager calls into one transaction, committed when the block exits.
+
+    Example:
+        with unit_of_work() as session:
+            record = create_record(record_data, session=session)
+            create_split({**split_data, "recordId": record.id}, session=session)
+
+    If any call raises, nothing inside the block is written.
+    """
+    with session_scope(Session) as session:
+        yield session
+
+
 def try_method_query_one(widget: Widget, query: str, method: str, params):
     try:
         widget = widget.query_one(query)
@@ -87,10 +123,22 @@ def get_start_end_of_period(offset: int = 0, offset_type: str = "month"):
             return _get_start_end_of_day(offset)
 
 
+def get_day_range(start_date: datetime, end_date: datetime) -> tuple[str, str]:
+    """Returns the half-open range [first day, day after last day) covering both dates.
+
+    Days are YYYY-MM-DD strings comparable against the indexed Record.dateDay column.
+    """
+    return (
+        start_date.date().isoformat(),
+        (end_date.date() + timedelta(days=1)).isoformat(),
+    )
+
+
 # region figure
 # -------------- figure -------------- #
 
 
+@cached
 def get_period_figures(
     accountId=None,
     offset_type=None,
@@ -102,7 +150,7 @@ def get_period_figures(
     """Returns the income / expense for a given period.
 
     Rules:
-    - Filter applies to records only by the "date" column, and splits should always be considered by their associated record.
+    - Filter applies to records only by the calendar day of the "date" column, and splits should always be considered by their associated record.
     - Income and expenses should be calculated from record less their splits, regardless of the account of the split.
     - Transfers are not income or expenses, but should be included in the net total.
 
@@ -114,6 +162,14 @@ def get_period_figures(
         nature (Nature): Filter by category nature (Want/Need/Must). (Optional)
         session (Session, optional): SQLAlchemy session to use. If None, creates a new session.
     """
+    # imported here as the snapshot module builds on this one
+    from bagels.managers.snapshot import get_ledger_snapshot, use_ledger_snapshot
+
+    if session is None and use_ledger_snapshot():
+        return get_ledger_snapshot().period_figures(
+            accountId, offset_type, offset, isIncome, nature
+        )
+
     if session is None:
         session = Session()
         should_close = True
@@ -121,49 +177,49 @@ def get_period_figures(
         should_close = False
 
     try:
-        query = session.query(Record)
+        # Records are summed per day from the daily rollup, so the cost
+        # follows the number of days in the period, not of records
+        conditions = []
 
         # Filter by account if specified
         if accountId is not None:
-            query = query.filter(Record.accountId == accountId)
+            conditions.append(DailyRollup.accountId == accountId)
 
         # Filter by date period if specified
         if offset_type is not None and offset is not None:
             start_of_period, end_of_period = get_start_end_of_period(
                 offset, offset_type
             )
-            query = query.filter(
-                Record.date >= start_of_period, Record.date < end_of_period
-            )
+            first_day, after_last_day = get_day_range(start_of_period, end_of_period)
+            conditions += [
+                DailyRollup.day >= first_day,
+                DailyRollup.day < after_last_day,
+            ]
 
         # Filter by category nature if specified
         if nature is not None:
-            query = query.join(Record.category).filter(Category.nature == nature)
-
-        # Calculate net amount
-        total = 0
-        records = query.all()
-
-        for record in records:
-            # Skip records that are marked as transfers if filtering by income type
-            if isIncome is not None and record.isTransfer:
-                continue
-
-            # Skip records that don't match income filter if specified
-            if isIncome is not None and record.isIncome != isIncome:
-                continue
-
-            # Calculate amount after subtracting splits
-            split_total = sum(split.amount for split in record.splits)
-            record_amount = record.amount - split_total
+            conditions.append(
+                DailyRollup.categoryId.in_(
+                    select(Category.id).filter(Category.nature == nature)
+                )
+            )
 
-            if not record.isTransfer:
-                # For regular income/expenses
-                if record.isIncome:
-                    total += record_amount
-                else:
-                    total -= record_amount
+        # Transfers are not income or expenses
+        if isIncome is not None:
+            conditions += [
+                DailyRollup.isTransfer == False,  # noqa: E712
+                DailyRollup.isIncome == isIncome,
+            ]
+
+        net_amount = DailyRollup.amount - DailyRollup.splitAmount
+        signed_amount = case(
+            (DailyRollup.isTransfer, 0),
+            (DailyRollup.isIncome, net_amount),
+            else_=-net_amount,
+        )
+        query = select(func.coalesce(func.sum(signed_amount), 0)).filter(*conditions)
 
+        total = session.scalar(query)
         return abs(round(total, CONFIG.defaults.round_decimals))
     finally:
         if should_close:
@@ -232,11 +288,3 @@ def get_income_to_use(offset: int):
         limit = fallback
 
     return limit
-
-
-def dynamic_cache(func, *args, **kwargs):
-    # Create a cached version of the function
-    cached_func = lru_cache()(func)
-    # Call the cached version with the provided arguments
-    result = cached_func(*args, **kwargs)
-    return result
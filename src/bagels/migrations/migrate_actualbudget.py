@@ -1,6 +1,10 @@
 import sqlite3
 from datetime import datetime
 
+# Rows are written in the format SQLAlchemy uses for DateTime columns
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+BATCH_SIZE = 5000
+
 
 def convert_date(date_str):
     """Convert YYYYMMDD to datetime with time set to 12:00 PM"""
@@ -18,13 +22,14 @@ def convert_date(date_str):
 
 def ensure_default_category(bagels_cur):
     """Create or get default category for uncategorized transactions."""
+    now = datetime.now().strftime(DATETIME_FORMAT)
     bagels_cur.execute(
         """
         INSERT OR IGNORE INTO category (
             createdAt, updatedAt, name, nature, color, parentCategoryId
         ) VALUES (?, ?, ?, ?, ?, ?)
     """,
-        (datetime.now(), datetime.now(), "Uncategorized", "WANT", "#808080", None),
+        (now, now, "Uncategorized", "WANT", "#808080", None),
     )
 
     default_category = bagels_cur.execute("""
@@ -45,6 +50,12 @@ class BudgetToBagelsMigration:
         self.category_map = {}
         self.account_map = {}
         self.default_category_id = None
+        self.now = datetime.now().strftime(DATETIME_FORMAT)
+
+    def _next_id(self, table):
+        """First free ID of a table. IDs are assigned here so rows can be batched."""
+        max_id = self.bagels_cur.execute(f"SELECT MAX(id) FROM {table}").fetchone()[0]
+        return (max_id or 0) + 1
 
     def migrate_accounts(self):
         accounts = self.budget_cur.execute("""
@@ -52,28 +63,35 @@ class BudgetToBagelsMigration:
             FROM accounts WHERE tombstone = 0
         """).fetchall()
 
+        next_id = self._next_id("account")
+        rows = []
         for acc_id, name, balance, official_name, offbudget, closed in accounts:
             # Convert cents to dollars
             balance_float = float(balance or 0) / 100
             description = official_name if official_name is not None else ""
 
-            self.bagels_cur.execute(
-                """
-                INSERT INTO account (createdAt, updatedAt, name, description, 
-                                   beginningBalance, hidden)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """,
+            self.account_map[acc_id] = next_id
+            rows.append(
                 (
-                    datetime.now(),
-                    datetime.now(),
+                    next_id,
+                    self.now,
+                    self.now,
                     name or "",
                     description,
                     balance_float,
                     bool(offbudget or closed),
-                ),
+                )
             )
+            next_id += 1
 
-            self.account_map[acc_id] = self.bagels_cur.lastrowid
+        self.bagels_cur.executemany(
+            """
+            INSERT INTO account (id, createdAt, updatedAt, name, description, 
+                               beginningBalance, hidden)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+            rows,
+        )
 
     def migrate_categories(self):
         self.default_category_id = ensure_default_category(self.bagels_cur)
@@ -82,106 +100,118 @@ class BudgetToBagelsMigration:
             SELECT id, name, is_income 
             FROM category_groups WHERE tombstone = 0
         """).fetchall()
+        categories_by_group = {}
+        for cat_id, cat_name, cat_is_income, group_id in self.budget_cur.execute("""
+            SELECT id, name, is_income, cat_group
+            FROM categories WHERE tombstone = 0
+        """):
+            categories_by_group.setdefault(group_id, []).append(
+                (cat_id, cat_name, cat_is_income)
+            )
 
+        next_id = self._next_id("category")
+        rows = []
         for group_id, name, is_income in groups:
-            self.bagels_cur.execute(
-                """
-                INSERT INTO category (createdAt, updatedAt, name, nature, color,
-                                    parentCategoryId)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """,
+            parent_id = next_id
+            next_id += 1
+            rows.append(
                 (
-                    datetime.now(),
-                    datetime.now(),
+                    parent_id,
+                    self.now,
+                    self.now,
                     name or "",
                     "MUST" if is_income else "WANT",
                     "#808080",
                     None,
-                ),
+                )
             )
-            parent_id = self.bagels_cur.lastrowid
 
-            categories = self.budget_cur.execute(
-                """
-                SELECT id, name, is_income 
-                FROM categories 
-                WHERE cat_group = ? AND tombstone = 0
-            """,
-                (group_id,),
-            ).fetchall()
-
-            for cat_id, cat_name, cat_is_income in categories:
-                self.bagels_cur.execute(
-                    """
-                    INSERT INTO category (createdAt, updatedAt, name, nature,
-                                        color, parentCategoryId)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """,
+            for cat_id, cat_name, cat_is_income in categories_by_group.get(
+                group_id, []
+            ):
+                self.category_map[cat_id] = next_id
+                rows.append(
                     (
-                        datetime.now(),
-                        datetime.now(),
+                        next_id,
+                        self.now,
+                        self.now,
                         cat_name or "",
                         "MUST" if cat_is_income else "WANT",
                         "#808080",
                         parent_id,
-                    ),
+                    )
                 )
-                self.category_map[cat_id] = self.bagels_cur.lastrowid
-
-    def migrate_transactions(self):
-        transactions = self.budget_cur.execute("""
-            SELECT id, account, category, amount, date, 
-                   starting_balance_flag, transfer_id, is_parent
-            FROM v_transactions_internal 
-            WHERE tombstone = 0 AND is_child = 0
-            AND (transfer_id IS NULL OR amount >= 0)
-        """).fetchall()
+                next_id += 1
 
-        for (
-            trans_id,
-            account_id,
-            category_id,
-            amount,
-            date,
-            is_starting_balance,
-            transfer_id,
-            is_parent,
-        ) in transactions:
-            if account_id not in self.account_map:
-                continue
-
-            transaction_date = convert_date(date)
-
-            amount_float = abs(float(amount or 0) / 100)
-            if amount_float == 0:
-                continue
-
-            account_bagels_id = self.account_map[account_id]
-            category_bagels_id = self.category_map.get(
-                category_id, self.default_category_id
-            )
+        self.bagels_cur.executemany(
+            """
+            INSERT INTO category (id, createdAt, updatedAt, name, nature, color,
+                                parentCategoryId)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+            rows,
+        )
 
-            category_info = self.budget_cur.execute(
-                """
-                SELECT is_income FROM categories WHERE id = ?
-            """,
-                (category_id,),
-            ).fetchone()
-            is_income = category_info[0] if category_info else 0
-
-            transfer_to_account_id = None
-            is_transfer = bool(transfer_id)
-            if transfer_id:
-                transfer_account = self.budget_cur.execute(
-                    """
-                    SELECT account FROM v_transactions_internal WHERE id = ?
-                """,
-                    (transfer_id,),
-                ).fetchone()
-                if transfer_account and transfer_account[0] in self.account_map:
-                    transfer_to_account_id = self.account_map[transfer_account[0]]
-
-            self.bagels_cur.execute(
+    def migrate_transactions(self, on_progress=None):
+        condition = """
+            WHERE t.tombstone = 0 AND t.is_child = 0
+            AND (t.transfer_id IS NULL OR t.amount >= 0)
+        """
+        total = self.budget_cur.execute(
+            f"SELECT COUNT(*) FROM v_transactions_internal t {condition}"
+        ).fetchone()[0]
+
+        # Category income flags and transfer counterparts are joined in,
+        # instead of looked up per transaction
+        transactions = self.budget_cur.execute(f"""
+            SELECT t.account, t.category, t.amount, t.date,
+                   t.transfer_id, c.is_income, transfer.account
+            FROM v_transactions_internal t
+            LEFT JOIN categories c ON c.id = t.category
+            LEFT JOIN v_transactions_internal transfer ON transfer.id = t.transfer_id
+            {condition}
+        """)
+
+        dates = {}  # budgets repeat the same dates, so format each once
+        done = 0
+        while batch := transactions.fetchmany(BATCH_SIZE):
+            rows = []
+            for (
+                account_id,
+                category_id,
+                amount,
+                date,
+                transfer_id,
+                is_income,
+                transfer_account_id,
+            ) in batch:
+                if account_id not in self.account_map:
+                    continue
+
+                amount_float = abs(float(amount or 0) / 100)
+                if amount_float == 0:
+                    continue
+
+                rows.append(
+                    (
+                        self.now,
+                        self.now,
+                        "Imported transaction",
+                        amount_float,
+                        dates.get(date)
+                        or dates.setdefault(
+                            date, convert_date(date).strftime(DATETIME_FORMAT)
+                        ),
+                        self.account_map[account_id],
+                        self.category_map.get(category_id, self.default_category_id),
+                        bool(is_income),
+                        bool(transfer_id),
+                        self.account_map.get(transfer_account_id),
+                        False,
+                    )
+                )
+
+            self.bagels_cur.executemany(
                 """
                 INSERT INTO record (
                     createdAt, updatedAt, label, amount, date,
@@ -189,20 +219,11 @@ class BudgetToBagelsMigration:
                     transferToAccountId, isInProgress
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
-                (
-                    datetime.now(),
-                    datetime.now(),
-                    "Imported transaction",
-                    amount_float,
-                    transaction_date,
-                    account_bagels_id,
-                    category_bagels_id,
-                    bool(is_income),
-                    is_transfer,
-                    transfer_to_account_id,
-                    False,
-                ),
+                rows,
             )
+            done += len(batch)
+            if on_progress:
+                on_progress(done, total)
 
     def verify_and_fix_categories(self):
         """Verify all records have valid categories and fix any issues"""
@@ -227,12 +248,47 @@ class BudgetToBagelsMigration:
                 f"Found {null_categories} records with NULL categories after fix"
             )
 
-    def migrate(self):
+    def _drop_indexes(self, table):
+        """Drops a table's indexes, returning the statements that recreate them.
+
+        Rebuilding an index once after a bulk load is cheaper than updating it
+        for every inserted row.
+        """
+        indexes = self.bagels_cur.execute(
+            "SELECT name, sql FROM sqlite_master "
+            "WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+            (table,),
+        ).fetchall()
+        for name, _ in indexes:
+            self.bagels_cur.execute(f'DROP INDEX "{name}"')
+        return [sql for _, sql in indexes]
+
+    def _set_pragmas(self, **pragmas):
+        """Sets SQLite pragmas on the Bagels connection, returning their previous values."""
+        previous = {}
+        for name, value in pragmas.items():
+            previous[name] = self.bagels_cur.execute(f"PRAGMA {name}").fetchone()[0]
+            # Fetched so the statement is finalized before the connection closes
+            self.bagels_cur.execute(f"PRAGMA {name} = {value}").fetchall()
+        return previous
+
+    def migrate(self, on_progress=None):
+        """Runs the whole migration in one transaction.
+
+        Args:
+            on_progress (Callable[[int, int], None], optional): Called with (done, total) transactions after each batch.
+        """
+        # Bulk-load mode: no fsync, and an in-memory rollback journal. The
+        # journal is kept (rather than turned off) so a failure still rolls back.
+        previous = self._set_pragmas(synchronous="OFF", journal_mode="MEMORY")
         self.bagels_conn.execute("BEGIN TRANSACTION")
         try:
             self.migrate_accounts()
             self.migrate_categories()
-            self.migrate_transactions()
+            record_indexes = self._drop_indexes("record")
+            self.migrate_transactions(on_progress)
+            for sql in record_indexes:
+                self.bagels_cur.execute(sql)
             self.verify_and_fix_categories()
             self.bagels_conn.commit()
             print("Migration completed successfully!")
@@ -240,6 +296,7 @@ class BudgetToBagelsMigration:
             self.bagels_conn.rollback()
             raise e
         finally:
+            self._set_pragmas(**previous)
             self.budget_conn.close()
             self.bagels_conn.close()
 
@@ -0,0 +1,173 @@
+from sqlalchemy import (
+    Column,
+    Float,
+    ForeignKey,
+    Integer,
+    case,
+    event,
+    func,
+    select,
+    union_all,
+)
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from .database.db import Base
+from .record import Record
+from .split import Split
+
+
+class AccountBalance(Base):
+    """Running sum of every record and split movement of an account.
+
+    The balance of an account is its beginningBalance plus netAmount. Rows are
+    kept up to date on every flush that touches records or splits, and can be
+    rebuilt from scratch with `rebuild_account_balance_cache`.
+    """
+
+    __tablename__ = "account_balance_cache"
+
+    accountId = Column(Integer, ForeignKey("account.id"), primary_key=True)
+    netAmount = Column(Float, nullable=False, default=0)
+
+
+def get_balance_movements_query(record_ids=None, split_ids=None, record_id_range=None):
+    """Returns a union of (accountId, amount) money movements affecting account balances.
+
+    Args:
+        record_ids (list[int], optional): Only consider these records and their splits.
+        split_ids (list[int], optional): Also consider these splits. Only used with record_ids.
+        record_id_range (tuple[int, int], optional): Only consider records with IDs in this inclusive range, and their splits.
+    """
+    record_movements = select(
+        Record.accountId.label("accountId"),
+        case(
+            (Record.isTransfer, -Record.amount),
+            (Record.isIncome, Record.amount),
+            else_=-Record.amount,
+        ).label("amount"),
+    )
+    transfer_movements = select(
+        Record.transferToAccountId.label("accountId"),
+        Record.amount.label("amount"),
+    ).filter(Record.isTransfer.is_(True))
+    split_movements = (
+        select(
+            Split.accountId.label("accountId"),
+            case((Record.isIncome, -Split.amount), else_=Split.amount).label("amount"),
+        )
+        .join(Record, Split.recordId == Record.id)
+        .filter(Split.isPaid.is_(True))
+    )
+
+    if record_ids is not None:
+        record_movements = record_movements.filter(Record.id.in_(record_ids))
+        transfer_movements = transfer_movements.filter(Record.id.in_(record_ids))
+        split_movements = split_movements.filter(
+            Split.recordId.in_(record_ids) | Split.id.in_(split_ids or [])
+        )
+    if record_id_range is not None:
+        record_movements = record_movements.filter(Record.id.between(*record_id_range))
+        transfer_movements = transfer_movements.filter(
+            Record.id.between(*record_id_range)
+        )
+        split_movements = split_movements.filter(
+            Split.recordId.between(*record_id_range)
+        )
+
+    return union_all(record_movements, transfer_movements, split_movements).subquery()
+
+
+def _get_net_movements(session, record_ids, split_ids) -> dict[int, float]:
+    if not record_ids and not split_ids:
+        return {}
+    return _sum_by_account(session, get_balance_movements_query(record_ids, split_ids))
+
+
+def _sum_by_account(session, movements) -> dict[int, float]:
+    stmt = (
+        select(movements.c.accountId, func.sum(movements.c.amount))
+        .filter(movements.c.accountId.isnot(None))
+        .group_by(movements.c.accountId)
+    )
+    return dict(session.connection().execute(stmt).all())
+
+
+def _get_touched_ids(objects) -> tuple[list[int], list[int]]:
+    record_ids, split_ids = [], []
+    for obj in objects:
+        if obj.id is None:
+            continue
+        if isinstance(obj, Record):
+            record_ids.append(obj.id)
+        elif isinstance(obj, Split):
+            split_ids.append(obj.id)
+    return record_ids, split_ids
+
+
+# ---------- Incremental upkeep ---------- #
+# Movements of every touched record and split are summed once against the
+# database state before the flush, and once after. The difference is added to
+# the cached net amount of each affected account, in the same transaction.
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_old_movements(session, flush_context, instances):
+    touched = [
+        obj
+        for obj in (*session.dirty, *session.deleted)
+        if isinstance(obj, (Record, Split))
+    ]
+    with session.no_autoflush:
+        record_ids, split_ids = _get_touched_ids(touched)
+        session.info["balance_old_movements"] = _get_net_movements(
+            session, record_ids, split_ids
+        )
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_movement_deltas(session, flush_context):
+    old = session.info.pop("balance_old_movements", {})
+    touched = [
+        obj
+        for obj in (*session.new, *session.dirty)
+        if isinstance(obj, (Record, Split)) and obj not in session.deleted
+    ]
+    record_ids, split_ids = _get_touched_ids(touched)
+    new = _get_net_movements(session, record_ids, split_ids)
+
+    deltas = {
+        account_id: new.get(account_id, 0) - old.get(account_id, 0)
+        for account_id in old.keys() | new.keys()
+    }
+    deltas = {k: v for k, v in deltas.items() if v != 0}
+    if deltas:
+        apply_balance_deltas(session.connection(), deltas)
+
+
+def apply_balance_deltas(connection, deltas: dict[int, float]) -> None:
+    """Adds each delta to the cached net amount of its account."""
+    stmt = insert(AccountBalance.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AccountBalance.accountId],
+        set_={"netAmount": AccountBalance.netAmount + stmt.excluded.netAmount},
+    )
+    connection.execute(
+        stmt,
+        [
+            {"accountId": account_id, "netAmount": delta}
+            for account_id, delta in deltas.items()
+        ],
+    )
+
+
+def apply_inserted_movements(session, first_id: int, last_id: int) -> None:
+    """Adds the movements of newly inserted records and their splits to the cache.
+
+    Core inserts bypass the flush listeners above, so bulk writers call this
+    in the same transaction with the (inclusive) ID range they inserted.
+    """
+    movements = get_balance_movements_query(record_id_range=(first_id, last_id))
+    deltas = {k: v for k, v in _sum_by_account(session, movements).items() if v != 0}
+    if deltas:
+        apply_balance_deltas(session.connection(), deltas)
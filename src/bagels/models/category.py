@@ -1,6 +1,14 @@
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import Column, DateTime, Integer, String, Enum as SQLEnum, ForeignKey
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    String,
+    Enum as SQLEnum,
+    ForeignKey,
+    Index,
+)
 from sqlalchemy.orm import relationship
 from .database.db import Base
 
@@ -16,6 +24,7 @@ class Nature(Enum):
 
 class Category(Base):
     __tablename__ = "category"
+    __table_args__ = (Index("ix_category_parentCategoryId", "parentCategoryId"),)
 
     createdAt = Column(DateTime, nullable=False, default=datetime.now)
     updatedAt = Column(
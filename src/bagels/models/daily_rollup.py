@@ -0,0 +1,184 @@
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Float,
+    Integer,
+    String,
+    event,
+    func,
+    inspect,
+    select,
+)
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from .database.db import Base
+from .record import Record
+from .split import Split
+
+# categoryId of rollup rows for records without a category, as NULLs would
+# never conflict in the upsert
+NO_CATEGORY = 0
+
+
+class DailyRollup(Base):
+    """Record totals per calendar day, account, category and kind.
+
+    amount is the gross sum of the records' amounts and splitAmount the sum of
+    their splits, so the net figure of a row is amount - splitAmount. Rows are
+    kept up to date on every flush that touches records or splits, and can be
+    rebuilt from scratch with `rebuild_daily_rollup`.
+    """
+
+    __tablename__ = "daily_rollup"
+
+    day = Column(String, primary_key=True)  # YYYY-MM-DD, as Record.dateDay
+    accountId = Column(Integer, primary_key=True)
+    categoryId = Column(Integer, primary_key=True)
+    isIncome = Column(Boolean, primary_key=True)
+    isTransfer = Column(Boolean, primary_key=True)
+    amount = Column(Float, nullable=False, default=0)
+    splitAmount = Column(Float, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+
+_KEY = ("day", "accountId", "categoryId", "isIncome", "isTransfer")
+
+
+def get_rollup_query(record_ids=None, record_id_range=None):
+    """Returns the rollup rows of records, computed from the records and splits.
+
+    Args:
+        record_ids (list[int], optional): Only consider these records.
+        record_id_range (tuple[int, int], optional): Only consider records with IDs in this inclusive range.
+    """
+    split_totals = select(Split.recordId, func.sum(Split.amount).label("total"))
+    record_filters = []
+    if record_ids is not None:
+        split_totals = split_totals.filter(Split.recordId.in_(record_ids))
+        record_filters.append(Record.id.in_(record_ids))
+    if record_id_range is not None:
+        split_totals = split_totals.filter(Split.recordId.between(*record_id_range))
+        record_filters.append(Record.id.between(*record_id_range))
+    split_totals = split_totals.group_by(Split.recordId).subquery()
+
+    category_id = func.coalesce(Record.categoryId, NO_CATEGORY)
+    return (
+        select(
+            Record.dateDay.label("day"),
+            Record.accountId.label("accountId"),
+            category_id.label("categoryId"),
+            Record.isIncome.label("isIncome"),
+            Record.isTransfer.label("isTransfer"),
+            func.sum(Record.amount).label("amount"),
+            func.sum(func.coalesce(split_totals.c.total, 0)).label("splitAmount"),
+            func.count().label("count"),
+        )
+        .outerjoin(split_totals, split_totals.c.recordId == Record.id)
+        .filter(*record_filters)
+        .group_by(
+            Record.dateDay,
+            Record.accountId,
+            category_id,
+            Record.isIncome,
+            Record.isTransfer,
+        )
+    )
+
+
+def _get_rollup_rows(session, record_ids) -> dict[tuple, tuple]:
+    if not record_ids:
+        return {}
+    rows = session.connection().execute(get_rollup_query(record_ids=record_ids))
+    return {tuple(row[:5]): tuple(row[5:]) for row in rows}
+
+
+def _get_touched_record_ids(objects) -> list[int]:
+    record_ids = set()
+    for obj in objects:
+        if isinstance(obj, Record) and obj.id is not None:
+            record_ids.add(obj.id)
+        elif isinstance(obj, Split):
+            # the split may have moved from another record
+            history = inspect(obj).attrs.recordId.history
+            record_ids.update(
+                record_id
+                for record_id in (obj.recordId, *history.deleted)
+                if record_id is not None
+            )
+    return list(record_ids)
+
+
+# ---------- Incremental upkeep ---------- #
+# Like the account balance cache, the rollup rows of every touched record are
+# computed once against the database state before the flush, and once after.
+# The difference is added to the stored rows, in the same transaction.
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_old_rollups(session, flush_context, instances):
+    touched = [
+        obj
+        for obj in (*session.dirty, *session.deleted, *session.new)
+        if isinstance(obj, (Record, Split))
+    ]
+    with session.no_autoflush:
+        record_ids = _get_touched_record_ids(touched)
+        session.info["rollup_old_rows"] = _get_rollup_rows(session, record_ids)
+        session.info["rollup_record_ids"] = record_ids
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_rollup_deltas(session, flush_context):
+    old = session.info.pop("rollup_old_rows", {})
+    record_ids = set(session.info.pop("rollup_record_ids", []))
+    record_ids.update(
+        obj.id for obj in session.new if isinstance(obj, Record) and obj.id is not None
+    )
+    new = _get_rollup_rows(session, list(record_ids))
+
+    deltas = {}
+    for key in old.keys() | new.keys():
+        before, after = old.get(key, (0, 0, 0)), new.get(key, (0, 0, 0))
+        delta = tuple(a - b for a, b in zip(after, before))
+        if any(delta):
+            deltas[key] = delta
+    apply_rollup_deltas(session.connection(), deltas)
+
+
+def apply_rollup_deltas(connection, deltas: dict[tuple, tuple]) -> None:
+    """Adds (amount, splitAmount, count) deltas to the rollup rows of their keys."""
+    if not deltas:
+        return
+    table = DailyRollup.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c[name] for name in _KEY],
+        set_={
+            name: table.c[name] + stmt.excluded[name]
+            for name in ("amount", "splitAmount", "count")
+        },
+    )
+    connection.execute(
+        stmt,
+        [
+            dict(zip(_KEY, key), amount=amount, splitAmount=split, count=count)
+            for key, (amount, split, count) in deltas.items()
+        ],
+    )
+    days = {key[0] for key in deltas}
+    connection.execute(table.delete().where(table.c.count <= 0, table.c.day.in_(days)))
+
+
+def apply_inserted_rollups(session, first_id: int, last_id: int) -> None:
+    """Adds newly inserted records and their splits to the rollup.
+
+    Core inserts bypass the flush listeners above, so bulk writers call this
+    in the same transaction with the (inclusive) ID range they inserted.
+    """
+    rows = session.connection().execute(
+        get_rollup_query(record_id_range=(first_id, last_id))
+    )
+    apply_rollup_deltas(
+        session.connection(), {tuple(row[:5]): tuple(row[5:]) for row in rows}
+    )
@@ -2,21 +2,45 @@ from datetime import datetime
 from pathlib import Path
 
 import yaml
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker
 
+from bagels import config
 from bagels.locations import database_file
 
 # -------- create all imports -------- #
 from bagels.models.account import Account
+from bagels.models.account_balance import AccountBalance
 from bagels.models.category import Category, Nature
+from bagels.models.daily_rollup import DailyRollup
 from bagels.models.database.db import Base
 from bagels.models.person import Person  # noqa: F401
 from bagels.models.record import Record  # noqa: F401
+from bagels.models.record_search import create_label_index
 from bagels.models.record_template import RecordTemplate  # noqa: F401
 from bagels.models.split import Split  # noqa: F401
 
-db_engine = create_engine(f"sqlite:///{database_file().resolve()}")
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # CONFIG may not be loaded yet, e.g. when migrating from the CLI
+    settings = config.CONFIG.database if config.CONFIG else config.Database()
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.journal_mode}")
+    cursor.execute(f"PRAGMA synchronous={settings.synchronous}")
+    cursor.execute(f"PRAGMA cache_size={settings.cache_size}")
+    cursor.execute(f"PRAGMA mmap_size={settings.mmap_size}")
+    cursor.execute(f"PRAGMA temp_store={settings.temp_store}")
+    cursor.close()
+
+
+def create_db_engine(path: Path = None):
+    """Creates an engine for the database file, tuned by the `database` config section."""
+    engine = create_engine(f"sqlite:///{(path or database_file()).resolve()}")
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    return engine
+
+
+db_engine = create_db_engine()
 Session = sessionmaker(bind=db_engine)
 
 
@@ -86,6 +110,25 @@ def _fix_dangling_categories(session):
     session.commit()
 
 
+def _seed_account_balance_cache(session):
+    if session.query(AccountBalance).first() or not session.query(Record).first():
+        return
+
+    from bagels.managers.accounts import rebuild_account_balance_cache
+
+    rebuild_account_balance_cache(session)
+
+
+def _seed_daily_rollup(session):
+    if session.query(DailyRollup).first() or not session.query(Record).first():
+        return
+
+    from bagels.managers.records import rebuild_daily_rollup
+
+    rebuild_daily_rollup(session)
+    session.commit()
+
+
 def _sync_database_schema():
     try:
         inspector = inspect(db_engine)
@@ -102,6 +145,16 @@ def _sync_database_schema():
 
                 for column_name in model_columns - existing_columns:
                     column = table.columns[column_name]
+                    if column.computed is not None:
+                        with db_engine.begin() as conn:
+                            conn.execute(
+                                text(
+                                    f'ALTER TABLE {table.name} ADD COLUMN "{column_name}" '
+                                    f"{column.type} "
+                                    f"GENERATED ALWAYS AS ({column.computed.sqltext}) VIRTUAL"
+                                )
+                            )
+                        continue
                     with db_engine.begin() as conn:
                         conn.execute(
                             text(
@@ -111,6 +164,13 @@ def _sync_database_schema():
                                 f"{'DEFAULT ' + str(column.default.arg) if column.default is not None else ''}"
                             )
                         )
+
+                existing_indexes = {
+                    index["name"] for index in inspector.get_indexes(table.name)
+                }
+                for index in table.indexes:
+                    if index.name not in existing_indexes:
+                        index.create(db_engine)
     except Exception as e:
         raise Exception(f"Failed to sync database schema: {str(e)}")
 
@@ -118,10 +178,15 @@ def _sync_database_schema():
 def init_db():
     _sync_database_schema()
     Base.metadata.create_all(db_engine)
+    # indexes the labels of ledgers created before the search index existed
+    with db_engine.begin() as conn:
+        create_label_index(conn)
     session = Session()
     _create_outside_source_account(session)
     _create_default_categories(session)
     _fix_dangling_categories(session)
+    _seed_account_balance_cache(session)
+    _seed_daily_rollup(session)
     session.close()
 
 
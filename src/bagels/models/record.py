@@ -8,6 +8,8 @@ from sqlalchemy import (
     Boolean,
     ForeignKey,
     CheckConstraint,
+    Computed,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from .database.db import Base
@@ -15,6 +17,12 @@ from .database.db import Base
 
 class Record(Base):
     __tablename__ = "record"
+    __table_args__ = (
+        Index("ix_record_date_accountId", "date", "accountId"),
+        Index("ix_record_accountId_isTransfer", "accountId", "isTransfer"),
+        Index("ix_record_transferToAccountId", "transferToAccountId"),
+        Index("ix_record_dateDay_createdAt", "dateDay", "createdAt"),
+    )
 
     createdAt = Column(DateTime, nullable=False, default=datetime.now)
     updatedAt = Column(
@@ -25,6 +33,8 @@ class Record(Base):
     label = Column(String, nullable=False)
     amount = Column(Float, CheckConstraint("amount > 0"), nullable=False)
     date = Column(DateTime, nullable=False, default=datetime.now)
+    # calendar day of "date" as YYYY-MM-DD, for indexed day grouping and sorting
+    dateDay = Column(String, Computed("date(date)"))
     accountId = Column(Integer, ForeignKey("account.id"), nullable=False)
     categoryId = Column(Integer, ForeignKey("category.id"), nullable=True)
 
@@ -0,0 +1,134 @@
+"""Full-text index of record labels.
+
+`record_label_fts` is an FTS5 table over `record.label`, with the record ID
+as its rowid. It stores no copy of the labels (content="record"), and
+triggers on the record table keep it in sync with every write, whether made
+by the ORM, bulk Core inserts or a migration.
+
+It serves searches of all periods, where a LIKE scan would read every
+record. Filters within a period keep the substring match. SQLite builds
+without FTS5 get no index, and searches fall back to a LIKE scan, see
+`label_filter`.
+"""
+
+import re
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import column, event, func, literal_column, select, table, text
+from sqlalchemy.engine import Connection
+
+from .record import Record
+
+FTS_TABLE = "record_label_fts"
+
+_CREATE_STATEMENTS = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        label, content='record', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON record BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, label) VALUES (new.id, new.label);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON record BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, label)
+        VALUES ('delete', old.id, old.label);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE OF label ON record
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, label)
+        VALUES ('delete', old.id, old.label);
+        INSERT INTO {FTS_TABLE}(rowid, label) VALUES (new.id, new.label);
+    END""",
+)
+
+label_fts = table(FTS_TABLE, column("rowid"), column("label"))
+
+# engines known to have the index, checked once each
+_indexed_engines = WeakKeyDictionary()
+
+
+def fts5_available(connection: Connection) -> bool:
+    return bool(
+        connection.exec_driver_sql(
+            "SELECT sqlite_compileoption_used('ENABLE_FTS5')"
+        ).scalar()
+    )
+
+
+def create_label_index(connection: Connection) -> None:
+    """Creates the index and its triggers, and indexes the existing records."""
+    if not fts5_available(connection):
+        return
+    exists = has_label_index(connection)
+    for statement in _CREATE_STATEMENTS:
+        connection.execute(text(statement))
+    if not exists:
+        rebuild_label_index(connection)
+    _indexed_engines[connection.engine] = True
+
+
+def rebuild_label_index(connection: Connection) -> None:
+    """Reindexes every record label from scratch."""
+    connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def has_label_index(connection: Connection) -> bool:
+    return bool(
+        connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE},
+        ).scalar()
+    )
+
+
+@event.listens_for(Record.__table__, "after_create")
+def _create_with_record_table(target, connection, **kw):
+    create_label_index(connection)
+
+
+@event.listens_for(Record.__table__, "before_drop")
+def _drop_with_record_table(target, connection, **kw):
+    # the triggers go with the record table
+    connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+    _indexed_engines.pop(connection.engine, None)
+
+
+def is_label_indexed(session) -> bool:
+    engine = session.get_bind()
+    if engine not in _indexed_engines:
+        _indexed_engines[engine] = has_label_index(session.connection())
+    return _indexed_engines[engine]
+
+
+def get_match_query(search: str) -> str | None:
+    """Turns typed text into an FTS5 query matching labels with words starting
+    with each of its words, e.g. "din fri" matches "Dinner with friends".
+
+    Returns None if the text has no words to match.
+    """
+    words = re.findall(r"\w+", search)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def matches(search: str):
+    """The condition on `label_fts` rows for labels matching the search."""
+    return literal_column(FTS_TABLE).op("MATCH")(get_match_query(search))
+
+
+def label_filter(session, search: str):
+    """Returns a filter on Record for labels matching a search of all periods.
+
+    Uses the full-text index where there is one, and a case-insensitive
+    substring match otherwise, or for text without words. Searches within a
+    period filter with a plain substring match instead, see `get_records`.
+    """
+    if is_label_indexed(session) and get_match_query(search) is not None:
+        return Record.id.in_(select(label_fts.c.rowid).where(matches(search)))
+    return Record.label.icontains(search, autoescape=True)
+
+
+def label_rank():
+    """The bm25 rank of a row matched with `matches`, lower is better."""
+    return func.bm25(literal_column(FTS_TABLE))
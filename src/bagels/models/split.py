@@ -1,11 +1,33 @@
 from datetime import datetime
-from sqlalchemy import Column, DateTime, Integer, Float, Boolean, ForeignKey
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    text,
+)
 from sqlalchemy.orm import relationship
 from .database.db import Base
 
 
 class Split(Base):
     __tablename__ = "split"
+    __table_args__ = (
+        Index("ix_split_recordId", "recordId"),
+        Index("ix_split_personId", "personId"),
+        Index("ix_split_accountId", "accountId"),
+        # covers the net due of every person, which only sums unpaid splits
+        Index(
+            "ix_split_unpaid_personId",
+            "personId",
+            "recordId",
+            "amount",
+            sqlite_where=text('"isPaid" = 0'),
+        ),
+    )
 
     createdAt = Column(DateTime, nullable=False, default=datetime.now)
     updatedAt = Column(
@@ -0,0 +1,152 @@
+import asyncio
+
+from textual.app import App
+
+from bagels.components.datatable import DataTable, VirtualRow
+
+ROWS = [VirtualRow((str(i), f"Record {i}", i * 1.5), key=f"r-{i}") for i in range(1000)]
+
+
+class TableApp(App):
+    """A headless app with one table, showing its rows from a provider or not."""
+
+    def __init__(self, rows: list[VirtualRow], virtual: bool):
+        super().__init__()
+        self.rows = rows
+        self.virtual = virtual
+        self.provided = 0
+
+    def compose(self):
+        yield DataTable(cursor_type="row")
+
+    def on_mount(self):
+        table = self.query_one(DataTable)
+        table.add_columns("Index", "Label", "Amount")
+        if self.virtual:
+            table.set_row_provider(len(self.rows), self.provide)
+        else:
+            for row in self.rows:
+                table.add_row(*row.cells, key=row.key, style_name=row.style_name)
+
+    def provide(self, row_index: int) -> VirtualRow:
+        self.provided += 1
+        return self.rows[row_index]
+
+
+def run_table(rows: list[VirtualRow], test, virtual: bool = True):
+    """Runs test(pilot, table) on a table of the rows, returning what it returns."""
+
+    async def run():
+        app = TableApp(rows, virtual)
+        async with app.run_test(size=(80, 24)) as pilot:
+            await pilot.pause()
+            return await test(pilot, app.query_one(DataTable))
+
+    return asyncio.run(run())
+
+
+def test_virtual_rows_come_from_provider():
+    """Test that only the rows around the view are materialized while paging."""
+
+    async def page(pilot, table):
+        assert table.is_virtual and table.row_count == len(ROWS)
+        materialized = [len(table.rows)]
+        for _ in range(10):
+            await pilot.press("pagedown")
+            await pilot.pause()
+            materialized.append(len(table.rows))
+        cursor_row = table.cursor_row
+        return materialized, cursor_row, table.get_row_at(cursor_row)
+
+    materialized, cursor_row, row = run_table(ROWS, page)
+
+    assert cursor_row > 150
+    assert row == list(ROWS[cursor_row].cells)
+    assert max(materialized) < 100
+
+
+def test_virtual_y_offsets_match_plain_table():
+    """Test that lines map to the same rows as in a table built with add_row."""
+
+    async def offsets(pilot, table):
+        lines = range(table.header_height, table.header_height + table.row_count)
+        return (
+            [(key.value, y) for key, y in table._y_offsets],
+            [(key.value, y) for key, y in map(table._get_offsets, lines)],
+            table._total_row_height,
+            list(table.get_column_at(1)),
+        )
+
+    rows = ROWS[:300]
+    assert run_table(rows, offsets) == run_table(rows, offsets, virtual=False)
+
+
+def test_virtual_cursor_moves_like_plain_table():
+    """Test that the cursor and scroll follow the same keys as in a plain table."""
+    keys = ["down"] * 5 + ["pagedown"] * 3 + ["up", "end", "pageup", "home", "down"]
+
+    async def move(pilot, table):
+        positions = []
+        for key in keys:
+            await pilot.press(key)
+            await pilot.pause()
+            cursor_key = table.coordinate_to_cell_key(table.cursor_coordinate).row_key
+            positions.append(
+                (
+                    table.cursor_row,
+                    cursor_key.value,
+                    table.get_row_at(table.cursor_row),
+                    table.scroll_y,
+                )
+            )
+        return positions
+
+    assert run_table(ROWS, move) == run_table(ROWS, move, virtual=False)
+
+
+def test_splice_rows_keeps_rows_and_cursor():
+    """Test that rows and the cursor move with a splice, after the provider's rows."""
+    rows = list(ROWS[:300])
+
+    async def splice(pilot, table):
+        for _ in range(30):
+            await pilot.press("down")
+        await pilot.pause()
+        before = [table.get_row_at(i) for i in range(32)]
+
+        # replace rows 2 to 4 by one new row, then remove a row past the cursor
+        rows[2:5] = [VirtualRow(("new", "New record", 0.0), key="r-new")]
+        table.splice_rows(2, 3, 1)
+        del rows[100]
+        table.splice_rows(100, 1, 0)
+        await pilot.pause()
+
+        cursor_key = table.coordinate_to_cell_key(table.cursor_coordinate).row_key
+        assert (table.cursor_row, cursor_key.value) == (28, "r-30")
+        assert table.row_count == len(rows) == 297
+        assert table.get_row_at(2) == ["new", "New record", 0.0]
+        assert [table.get_row_at(i) for i in range(3, 30)] == before[5:32]
+        assert list(table.get_column_at(0)) == [row.cells[0] for row in rows]
+
+        await pilot.press("up")
+        await pilot.pause()
+        assert table.get_row_at(table.cursor_row) == list(ROWS[29].cells)
+
+    run_table(rows, splice)
+
+
+def test_clear_virtual_table():
+    """Test that a virtual table with rows materialized out of order can be cleared."""
+
+    async def clear(pilot, table):
+        for key in ["end", "home", "pagedown"]:
+            await pilot.press(key)
+        await pilot.pause()
+        provided = pilot.app.provided
+        table.clear()
+        assert pilot.app.provided == provided
+        table.add_row("0", "Plain record", 1.0, key="plain")
+        await pilot.pause()
+        return table.is_virtual, table.row_count, table.get_row_at(0)
+
+    assert run_table(ROWS, clear) == (False, 1, ["0", "Plain record", 1.0])
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+
+from textual.app import App
+from textual.widgets import Static
+
+from bagels.components.loader import LoadedModule, ModuleLoader
+
+
+class Module(LoadedModule, Static):
+    """Loads the number of its current load, blocking while it is in `blocked`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loads = 0
+        self.blocked = {}  # load number -> Event releasing its query
+        self.applied = []  # (load number, applied on the event loop thread)
+
+    def get_queries(self) -> dict:
+        self.loads += 1
+        load = self.loads
+        release = self.blocked.get(load)
+
+        def query():
+            if release is not None:
+                release.wait(5)
+            return load
+
+        return {"load": query}
+
+    def apply_data(self, data: dict) -> None:
+        on_event_loop = threading.get_ident() == self.app._thread_id
+        self.applied.append((data["load"], on_event_loop))
+
+
+class LoaderApp(App):
+    def compose(self):
+        yield Module(id="first")
+        yield Module(id="second")
+
+
+def run_loader(test):
+    async def run():
+        app = LoaderApp()
+        async with app.run_test() as pilot:
+            loader = ModuleLoader(app.screen, "test")
+            await test(pilot, loader, app.query_one("#first"), app.query_one("#second"))
+
+    asyncio.run(run())
+
+
+def test_newest_load_wins():
+    """Test that a load finishing after a newer one is not applied."""
+
+    async def load_twice(pilot, loader, first, second):
+        release = first.blocked[1] = threading.Event()
+        loader.load([first, second])
+        loader.load([first])
+        for _ in range(500):
+            if first.applied:
+                break
+            await pilot.pause(0.01)
+        assert first.applied == [(2, True)]
+
+        release.set()
+        await pilot.app.workers.wait_for_complete()
+        await pilot.pause()
+        # the older load still carries the only results of the second module
+        assert first.applied == [(2, True)]
+        assert second.applied == [(1, True)]
+        assert loader.last_stats is not None
+
+    run_loader(load_twice)
+
+
+def test_rebuild_supersedes_load():
+    """Test that a synchronous rebuild drops the results of a load in progress."""
+
+    async def load_then_rebuild(pilot, loader, first, second):
+        release = first.blocked[1] = threading.Event()
+        loader.load([first])
+        first.rebuild()
+        release.set()
+        await pilot.app.workers.wait_for_complete()
+        await pilot.pause()
+        assert first.applied == [(2, True)]
+
+    run_loader(load_then_rebuild)
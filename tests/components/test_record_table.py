@@ -0,0 +1,120 @@
+import asyncio
+
+from textual.app import App
+
+from bagels.components.datatable import DataTable, VirtualRow
+from bagels.components.modules.records._table_builder import RecordTableBuilder
+
+
+def _rows(ids, labels=None, style_names=None):
+    labels = labels or {}
+    style_names = style_names or {}
+    return [
+        VirtualRow(
+            (str(i), labels.get(i, f"Record {i}"), i * 1.5),
+            key=f"r-{i}",
+            style_name=style_names.get(i),
+        )
+        for i in ids
+    ]
+
+
+class TableApp(App):
+    """A headless app with one virtual table, recording the changes made to it."""
+
+    def __init__(self, rows: list[VirtualRow]):
+        super().__init__()
+        self.rows = rows
+        self.calls = []
+
+    def compose(self):
+        yield DataTable(cursor_type="row")
+
+    def on_mount(self):
+        table = self.query_one(DataTable)
+        table.add_columns("Index", "Label", "Amount")
+        table.set_row_provider(len(self.rows), lambda i: self.rows[i])
+        for name in ("splice_rows", "update_cell_at"):
+            method = getattr(table, name)
+            setattr(table, name, self._record(name, method))
+
+    def _record(self, name, method):
+        def recorded(*args):
+            self.calls.append((name, *args))
+            return method(*args)
+
+        return recorded
+
+
+def apply_diff(old_rows, new_rows, cursor_row=0):
+    """Moves the cursor to cursor_row, then diffs old_rows into new_rows.
+
+    Returns the calls made to the table and the key of the cursor row.
+    """
+
+    async def run():
+        app = TableApp(list(old_rows))
+        async with app.run_test(size=(80, 24)) as pilot:
+            table = app.query_one(DataTable)
+            table.move_cursor(row=cursor_row)
+            await pilot.pause()
+            app.rows[:] = new_rows
+            RecordTableBuilder()._apply_row_diff(table, old_rows, new_rows)
+            await pilot.pause()
+
+            assert table.row_count == len(new_rows)
+            assert [table.get_row_at(i) for i in range(table.row_count)] == [
+                list(row.cells) for row in new_rows
+            ]
+            cursor_key = table.coordinate_to_cell_key(table.cursor_coordinate).row_key
+            return app.calls, cursor_key.value
+
+    return asyncio.run(run())
+
+
+def test_diff_updates_changed_cells_only():
+    """Test that an edited record only updates its changed cells."""
+    old_rows = _rows(range(100))
+    new_rows = _rows(range(100), labels={40: "Edited"})
+
+    calls, cursor_key = apply_diff(old_rows, new_rows, cursor_row=40)
+
+    assert [(name, *args[1:]) for name, *args in calls] == [
+        ("update_cell_at", "Edited")
+    ]
+    assert tuple(calls[0][1]) == (40, 1)
+    assert cursor_key == "r-40"
+
+
+def test_diff_splices_between_matching_ends():
+    """Test that rows are matched by key from both ends, and the rest spliced."""
+    old_rows = _rows(range(100))
+    new_rows = _rows([*range(10), 1000, 1001, *range(13, 100)])
+
+    calls, cursor_key = apply_diff(old_rows, new_rows, cursor_row=50)
+
+    assert calls == [("splice_rows", 10, 3, 2)]
+    assert cursor_key == "r-50"
+
+
+def test_diff_inserts_and_deletes():
+    """Test that created and deleted records are spliced in and out."""
+    old_rows = _rows(range(100))
+
+    calls, cursor_key = apply_diff(old_rows, _rows([1000, *range(100)]), 20)
+    assert calls == [("splice_rows", 0, 0, 1)]
+    assert cursor_key == "r-20"
+
+    calls, cursor_key = apply_diff(old_rows, _rows([*range(60), *range(61, 100)]), 80)
+    assert calls == [("splice_rows", 60, 1, 0)]
+    assert cursor_key == "r-80"
+
+
+def test_diff_restyles_rows():
+    """Test that a row whose style changed is replaced rather than updated."""
+    old_rows = _rows(range(100))
+    new_rows = _rows(range(100), style_names={5: "net"})
+
+    calls, _ = apply_diff(old_rows, new_rows)
+
+    assert calls == [("splice_rows", 5, 1, 1)]
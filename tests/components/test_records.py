@@ -0,0 +1,157 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from textual.app import App
+
+import bagels.components.modules.records as records_module
+from bagels.components.modules.records import Records
+from bagels.components.modules.records._table_builder import RecordTableBuilder
+from bagels.managers import persons, records
+from bagels.models.account import Account
+from bagels.models.category import Category, Nature
+from bagels.models.database.db import Base
+from bagels.models.record import Record
+
+
+@pytest.fixture(autouse=True)
+def debounce(monkeypatch):
+    """Waits longer for a pause in typing, so that keys pressed by the pilot on a
+    busy machine still come in one burst."""
+    monkeypatch.setattr(records_module, "FILTER_DEBOUNCE", 0.5)
+
+
+@pytest.fixture
+def engine(monkeypatch, tmp_path):
+    """Create a database file, as filters are queried from worker threads."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'records.db'}")
+    Base.metadata.create_all(engine)
+    for module in (records, persons):
+        monkeypatch.setattr(module, "Session", sessionmaker(bind=engine))
+    session = sessionmaker(bind=engine)()
+    account = Account(name="Account", beginningBalance=0.0)
+    category = Category(name="Category", nature=Nature.NEED, color="#FF0000")
+    session.add_all([account, category])
+    session.flush()
+    start_of_year = datetime.now().replace(month=1, day=1, hour=0, minute=0)
+    session.add_all(
+        Record(
+            label=f"r{i}",
+            amount=1.0,
+            accountId=account.id,
+            categoryId=category.id,
+            date=start_of_year + timedelta(hours=i),
+        )
+        for i in range(120)
+    )
+    session.commit()
+    session.close()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    """Records the label filter of every records query, which blocks while the
+    label is in `fetches.blocked` until `fetches.release` is set."""
+    fetch_view_records = RecordTableBuilder._fetch_view_records
+
+    class Fetches(list):
+        blocked = set()
+        release = threading.Event()
+
+    calls = Fetches()
+
+    def recorded(display_mode, params, *args):
+        if params.get("label") in calls.blocked:
+            calls.release.wait(5)
+        calls.append(params.get("label"))
+        return fetch_view_records(display_mode, params, *args)
+
+    monkeypatch.setattr(
+        RecordTableBuilder, "_fetch_view_records", staticmethod(recorded)
+    )
+    yield calls
+    calls.release.set()
+
+
+class RecordsApp(App):
+    """A headless app showing the records of this year."""
+
+    class Page:
+        filter = {"offset": 0, "offset_type": "year", "byAccount": False}
+        mode = {}
+
+    def compose(self):
+        yield Records(self.Page())
+
+
+def run_records(test):
+    async def run():
+        app = RecordsApp()
+        async with app.run_test(size=(120, 40)) as pilot:
+            await pilot.pause()
+            module = app.query_one(Records)
+            app.query_one("#toggle-filter").value = True
+            await pilot.pause()
+            app.query_one("#filter-label").focus()
+            await test(pilot, module)
+
+    asyncio.run(run())
+
+
+async def _settle(pilot):
+    """Waits out the debounce and the filter worker it starts."""
+    await pilot.pause(records_module.FILTER_DEBOUNCE + 0.1)
+    await pilot.app.workers.wait_for_complete()
+    await pilot.pause()
+
+
+def _shown_labels(module):
+    return {
+        str(module.table.get_row_at(i)[3])
+        for i in range(module.table.row_count)
+        if (module._table_rows[i].key or "").startswith("r-")
+    }
+
+
+def test_filter_queries_once_per_burst(engine, fetches):
+    """Test that typing a label runs one query, once typing pauses."""
+
+    async def type_label(pilot, module):
+        fetches.clear()
+        await pilot.press(*"r11")
+        await _settle(pilot)
+        assert fetches == ["r11"]
+        assert _shown_labels(module) == {f"r{i}" for i in (11, *range(110, 120))}
+
+    run_records(type_label)
+
+
+def test_filter_drops_superseded_results(engine, fetches):
+    """Test that an older filter's result is not shown after a newer one."""
+    fetches.blocked.add("r1")
+
+    async def refine_label(pilot, module):
+        applied = []
+        apply_data = module.apply_data
+        module.apply_data = lambda data: applied.append(data) or apply_data(data)
+        fetches.clear()
+
+        await pilot.press(*"r1")
+        # the "r1" query is now blocked
+        await pilot.pause(records_module.FILTER_DEBOUNCE + 0.1)
+        await pilot.press("9")
+        await _settle(pilot)
+        assert _shown_labels(module) == {"r19"}
+
+        fetches.release.set()
+        await _settle(pilot)
+        assert fetches == ["r19", "r1"]
+        assert len(applied) == 1
+        assert _shown_labels(module) == {"r19"}
+
+    run_records(refine_label)
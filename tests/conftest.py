@@ -0,0 +1,24 @@
+import tempfile
+
+# --------- Isolate app files -------- #
+# Managers read CONFIG and bind to the database file at import time, so the app
+# root has to point somewhere disposable before any test module imports them.
+from bagels.locations import set_custom_root
+
+set_custom_root(tempfile.mkdtemp(prefix="bagels-tests-"))
+
+from bagels.config import load_config
+
+load_config()
+
+import pytest
+
+from bagels.managers.cache import query_cache
+
+
+# Test modules swap each manager's Session for their own in-memory database,
+# so results are never cached across tests unless a test opts back in
+@pytest.fixture(autouse=True)
+def disable_query_cache():
+    with query_cache.disabled():
+        yield
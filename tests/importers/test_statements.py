@@ -0,0 +1,169 @@
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from bagels.config import ImportProfile
+from bagels.importers import statements
+from bagels.importers.statements import StatementImporter, parse_amount
+from bagels.managers import records
+from bagels.managers.accounts import verify_account_balances
+from bagels.models.database.db import Base
+from bagels.models.account import Account
+from bagels.models.category import Category, Nature
+from bagels.models.record import Record
+
+
+@pytest.fixture(scope="function")
+def engine(monkeypatch):
+    """Create a test-specific database engine."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    for module in (records, statements):
+        monkeypatch.setattr(module, "Session", sessionmaker(bind=engine))
+    yield engine
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture(scope="function")
+def session(engine):
+    """Create a new session for a test."""
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def test_data(session):
+    """Create test accounts and categories."""
+    checking = Account(name="Checking", beginningBalance=1000.0)
+    card = Account(name="Card", beginningBalance=0.0)
+    groceries = Category(name="Groceries", nature=Nature.NEED, color="#00FF00")
+    other = Category(name="Other", nature=Nature.WANT, color="#808080")
+    session.add_all([checking, card, groceries, other])
+    session.commit()
+    return {"checking": checking, "card": card, "groceries": groceries, "other": other}
+
+
+def test_parse_amount():
+    """Test the amount notations found in bank exports."""
+    assert parse_amount("12.50") == 12.5
+    assert parse_amount("-1,234.56") == -1234.56
+    assert parse_amount("$(40.00)") == -40.0
+    assert parse_amount("1.234,56", decimal_separator=",") == 1234.56
+    assert parse_amount("7.00-") == -7.0
+    with pytest.raises(ValueError):
+        parse_amount("n/a")
+
+
+def test_import_csv(session, test_data, tmp_path):
+    """Test CSV columns mapping, name lookups, skipping and batching."""
+    path = tmp_path / "export.csv"
+    path.write_text(
+        "Booked;Description;Value;Category;Account\n"
+        "15/01/2024;Salary;2500,00;;checking\n"
+        "16/01/2024;Supermarket;-45,10;groceries;Checking\n"
+        "17/01/2024;Mystery;-10,00;Unknown;Checking\n"
+        "18/01/2024;Coffee;-3,50;;Card\n"
+        "19/01/2024;Zero;0,00;;Checking\n"
+        "20/01/2024;Lost;-5,00;;Savings\n"
+        "bad date;Broken;-1,00;;Checking\n",
+        encoding="utf-8",
+    )
+    profile = ImportProfile(
+        columns={
+            "date": "Booked",
+            "label": "Description",
+            "amount": "Value",
+            "category": "Category",
+            "account": "Account",
+        },
+        delimiter=";",
+        date_format="%d/%m/%Y",
+        decimal_separator=",",
+        default_category="Other",
+        batch_size=2,
+    )
+    batches = []
+
+    stats = StatementImporter(profile).run(
+        path, on_batch=lambda s: batches.append(s.imported)
+    )
+
+    assert (stats.read, stats.imported, stats.skipped) == (7, 3, 4)
+    assert [message for _, message in stats.errors][0] == "Unknown category 'Unknown'"
+    assert [line for line, _ in stats.errors] == [4, 7, 8]
+    assert batches == [2, 3]
+    imported = {r.label: r for r in session.query(Record).all()}
+    assert imported["Salary"].isIncome and imported["Salary"].amount == 2500.0
+    assert not imported["Supermarket"].isIncome
+    assert imported["Supermarket"].categoryId == test_data["groceries"].id
+    assert "Mystery" not in imported
+    assert imported["Salary"].categoryId == test_data["other"].id
+    assert imported["Coffee"].accountId == test_data["card"].id
+    assert imported["Coffee"].date == datetime(2024, 1, 18)
+    assert verify_account_balances(session=session) == {}
+
+
+def test_import_ofx(session, test_data, tmp_path):
+    """Test SGML-style OFX, where leaf elements have no closing tags."""
+    path = tmp_path / "export.ofx"
+    path.write_text(
+        "OFXHEADER:100\nDATA:OFXSGML\n\n<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS>\n"
+        "<BANKTRANLIST>\n"
+        "<STMTTRN>\n<TRNTYPE>DEBIT\n<DTPOSTED>20240115120000[-5:EST]\n"
+        "<TRNAMT>-20.00\n<FITID>1\n<NAME>Book shop\n</STMTTRN>\n"
+        "<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240116<TRNAMT>100.00"
+        "<FITID>2<MEMO>Refund</STMTTRN>\n"
+        "</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>\n"
+    )
+
+    stats = StatementImporter(ImportProfile(), account="Checking").run(path)
+
+    assert stats.imported == 2
+    imported = {r.label: r for r in session.query(Record).all()}
+    assert imported["Book shop"].date == datetime(2024, 1, 15, 12, 0)
+    assert imported["Book shop"].amount == 20.0 and not imported["Book shop"].isIncome
+    assert imported["Refund"].isIncome and imported["Refund"].date == datetime(
+        2024, 1, 16
+    )
+
+
+def test_import_qif(session, test_data, tmp_path):
+    """Test QIF blocks, 2-digit years and transfer categories."""
+    path = tmp_path / "export.qif"
+    path.write_text(
+        "!Type:Bank\n"
+        "D01/15'24\nT-12.00\nPLunch\nLGroceries\n^\n"
+        "D01/16'24\nT-50.00\nMTo card\nL[Card]\n^\n"
+    )
+    profile = ImportProfile(date_format="%m/%d/%y", account="Checking")
+
+    stats = StatementImporter(profile).run(path)
+
+    assert stats.imported == 2
+    imported = {r.label: r for r in session.query(Record).all()}
+    assert imported["Lunch"].categoryId == test_data["groceries"].id
+    assert imported["Lunch"].date == datetime(2024, 1, 15)
+    assert imported["To card"].category.name == "Uncategorized"
+
+
+def test_import_without_categories(session, test_data, tmp_path):
+    """Test that rows without a category are filed under one created for them."""
+    path = tmp_path / "export.csv"
+    path.write_text("date,label,amount\n2024-01-15,Coffee,-3.50\n2024-01-16,Refund,8\n")
+    importer = StatementImporter(ImportProfile(account="Checking"))
+
+    assert importer.run(path).imported == 2
+    assert importer.run(path).imported == 2
+
+    uncategorized = session.query(Category).filter_by(name="Uncategorized").all()
+    assert len(uncategorized) == 1
+    assert {r.categoryId for r in session.query(Record).all()} == {uncategorized[0].id}
+
+
+def test_import_requires_known_account(session, test_data, tmp_path):
+    """Test that an unknown default account fails before reading the file."""
+    with pytest.raises(ValueError, match="No account named"):
+        StatementImporter(ImportProfile(account="Savings"))
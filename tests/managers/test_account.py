@@ -5,7 +5,7 @@ from bagels.models.database.db import Base
 from bagels.managers import accounts
 
 @pytest.fixture(scope="function")
-def test_db():
+def test_db(monkeypatch):
     # Create in-memory SQLite database
     engine = create_engine("sqlite:///:memory:")
     
@@ -13,7 +13,7 @@ def test_db():
     Base.metadata.create_all(engine)
     
     # Create a new session factory bound to the engine
-    accounts.Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(accounts, "Session", sessionmaker(bind=engine))
     
     yield engine
     
@@ -1,10 +1,12 @@
+import random
 import pytest
 from datetime import datetime
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, delete
 from sqlalchemy.orm import sessionmaker
 
 from bagels.models.database.db import Base
 from bagels.models.account import Account
+from bagels.models.account_balance import AccountBalance
 from bagels.models.record import Record
 from bagels.models.split import Split
 from bagels.models.person import Person
@@ -209,3 +211,131 @@ def test_combined_balance_calculation(session, test_data):
     # 500 (beginning) + 300 (transfer in) = 800
     balance2 = accounts.get_account_balance(test_data["account2"].id, session)
     assert balance2 == 800.0
+
+def test_account_balances_in_one_query(session, test_data):
+    """Test that the grouped balance query agrees with per-account balances."""
+    income_split_record = Record(
+        label="Shared Income",
+        amount=90.0,
+        accountId=test_data["account2"].id,
+        categoryId=test_data["category"].id,
+        isIncome=True,
+        date=datetime.now()
+    )
+    transfer_record = Record(
+        label="Transfer",
+        amount=120.0,
+        accountId=test_data["account2"].id,
+        isTransfer=True,
+        transferToAccountId=test_data["account1"].id,
+        date=datetime.now()
+    )
+    session.add_all([income_split_record, transfer_record])
+    session.flush()
+    session.add(Split(
+        recordId=income_split_record.id,
+        amount=30.0,
+        personId=test_data["person"].id,
+        isPaid=True,
+        accountId=test_data["account1"].id,
+        paidDate=datetime.now()
+    ))
+    session.commit()
+
+    balances = accounts.get_account_balances(session=session)
+
+    # Account 1: 1000 + 120 (transfer in) - 30 (paid income split) = 1090
+    # Account 2: 500 + 90 (income) - 120 (transfer out) = 470
+    assert balances == {test_data["account1"].id: 1090.0, test_data["account2"].id: 470.0}
+    for account_id, balance in balances.items():
+        assert accounts.get_account_balance(account_id, session) == balance
+    assert accounts.get_account_balances([test_data["account2"].id], session) == {
+        test_data["account2"].id: 470.0
+    }
+
+@pytest.fixture
+def managers(engine, setup_test_database, monkeypatch):
+    """Bind the record, split and account managers to the test database."""
+    from bagels.managers import records, splits
+    for module in (accounts, records, splits):
+        monkeypatch.setattr(module, "Session", sessionmaker(bind=engine))
+    return records, splits
+
+def test_balance_cache_matches_recomputation(session, test_data, managers):
+    """Test that the incrementally maintained cache survives random edit sequences."""
+    records, splits = managers
+    rng = random.Random(7)
+    account_ids = [test_data["account1"].id, test_data["account2"].id]
+    person_id = test_data["person"].id
+
+    def random_record_data():
+        kind = rng.choice(["income", "expense", "transfer"])
+        account_id = rng.choice(account_ids)
+        return {
+            "label": "Random",
+            "amount": round(rng.uniform(1, 500), 2),
+            "accountId": account_id,
+            "categoryId": None if kind == "transfer" else test_data["category"].id,
+            "isIncome": kind == "income",
+            "isTransfer": kind == "transfer",
+            "transferToAccountId": [a for a in account_ids if a != account_id][0] if kind == "transfer" else None,
+            "date": datetime.now(),
+        }
+
+    def random_split_data():
+        return {
+            "amount": round(rng.uniform(1, 50), 2),
+            "personId": person_id,
+            "isPaid": rng.random() < 0.5,
+            "accountId": rng.choice(account_ids + [None]),
+        }
+
+    record_ids, split_ids = [], []
+    for _ in range(200):
+        action = rng.choice(["create", "create_with_splits", "update", "delete", "add_split", "update_split", "delete_split"])
+        if action == "create" or not record_ids:
+            record_ids.append(records.create_record(random_record_data()).id)
+        elif action == "create_with_splits":
+            data = random_record_data()
+            data.update(isTransfer=False, transferToAccountId=None, categoryId=test_data["category"].id)
+            record = records.create_record_and_splits(data, [random_split_data() for _ in range(rng.randint(1, 3))])
+            record_ids.append(record.id)
+            split_ids.extend(s.id for s in splits.get_splits_by_record_id(record.id))
+        elif action == "update":
+            records.update_record(rng.choice(record_ids), {"amount": round(rng.uniform(1, 500), 2), "accountId": rng.choice(account_ids)})
+        elif action == "delete":
+            record_id = record_ids.pop(rng.randrange(len(record_ids)))
+            deleted = {s.id for s in splits.get_splits_by_record_id(record_id)}
+            split_ids = [s for s in split_ids if s not in deleted]
+            records.delete_record(record_id)
+        elif action == "add_split":
+            split_ids.append(splits.create_split({"recordId": rng.choice(record_ids), **random_split_data()}).id)
+        elif action == "update_split" and split_ids:
+            splits.update_split(rng.choice(split_ids), {"isPaid": rng.random() < 0.5, "amount": round(rng.uniform(1, 50), 2)})
+        elif action == "delete_split" and split_ids:
+            splits.delete_split(split_ids.pop(rng.randrange(len(split_ids))))
+
+        session.expire_all()
+        assert accounts.verify_account_balances(session=session) == {}
+
+def test_balance_cache_repair(session, test_data):
+    """Test that drift is detected and repaired."""
+    session.add(Record(
+        label="Income",
+        amount=100.0,
+        accountId=test_data["account1"].id,
+        categoryId=test_data["category"].id,
+        isIncome=True,
+        date=datetime.now()
+    ))
+    session.commit()
+    assert accounts.get_account_balance(test_data["account1"].id, session) == 1100.0
+
+    session.execute(delete(AccountBalance))
+    session.commit()
+    assert accounts.get_account_balance(test_data["account1"].id, session) == 1000.0
+
+    drifted = accounts.verify_account_balances(repair=True, session=session)
+    assert drifted == {test_data["account1"].id: (0, 100.0)}
+    assert accounts.verify_account_balances(session=session) == {}
+    assert accounts.get_account_balance(test_data["account1"].id, session) == 1100.0
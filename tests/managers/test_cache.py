@@ -0,0 +1,219 @@
+import threading
+import time
+from contextvars import copy_context
+
+import pytest
+from datetime import datetime
+from freezegun import freeze_time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from bagels.config import CONFIG
+from bagels.models.database.db import Base
+from bagels.models.account import Account
+from bagels.models.category import Category, Nature
+from bagels.managers import cache, categories, records, utils
+from bagels.managers.cache import cached, query_cache, track_queries
+
+
+@pytest.fixture(scope="function")
+def engine(monkeypatch):
+    """Create a test-specific database engine with the cache enabled."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    for module in (categories, records, utils):
+        monkeypatch.setattr(module, "Session", sessionmaker(bind=engine))
+    query_cache.enabled = True
+    query_cache.clear()
+    yield engine
+    query_cache.enabled = False
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def test_data(engine):
+    session = sessionmaker(bind=engine)()
+    account = Account(name="Account", beginningBalance=0.0)
+    category = Category(name="Category", nature=Nature.NEED, color="#FF0000")
+    session.add_all([account, category])
+    session.commit()
+    yield {"account": account.id, "category": category.id}
+    session.close()
+
+
+def _expense(test_data, amount):
+    return {
+        "label": "Expense",
+        "amount": amount,
+        "accountId": test_data["account"],
+        "categoryId": test_data["category"],
+        "date": datetime(2024, 2, 10),
+    }
+
+
+@freeze_time("2024-02-15")
+def test_cache_hits_until_write(engine, test_data):
+    """Test that results are reused until a manager write commits."""
+    kwargs = dict(offset_type="month", offset=0, isIncome=False)
+    records.create_record(_expense(test_data, 10.0))
+    hits, misses = query_cache.hits, query_cache.misses
+
+    assert utils.get_period_figures(**kwargs) == 10.0
+    assert utils.get_period_figures(**kwargs) == 10.0
+    assert (query_cache.hits - hits, query_cache.misses - misses) == (1, 1)
+
+    version = cache.data_version()
+    records.create_record(_expense(test_data, 5.0))
+    assert cache.data_version() > version
+    assert utils.get_period_figures(**kwargs) == 15.0
+
+    records.bulk_create_records([_expense(test_data, 1.0)])
+    assert utils.get_period_figures(**kwargs) == 16.0
+
+
+@freeze_time("2024-02-15")
+def test_cache_ignores_reads_and_rollbacks(engine, test_data):
+    """Test that read-only transactions and rolled back writes keep the cache."""
+    utils.get_period_figures(offset_type="month", offset=0)
+    version = cache.data_version()
+
+    records.get_record_by_id(1)  # commits a read-only session
+    with pytest.raises(RuntimeError):
+        with utils.unit_of_work() as uow:
+            records.create_record(_expense(test_data, 5.0), session=uow)
+            raise RuntimeError("abort")
+
+    assert cache.data_version() == version
+    assert query_cache.stats()["size"] == 1
+
+
+@freeze_time("2024-02-15")
+def test_daily_spending_follows_edits(engine, test_data):
+    """Test that the spending plots' daily series is not served stale after an edit."""
+    start, end = datetime(2024, 2, 1), datetime(2024, 2, 29)
+    assert records.get_daily_spending(start, end).sum() == 0
+    record = records.create_record(_expense(test_data, 10.0))
+    assert records.get_daily_spending(start, end)[9] == 10.0
+    records.update_record(record.id, {"amount": 4.0})
+    assert records.get_daily_spending(start, end)[9] == 4.0
+
+
+@freeze_time("2024-02-15")
+def test_cache_hits_are_copies(engine, test_data):
+    """Test that changing a returned result does not change later hits."""
+    records.create_record(_expense(test_data, 10.0))
+    start, end = datetime(2024, 2, 1), datetime(2024, 2, 29)
+    records.get_daily_spending(start, end)[9] = 99.0
+    assert records.get_daily_spending(start, end)[9] == 10.0
+    records.get_daily_balance(start, end).reverse()
+    assert records.get_daily_balance(start, end)[0] == 0.0
+    categories.get_all_categories_records(0, "month", False).clear()
+    assert [
+        c.amount for c in categories.get_all_categories_records(0, "month", False)
+    ] == [10.0]
+
+
+@freeze_time("2024-02-15")
+def test_cache_follows_settings(engine, test_data, monkeypatch):
+    """Test that results computed under other settings are not served."""
+    records.create_record(_expense(test_data, 10.125))
+    kwargs = dict(offset_type="month", offset=0, isIncome=False)
+    monkeypatch.setattr(CONFIG.defaults, "round_decimals", 2)
+    assert utils.get_period_figures(**kwargs) == 10.12
+    monkeypatch.setattr(CONFIG.defaults, "round_decimals", 0)
+    assert utils.get_period_figures(**kwargs) == 10.0
+
+    calls = []
+
+    @cached
+    def read():
+        calls.append(1)
+
+    read(), read()
+    monkeypatch.setattr(CONFIG.defaults, "first_day_of_week", 3)
+    read(), read()
+    monkeypatch.setattr(
+        CONFIG.analytics, "ledger_snapshot", not CONFIG.analytics.ledger_snapshot
+    )
+    read(), read()
+    assert len(calls) == 3
+
+
+def test_cache_bypasses():
+    """Test that session, unhashable and disabled calls always run the function."""
+    calls = []
+
+    @cached
+    def read(value, session=None):
+        calls.append(value)
+        return value
+
+    query_cache.enabled = True
+    try:
+        read(1), read(1)
+        read(1, session=object())
+        session = object()
+        read(1, session), read(1, session)
+        read([1]), read([1])
+        with query_cache.disabled():
+            read(1)
+    finally:
+        query_cache.enabled = False
+    assert calls == [1, 1, 1, 1, [1], [1], 1]
+
+
+def test_cache_is_bounded():
+    """Test that the least recently used entries are evicted."""
+    lru = cache.QueryCache(maxsize=2)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    assert lru.get("a") == (True, 1)
+    lru.put("c", 3)
+    assert lru.get("b") == (False, None)
+    assert lru.get("a") == (True, 1) and lru.get("c") == (True, 3)
+    assert lru.stats()["size"] == 2
+
+
+def test_cache_coalesces_concurrent_misses():
+    """Test that concurrent misses of the same key run the function once."""
+    calls, started, release = [], threading.Event(), threading.Event()
+
+    @cached
+    def read(value):
+        calls.append(value)
+        started.set()
+        release.wait(5)
+        return value * 2
+
+    query_cache.enabled = True
+    results = []
+    try:
+        with track_queries() as stats:
+            threads = [
+                threading.Thread(
+                    target=copy_context().run, args=(lambda: results.append(read(21)),)
+                )
+                for _ in range(2)
+            ]
+            threads[0].start()
+            started.wait(5)
+            threads[1].start()
+            while not stats.coalesced:
+                time.sleep(0.001)
+            release.set()
+            for thread in threads:
+                thread.join(5)
+    finally:
+        query_cache.enabled = False
+    assert calls == [21] and results == [42, 42]
+    assert (stats.misses, stats.coalesced) == (1, 1)
+
+
+@freeze_time("2024-02-15")
+def test_track_queries_counts_statements(engine, test_data):
+    """Test that tracked reads report their SQL statements and cache lookups."""
+    records.create_record(_expense(test_data, 10.0))
+    with track_queries() as stats:
+        utils.get_period_figures(offset_type="month", offset=0, isIncome=False)
+        utils.get_period_figures(offset_type="month", offset=0, isIncome=False)
+    assert (stats.statements, stats.hits, stats.misses) == (1, 1, 1)
@@ -1,4 +1,5 @@
 import pytest
+from freezegun import freeze_time
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from bagels.models.database.db import Base
@@ -6,7 +7,7 @@ from bagels.models.category import Nature
 from bagels.managers import categories
 
 @pytest.fixture(scope="function")
-def test_db():
+def test_db(monkeypatch):
     # Create in-memory SQLite database
     engine = create_engine("sqlite:///:memory:")
     
@@ -14,7 +15,7 @@ def test_db():
     Base.metadata.create_all(engine)
     
     # Create a new session factory bound to the engine
-    categories.Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(categories, "Session", sessionmaker(bind=engine))
     
     yield engine
     
@@ -213,3 +214,89 @@ def test_delete_nonexistent_category(test_db):
     
     # Assertions
     assert result is False
+
+def _reference_categories_records(session, start, end, is_income, subcategories, account_id):
+    """The per-record category totals, used as ground truth."""
+    from bagels.models.category import Category
+    from bagels.models.record import Record
+
+    query = session.query(Record).filter(
+        Record.date >= start, Record.date < end, Record.isIncome == is_income
+    )
+    if account_id is not None:
+        query = query.filter(Record.accountId == account_id)
+    totals = {}
+    for record in query.all():
+        if record.category is None:
+            continue
+        category_id = record.categoryId
+        if not subcategories and record.category.parentCategoryId:
+            category_id = record.category.parentCategoryId
+        totals[category_id] = totals.get(category_id, 0) + record.amount - sum(
+            split.amount for split in record.splits
+        )
+    live = {c.id for c in session.query(Category).filter(Category.deletedAt.is_(None))}
+    return {k: v for k, v in totals.items() if k in live and v != 0}
+
+@freeze_time("2024-02-15")
+def test_get_all_categories_records_matches_reference(test_db):
+    import random
+    from datetime import datetime, timedelta
+    from bagels.managers.utils import get_start_end_of_period
+    from bagels.models.account import Account
+    from bagels.models.category import Category
+    from bagels.models.person import Person
+    from bagels.models.record import Record
+    from bagels.models.split import Split
+
+    rng = random.Random(3)
+    session = categories.Session()
+    accounts = [Account(name=f"Account {i}", beginningBalance=0) for i in range(2)]
+    parents = [Category(name=f"Parent {i}", nature=Nature.WANT, color="red") for i in range(3)]
+    person = Person(name="Person")
+    session.add_all([*accounts, *parents, person])
+    session.flush()
+    children = [
+        Category(name=f"Child {i}", nature=Nature.NEED, color="blue", parentCategoryId=rng.choice(parents).id)
+        for i in range(5)
+    ]
+    session.add_all(children)
+    session.flush()
+    children[0].deletedAt = datetime(2024, 1, 1)
+    parents[2].deletedAt = datetime(2024, 1, 1)
+    all_categories = parents + children
+
+    new_records = []
+    for _ in range(400):
+        is_transfer = rng.random() < 0.1
+        new_records.append(Record(
+            label="Random",
+            amount=round(rng.uniform(1, 500), 2),
+            accountId=rng.choice(accounts).id,
+            categoryId=None if is_transfer else rng.choice(all_categories).id,
+            isIncome=not is_transfer and rng.random() < 0.3,
+            isTransfer=is_transfer,
+            transferToAccountId=accounts[0].id if is_transfer else None,
+            date=datetime(2023, 12, 1) + timedelta(minutes=rng.randint(0, 80 * 24 * 60)),
+        ))
+    session.add_all(new_records)
+    session.flush()
+    for record in rng.sample(new_records, 100):
+        session.add(Split(recordId=record.id, amount=round(rng.uniform(1, 50), 2), personId=person.id))
+    session.commit()
+
+    for offset_type, offset in [("month", 0), ("month", -1), ("year", 0)]:
+        start, end = get_start_end_of_period(offset, offset_type)
+        for is_income in (True, False):
+            for subcategories in (True, False):
+                for account_id in (None, accounts[1].id):
+                    result = categories.get_all_categories_records(
+                        offset, offset_type, is_income, subcategories, account_id
+                    )
+                    expected = _reference_categories_records(
+                        session, start, end, is_income, subcategories, account_id
+                    )
+                    assert {c.id: c.amount for c in result} == pytest.approx(expected)
+                    amounts = [c.amount for c in result]
+                    assert amounts == sorted(amounts, reverse=True)
+    session.close()
@@ -1,11 +1,15 @@
 import pytest
+from datetime import datetime
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from bagels.models.database.db import Base
+from bagels.models.account import Account
+from bagels.models.record import Record
+from bagels.models.split import Split
 from bagels.managers import persons
 
 @pytest.fixture(scope="function")
-def test_db():
+def test_db(monkeypatch):
     # Create in-memory SQLite database
     engine = create_engine("sqlite:///:memory:")
     
@@ -13,7 +17,7 @@ def test_db():
     Base.metadata.create_all(engine)
     
     # Create a new session factory bound to the engine
-    persons.Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(persons, "Session", sessionmaker(bind=engine))
     
     yield engine
     
@@ -110,3 +114,33 @@ def test_delete_nonexistent_person(test_db):
     
     # Assertions
     assert result is False
+
+def test_get_persons_with_net_due(test_db):
+    # Create test data: expense splits are owed by the person, income splits to them
+    session = sessionmaker(bind=test_db)()
+    account = Account(name="Account", beginningBalance=0)
+    session.add(account)
+    session.flush()
+    alice = persons.create_person({"name": "Alice"})
+    bob = persons.create_person({"name": "Bob"})
+    gone = persons.create_person({"name": "Gone"})
+    for amount, is_income, person, is_paid in [
+        (30.0, False, alice, False),
+        (20.0, False, alice, True),
+        (8.0, True, alice, False),
+        (5.0, False, gone, False),
+    ]:
+        record = Record(label="Record", amount=amount * 2, date=datetime(2024, 1, 1),
+                        accountId=account.id, isIncome=is_income)
+        session.add(record)
+        session.flush()
+        session.add(Split(recordId=record.id, amount=amount, personId=person.id, isPaid=is_paid))
+    session.commit()
+    session.close()
+    persons.delete_person(gone.id)
+
+    # Get persons with their net due
+    result = persons.get_persons_with_net_due()
+
+    # Assertions: paid splits and deleted persons are left out
+    assert [(p.name, p.due) for p in result] == [("Alice", 22.0), ("Bob", 0)]
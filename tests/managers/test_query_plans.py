@@ -0,0 +1,163 @@
+import re
+import pytest
+from datetime import datetime, timedelta
+from freezegun import freeze_time
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from bagels.models.database.db import Base
+from bagels.models.account import Account
+from bagels.models.record import Record
+from bagels.models.split import Split
+from bagels.models.person import Person
+from bagels.models.category import Category, Nature
+from bagels.managers import persons, records, utils
+
+# Hot tables that must always be reached through an index
+FULL_SCAN = re.compile(r"\bSCAN (record|split)\b")
+
+
+@pytest.fixture(scope="function")
+def engine(monkeypatch):
+    """Create a test database that records every statement it executes."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    for module in (persons, records, utils):
+        monkeypatch.setattr(module, "Session", sessionmaker(bind=engine))
+
+    engine.statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            engine.statements.append((statement, parameters))
+
+    yield engine
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def test_data(engine):
+    """Create a small ledger so lazy loads and joins are exercised."""
+    session = sessionmaker(bind=engine)()
+    account = Account(name="Account", beginningBalance=100.0)
+    category = Category(name="Category", nature=Nature.NEED, color="#FF0000")
+    person = Person(name="Person")
+    session.add_all([account, category, person])
+    session.flush()
+    for day in range(5):
+        record = Record(
+            label=f"Record {day}",
+            amount=10.0,
+            accountId=account.id,
+            categoryId=category.id,
+            date=datetime(2024, 2, 10) + timedelta(days=day),
+        )
+        session.add(record)
+        session.flush()
+        session.add(
+            Split(
+                recordId=record.id, amount=2.0, personId=person.id, accountId=account.id
+            )
+        )
+    session.commit()
+    yield {"account": account}
+    session.close()
+
+
+def query_plans(engine):
+    """Run EXPLAIN QUERY PLAN on every captured statement and return the plans."""
+    plans = []
+    with engine.connect() as conn:
+        for statement, parameters in engine.statements:
+            rows = conn.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            ).all()
+            plans.append((statement, [row[-1] for row in rows]))
+    engine.statements.clear()
+    return plans
+
+
+def assert_uses_indexes(engine):
+    plans = query_plans(engine)
+    assert plans, "No statements were captured"
+    for statement, plan in plans:
+        scans = [line for line in plan if FULL_SCAN.search(line)]
+        assert not scans, f"Full table scan {scans} in:\n{statement}"
+
+
+@freeze_time("2024-02-15")
+def test_get_records_uses_indexes(engine, test_data):
+    engine.statements.clear()
+    assert records.get_records(offset=0, offset_type="month")
+    assert_uses_indexes(engine)
+    records.get_records(
+        offset=0,
+        offset_type="month",
+        account_id=test_data["account"].id,
+        label="Record",
+    )
+    assert_uses_indexes(engine)
+
+
+@freeze_time("2024-02-15")
+def test_get_period_figures_uses_indexes(engine, test_data):
+    engine.statements.clear()
+    assert (
+        utils.get_period_figures(offset_type="month", offset=0, isIncome=False) == 40.0
+    )
+    assert_uses_indexes(engine)
+    utils.get_period_figures(
+        accountId=test_data["account"].id,
+        offset_type="month",
+        offset=0,
+        nature=Nature.NEED,
+    )
+    assert_uses_indexes(engine)
+
+
+@freeze_time("2024-02-15")
+def test_get_spending_uses_indexes(engine, test_data):
+    engine.statements.clear()
+    assert (
+        sum(records.get_spending(datetime(2024, 2, 1), datetime(2024, 2, 29))) == 40.0
+    )
+    assert_uses_indexes(engine)
+
+
+def test_get_persons_with_net_due_uses_indexes(engine, test_data):
+    """Dues are summed in one pass over the unpaid splits index, not per person."""
+    engine.statements.clear()
+    assert persons.get_persons_with_net_due()[0].due == 10.0
+    [(statement, plan)] = query_plans(engine)
+    scans = [line for line in plan if FULL_SCAN.search(line)]
+    assert scans == ["SCAN split USING INDEX ix_split_unpaid_personId"], plan
+    assert "SEARCH record USING INTEGER PRIMARY KEY (rowid=?)" in plan
+
+
+@freeze_time("2024-02-15")
+def test_get_records_sorts_by_index(engine, test_data):
+    """Records are ordered by (dateDay, createdAt) straight from the index."""
+    engine.statements.clear()
+    result = records.get_records(offset=0, offset_type="month")
+    assert [r.label for r in result] == [f"Record {day}" for day in reversed(range(5))]
+    for statement, plan in query_plans(engine):
+        if "ORDER BY" in statement:
+            assert not any("TEMP B-TREE FOR ORDER BY" in line for line in plan), plan
+
+
+@freeze_time("2024-02-15")
+def test_get_records_page_uses_indexes(engine, test_data):
+    first = records.get_records(offset=0, offset_type="month", limit=2)
+    engine.statements.clear()
+    rest = records.get_records(
+        offset=0,
+        offset_type="month",
+        limit=2,
+        after=records.get_record_page_key(first[-1]),
+    )
+    assert [r.label for r in rest] == ["Record 2", "Record 1"]
+    for statement, plan in query_plans(engine):
+        assert not any(
+            FULL_SCAN.search(line) or "TEMP B-TREE" in line for line in plan
+        ), plan
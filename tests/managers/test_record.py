@@ -0,0 +1,664 @@
+import random
+import pytest
+from datetime import datetime, timedelta
+from freezegun import freeze_time
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import joinedload, sessionmaker
+
+from bagels.models.database.db import Base
+from bagels.models.account import Account
+from bagels.models.record import Record
+from bagels.models.split import Split
+from bagels.models.person import Person
+from bagels.models.category import Category, Nature
+from bagels.components.modules.records._table_builder import RecordTableBuilder
+from bagels.managers import records, splits, utils
+from bagels.managers.cache import track_queries
+
+
+@pytest.fixture(scope="function")
+def engine(monkeypatch):
+    """Create a test-specific database engine."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    for module in (records, splits, utils):
+        monkeypatch.setattr(module, "Session", sessionmaker(bind=engine))
+    yield engine
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture(scope="function")
+def session(engine):
+    """Create a new session for a test."""
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def test_data(session):
+    """Create test accounts, categories, and people."""
+    outside = Account(name="Outside source", beginningBalance=0.0, hidden=True)
+    account1 = Account(name="Account 1", beginningBalance=1000.0)
+    account2 = Account(name="Account 2", beginningBalance=500.0)
+    deleted = Account(
+        name="Deleted", beginningBalance=250.0, deletedAt=datetime(2024, 1, 1)
+    )
+    session.add_all([outside, account1, account2, deleted])
+
+    category = Category(name="Test Category", nature=Nature.NEED, color="#FF0000")
+    session.add(category)
+
+    person = Person(name="Test Person")
+    session.add(person)
+
+    session.commit()
+
+    return {
+        "outside": outside,
+        "account1": account1,
+        "account2": account2,
+        "deleted": deleted,
+        "category": category,
+        "person": person,
+    }
+
+
+def _reference_daily_balance(session, start_date, end_date):
+    """Per-record reimplementation of the balance rules, used as ground truth."""
+    accounts = session.query(Account).filter(Account.deletedAt.is_(None)).all()
+    account_ids = {a.id for a in accounts}
+    balance = sum(a.beginningBalance for a in accounts)
+    all_records = (
+        session.query(Record)
+        .options(
+            joinedload(Record.splits),
+            joinedload(Record.account),
+            joinedload(Record.transferToAccount),
+        )
+        .all()
+    )
+
+    def adjust_balance(r):
+        if r.isTransfer:
+            if r.transferToAccount and r.transferToAccount.name == "Outside source":
+                return -r.amount
+            if r.account and r.account.name == "Outside source":
+                return r.amount
+            return 0
+        if r.isIncome:
+            return r.amount - sum(s.amount for s in r.splits)
+        return -r.amount + sum(s.amount for s in r.splits)
+
+    relevant = [r for r in all_records if r.accountId in account_ids]
+    balance += sum(adjust_balance(r) for r in relevant if r.date < start_date)
+
+    results = []
+    current = start_date
+    while current <= end_date and current <= datetime.today():
+        balance += sum(
+            adjust_balance(r) for r in relevant if r.date.date() == current.date()
+        )
+        results.append(balance)
+        current += timedelta(days=1)
+    return results
+
+
+@freeze_time("2024-02-15 12:00:00")
+def test_daily_balance_rules(session, test_data):
+    """Test each balance rule on a single day."""
+    day = datetime(2024, 2, 10, 9, 30)
+    income = Record(
+        label="Income",
+        amount=200.0,
+        accountId=test_data["account1"].id,
+        categoryId=test_data["category"].id,
+        isIncome=True,
+        date=day,
+    )
+    expense = Record(
+        label="Expense",
+        amount=150.0,
+        accountId=test_data["account1"].id,
+        categoryId=test_data["category"].id,
+        date=day,
+    )
+    internal = Record(
+        label="Internal",
+        amount=300.0,
+        accountId=test_data["account1"].id,
+        isTransfer=True,
+        transferToAccountId=test_data["account2"].id,
+        date=day,
+    )
+    out = Record(
+        label="Out",
+        amount=40.0,
+        accountId=test_data["account2"].id,
+        isTransfer=True,
+        transferToAccountId=test_data["outside"].id,
+        date=day,
+    )
+    into = Record(
+        label="In",
+        amount=60.0,
+        accountId=test_data["outside"].id,
+        isTransfer=True,
+        transferToAccountId=test_data["account1"].id,
+        date=day,
+    )
+    ignored = Record(
+        label="Deleted account",
+        amount=999.0,
+        accountId=test_data["deleted"].id,
+        categoryId=test_data["category"].id,
+        date=day,
+    )
+    session.add_all([income, expense, internal, out, into, ignored])
+    session.flush()
+    session.add(
+        Split(recordId=expense.id, amount=50.0, personId=test_data["person"].id)
+    )
+    session.commit()
+
+    balances = records.get_daily_balance(datetime(2024, 2, 9), datetime(2024, 2, 11))
+
+    # 1500 + 200 - (150 - 50) - 40 + 60 = 1620
+    assert balances == [1500.0, 1620.0, 1620.0]
+
+
+@freeze_time("2024-02-15 12:00:00")
+def test_daily_balance_stops_at_today(session, test_data):
+    """Test that days after today are not returned."""
+    balances = records.get_daily_balance(datetime(2024, 2, 1), datetime(2024, 2, 29))
+    assert len(balances) == 15
+    assert records.get_daily_balance(datetime(2024, 3, 1), datetime(2024, 3, 31)) == []
+
+
+@freeze_time("2024-02-15 12:00:00")
+def test_daily_balance_matches_reference(session, test_data):
+    """Test the aggregated balance against the per-record rules on random data."""
+    rng = random.Random(42)
+    account_ids = [
+        test_data[key].id for key in ("outside", "account1", "account2", "deleted")
+    ]
+    new_records = []
+    for _ in range(300):
+        account_id = rng.choice(account_ids)
+        kind = rng.choice(["income", "expense", "transfer"])
+        record = Record(
+            label="Random",
+            amount=round(rng.uniform(1, 500), 2),
+            accountId=account_id,
+            categoryId=None if kind == "transfer" else test_data["category"].id,
+            isIncome=kind == "income",
+            isTransfer=kind == "transfer",
+            transferToAccountId=rng.choice([a for a in account_ids if a != account_id])
+            if kind == "transfer"
+            else None,
+            date=datetime(2023, 11, 1)
+            + timedelta(minutes=rng.randint(0, 150 * 24 * 60)),
+        )
+        new_records.append(record)
+    session.add_all(new_records)
+    session.flush()
+    for record in rng.sample(new_records, 80):
+        if not record.isTransfer:
+            for _ in range(rng.randint(1, 3)):
+                session.add(
+                    Split(
+                        recordId=record.id,
+                        amount=round(rng.uniform(1, 50), 2),
+                        personId=test_data["person"].id,
+                        isPaid=rng.random() < 0.5,
+                    )
+                )
+    session.commit()
+
+    start, end = datetime(2023, 12, 15), datetime(2024, 2, 29, 23, 59, 59)
+    expected = _reference_daily_balance(session, start, end)
+    assert records.get_daily_balance(start, end) == pytest.approx(expected)
+
+
+def _count_commits(engine):
+    commits = []
+    event.listen(engine, "commit", lambda conn: commits.append(conn))
+    return commits
+
+
+def _record_data(test_data, **overrides):
+    return {
+        "label": "Dinner",
+        "amount": 100.0,
+        "accountId": test_data["account1"].id,
+        "categoryId": test_data["category"].id,
+        "date": datetime(2024, 2, 10),
+        **overrides,
+    }
+
+
+def test_create_record_and_splits_commits_once(engine, session, test_data):
+    """Test that a record and all of its splits are written in one transaction."""
+    commits = _count_commits(engine)
+    splits_data = [
+        {"amount": 10.0, "personId": test_data["person"].id} for _ in range(5)
+    ]
+
+    record = records.create_record_and_splits(_record_data(test_data), splits_data)
+
+    assert len(commits) == 1
+    assert record.id is not None
+    assert len(splits.get_splits_by_record_id(record.id)) == 5
+
+
+def test_create_record_and_splits_is_atomic(engine, session, test_data):
+    """Test that a failing split insert leaves no partial record behind."""
+    splits_data = [
+        {"amount": 10.0, "personId": test_data["person"].id},
+        {"amount": 10.0, "personId": None},  # violates NOT NULL
+    ]
+    with pytest.raises(Exception):
+        records.create_record_and_splits(_record_data(test_data), splits_data)
+
+    assert session.query(Record).count() == 0
+    assert session.query(Split).count() == 0
+
+
+def test_update_record_and_splits_commits_once(engine, session, test_data):
+    """Test that updating a record with splits is one transaction."""
+    record = records.create_record_and_splits(
+        _record_data(test_data),
+        [{"amount": 10.0, "personId": test_data["person"].id} for _ in range(3)],
+    )
+    commits = _count_commits(engine)
+
+    updated = records.update_record_and_splits(
+        record.id,
+        {"amount": 120.0},
+        [{"amount": 20.0, "isPaid": True} for _ in range(3)],
+    )
+
+    assert len(commits) == 1
+    assert updated.amount == 120.0
+    assert records.get_record_total_split_amount(record.id) == 60.0
+
+
+def test_unit_of_work(engine, session, test_data):
+    """Test that manager calls sharing a unit of work commit or roll back together."""
+    commits = _count_commits(engine)
+    with utils.unit_of_work() as uow:
+        record = records.create_record(_record_data(test_data), session=uow)
+        splits.create_split(
+            {"recordId": record.id, "amount": 5.0, "personId": test_data["person"].id},
+            session=uow,
+        )
+        records.update_record(record.id, {"label": "Lunch"}, session=uow)
+    assert len(commits) == 1
+    assert records.get_record_by_id(record.id, populate_splits=True).label == "Lunch"
+
+    with pytest.raises(RuntimeError):
+        with utils.unit_of_work() as uow:
+            records.delete_record(record.id, session=uow)
+            raise RuntimeError("abort")
+    assert records.get_record_by_id(record.id) is not None
+    assert len(splits.get_splits_by_record_id(record.id)) == 1
+
+
+@pytest.mark.parametrize("defer_indexes", [False, True])
+def test_bulk_create_records(engine, session, test_data, defer_indexes):
+    """Test that bulk-created records, splits and balances match row-by-row creation."""
+    from sqlalchemy import inspect
+    from bagels.managers.accounts import verify_account_balances
+    from bagels.models.account_balance import AccountBalance
+
+    indexes_before = {i["name"] for i in inspect(engine).get_indexes("record")}
+    data = [
+        _record_data(test_data, label=f"Bulk {i}", amount=float(i + 1))
+        for i in range(25)
+    ]
+    data[3]["isIncome"] = True
+    data[5]["splits"] = [
+        {"amount": 2.0, "personId": test_data["person"].id},
+        {
+            "amount": 1.0,
+            "personId": test_data["person"].id,
+            "isPaid": True,
+            "accountId": test_data["account2"].id,
+        },
+    ]
+    data[7] = {
+        "label": "Transfer",
+        "amount": 30.0,
+        "accountId": test_data["account1"].id,
+        "isTransfer": True,
+        "transferToAccountId": test_data["account2"].id,
+    }
+
+    ids = records.bulk_create_records(data, batch_size=10, defer_indexes=defer_indexes)
+
+    assert len(ids) == 25
+    created = {r.id: r for r in session.query(Record).all()}
+    assert [created[i].label for i in ids] == [d["label"] for d in data]
+    assert created[ids[3]].isIncome and not created[ids[4]].isIncome
+    assert created[ids[7]].date is not None and created[ids[7]].createdAt is not None
+    assert sorted(s.amount for s in created[ids[5]].splits) == [1.0, 2.0]
+    assert {i["name"] for i in inspect(engine).get_indexes("record")} == indexes_before
+    assert session.query(AccountBalance).count() > 0
+    assert verify_account_balances(session=session) == {}
+    assert records.verify_daily_rollup(session=session) == {}
+
+
+def test_bulk_create_records_holds_the_write_lock(tmp_path, monkeypatch):
+    """Test that IDs are allocated under the write lock, and dropped indexes come back on failure."""
+    import sqlite3
+    from sqlalchemy import inspect
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'db.db'}")
+    Base.metadata.create_all(engine)
+    for module in (records, splits, utils):
+        monkeypatch.setattr(module, "Session", sessionmaker(bind=engine))
+    account = records.Session()
+    account.add(Account(name="Account", beginningBalance=0.0))
+    account.commit()
+    account.close()
+    indexes_before = {i["name"] for i in inspect(engine).get_indexes("record")}
+
+    def insert_many(connection, table, rows, **column_values):
+        # another writer cannot get in between allocation and insert
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            sqlite3.connect(tmp_path / "db.db", timeout=0).execute("BEGIN IMMEDIATE")
+        raise RuntimeError("insert failed")
+
+    monkeypatch.setattr(records, "_insert_many", insert_many)
+    with pytest.raises(RuntimeError):
+        records.bulk_create_records(
+            [{"label": "Bulk", "amount": 1.0, "accountId": 1}], defer_indexes=True
+        )
+    assert {i["name"] for i in inspect(engine).get_indexes("record")} == indexes_before
+    engine.dispose()
+
+
+def _reference_daily_spending(session, start_date, end_date):
+    """Per-record spending buckets, used as ground truth."""
+    spent = {}
+    for r in (
+        session.query(Record)
+        .filter(Record.date >= start_date, Record.date < end_date)
+        .all()
+    ):
+        if not r.isIncome and not r.isTransfer:
+            spent[r.date.date()] = (
+                spent.get(r.date.date(), 0) + r.amount - sum(s.amount for s in r.splits)
+            )
+    results = []
+    current = start_date
+    while (
+        current.date() <= end_date.date() and current.date() <= datetime.today().date()
+    ):
+        results.append(spent.get(current.date(), 0))
+        current += timedelta(days=1)
+    return results
+
+
+@freeze_time("2024-02-15 12:00:00")
+def test_daily_spending_matches_reference(session, test_data):
+    """Test the day-bucketed spending and its cumulative trend on random data."""
+    rng = random.Random(11)
+    account_ids = [test_data[key].id for key in ("account1", "account2")]
+    new_records = []
+    for _ in range(300):
+        kind = rng.choice(["income", "expense", "expense", "transfer"])
+        new_records.append(
+            Record(
+                label="Random",
+                amount=round(rng.uniform(1, 500), 2),
+                accountId=account_ids[0],
+                categoryId=None if kind == "transfer" else test_data["category"].id,
+                isIncome=kind == "income",
+                isTransfer=kind == "transfer",
+                transferToAccountId=account_ids[1] if kind == "transfer" else None,
+                date=datetime(2024, 1, 1)
+                + timedelta(minutes=rng.randint(0, 70 * 24 * 60)),
+            )
+        )
+    session.add_all(new_records)
+    session.flush()
+    for record in rng.sample(new_records, 80):
+        session.add(
+            Split(
+                recordId=record.id,
+                amount=round(rng.uniform(1, 50), 2),
+                personId=test_data["person"].id,
+            )
+        )
+    session.commit()
+
+    for start, end in [
+        (datetime(2024, 2, 1), datetime(2024, 2, 29, 23, 59, 59)),
+        (datetime(2024, 1, 1), datetime(2024, 12, 31, 23, 59, 59)),
+        (datetime(2024, 3, 1), datetime(2024, 3, 31, 23, 59, 59)),
+    ]:
+        expected = _reference_daily_spending(session, start, end)
+        assert records.get_spending(start, end) == pytest.approx(expected)
+        trend = records.get_spending_trend(start, end)
+        assert trend == pytest.approx(
+            [sum(expected[: i + 1]) for i in range(len(expected))]
+        )
+
+
+def test_daily_rollup_follows_writes(engine, session, test_data):
+    """Test that the daily rollup stays equal to a rebuild through every kind of write."""
+    from bagels.models.daily_rollup import DailyRollup
+
+    person = test_data["person"].id
+    record = records.create_record_and_splits(
+        _record_data(test_data),
+        [{"amount": 10.0, "personId": person}, {"amount": 5.0, "personId": person}],
+    )
+    other = records.create_record(
+        _record_data(test_data, isIncome=True, date=datetime(2024, 2, 11))
+    )
+    transfer = records.create_record(
+        {
+            "label": "Transfer",
+            "amount": 30.0,
+            "accountId": test_data["account1"].id,
+            "isTransfer": True,
+            "transferToAccountId": test_data["account2"].id,
+            "date": datetime(2024, 2, 10),
+        }
+    )
+    assert records.verify_daily_rollup() == {}
+
+    records.update_record(
+        record.id, {"date": datetime(2024, 3, 1), "accountId": test_data["account2"].id}
+    )
+    split = splits.get_splits_by_record_id(record.id)[0]
+    splits.update_split(split.id, {"recordId": other.id, "amount": 7.0})
+    splits.delete_split(splits.get_splits_by_record_id(record.id)[0].id)
+    records.delete_record(transfer.id)
+    assert records.verify_daily_rollup() == {}
+
+    rows = {
+        (r.day, r.isIncome): (r.amount, r.splitAmount, r.count)
+        for r in session.query(DailyRollup)
+    }
+    assert rows == {
+        ("2024-03-01", False): (100.0, 0.0, 1),
+        ("2024-02-11", True): (100.0, 7.0, 1),
+    }
+
+    session.query(DailyRollup).delete()
+    session.commit()
+    assert len(records.verify_daily_rollup()) == 2
+    records.rebuild_daily_rollup()
+    assert records.verify_daily_rollup() == {}
+
+
+@freeze_time("2024-06-15")
+def test_get_records_pages_match_full_list(session, test_data):
+    random.seed(3)
+    created = datetime(2024, 6, 1)
+    for i in range(120):
+        # many records share a day and a createdAt, so ties are broken by id
+        session.add(
+            Record(
+                label=f"Record {i}",
+                amount=1.0,
+                accountId=test_data["account1"].id,
+                categoryId=test_data["category"].id,
+                date=datetime(2024, 1 + random.randrange(6), 1 + random.randrange(3)),
+                createdAt=created + timedelta(minutes=random.randrange(4)),
+            )
+        )
+    session.commit()
+
+    expected = [r.id for r in records.get_records(offset_type="year")]
+    assert len(expected) == 120
+    paged, after = [], None
+    while page := records.get_records(offset_type="year", limit=7, after=after):
+        assert len(page) <= 7
+        paged.extend(r.id for r in page)
+        after = records.get_record_page_key(page[-1])
+    assert paged == expected
+    until = records.get_record_page_key(records.get_records(offset_type="year")[50])
+    assert [
+        r.id for r in records.get_records(offset_type="year", until=until)
+    ] == expected[:51]
+
+
+class _DateRowsBuilder(RecordTableBuilder):
+    """The records table's row building, without the widget."""
+
+    displayMode = "d"
+    FILTERS = {"enabled": lambda: False}
+    page_parent = type(
+        "Home", (), {"filter": {"offset": 0, "offset_type": "year", "byAccount": False}}
+    )
+
+    def __init__(self, show_splits):
+        self.show_splits = show_splits
+
+
+@freeze_time("2024-06-15")
+@pytest.mark.parametrize("show_splits", [True, False])
+def test_date_rows_query_count_is_constant(session, test_data, show_splits):
+    def add_records(count):
+        for i in range(count):
+            record = Record(
+                label=f"Record {i}",
+                amount=10.0,
+                accountId=test_data["account1"].id,
+                categoryId=test_data["category"].id,
+                date=datetime(2024, 1 + i % 6, 1),
+            )
+            session.add(record)
+            session.flush()
+            session.add(
+                Split(
+                    recordId=record.id,
+                    amount=4.0,
+                    personId=test_data["person"].id,
+                    accountId=test_data["account2"].id,
+                    isPaid=False,
+                )
+            )
+        session.commit()
+
+    statements = []
+    for count in (5, 50):
+        add_records(count)
+        builder = _DateRowsBuilder(show_splits)
+        with track_queries() as stats:
+            builder._fill_rows(limit=None)
+        statements.append(stats.statements)
+        amounts = [
+            row.cells[2]
+            for row in builder._table_rows
+            if row.key and row.key.startswith("r-")
+        ]
+        assert len(amounts) == len(session.query(Record).all())
+        if not show_splits:
+            assert all(amount.endswith(" 6.0") for amount in amounts)
+    assert statements[0] == statements[1]
+
+
+def _labelled(test_data, label, date=datetime(2024, 6, 1)):
+    return {
+        "label": label,
+        "amount": 1.0,
+        "accountId": test_data["account1"].id,
+        "categoryId": test_data["category"].id,
+        "date": date,
+    }
+
+
+def _labels(found):
+    return [record.label for record in found]
+
+
+@freeze_time("2024-06-15")
+def test_label_search_follows_writes(engine, session, test_data):
+    dinner = records.create_record(_labelled(test_data, "Dinner with friends"))
+    records.bulk_create_records(
+        [
+            _labelled(test_data, "Coffee beans", datetime(2021, 3, 1)),
+            _labelled(test_data, "Dinner at home", datetime(2022, 1, 1)),
+        ]
+    )
+    assert _labels(records.search_records("din fri")) == ["Dinner with friends"]
+    assert _labels(records.search_records("DIN")) == [
+        "Dinner with friends",
+        "Dinner at home",
+    ]
+    assert _labels(records.search_records("café")) == []
+
+    records.update_record(dinner.id, {"label": "Lunch with friends"})
+    assert _labels(records.search_records("dinner")) == ["Dinner at home"]
+    assert _labels(records.search_records("lun")) == ["Lunch with friends"]
+    records.delete_record(dinner.id)
+    assert _labels(records.search_records("friends")) == []
+    assert _labels(records.search_records("dinner", limit=1, offset=1)) == []
+
+
+@freeze_time("2024-06-15")
+def test_label_search_ranks_and_falls_back(engine, session, test_data):
+    records.bulk_create_records(
+        [_labelled(test_data, "Rent"), _labelled(test_data, "Rent rent rent deposit")]
+    )
+    assert _labels(records.search_records("rent")) == ["Rent rent rent deposit", "Rent"]
+    records.create_record(_labelled(test_data, "50% off!"))
+    assert _labels(records.search_records("%")) == [
+        "50% off!"
+    ]  # no words, so a LIKE scan
+
+
+@freeze_time("2024-06-15")
+def test_get_records_label_filter_and_all_periods(engine, session, test_data):
+    records.bulk_create_records(
+        [
+            _labelled(test_data, "Groceries"),
+            _labelled(test_data, "Groceries", datetime(2020, 1, 1)),
+            _labelled(test_data, "Gym"),
+        ]
+    )
+    assert _labels(records.get_records(offset_type="year", label="groc")) == [
+        "Groceries"
+    ]
+    assert _labels(records.get_records(offset_type="year", label="cer")) == [
+        "Groceries"
+    ]
+    assert len(records.get_records(label="groc", all_periods=True)) == 2
+    assert records.get_records(label="cer", all_periods=True) == []
+    assert len(records.get_records(all_periods=True, limit=2)) == 2
+
+
+def test_label_index_is_built_for_existing_ledgers(engine, session, test_data):
+    from bagels.models.record_search import FTS_TABLE, create_label_index
+
+    records.create_record(_labelled(test_data, "Existing record"))
+    with engine.begin() as connection:
+        connection.exec_driver_sql(f"DROP TABLE {FTS_TABLE}")
+        create_label_index(connection)
+    assert _labels(records.search_records("exist")) == ["Existing record"]
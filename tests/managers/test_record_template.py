@@ -1,4 +1,5 @@
 import pytest
+from datetime import datetime
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
@@ -30,7 +31,7 @@ def setup_test_engine(monkeypatch, engine):
     # Replace the global engine with our test engine
     import bagels.managers.record_templates as rt
 
-    rt.Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(rt, "Session", sessionmaker(bind=engine))
     yield
 
 
@@ -220,3 +221,28 @@ def test_template_validation(template_data, account):
         Exception
     ):  # SQLAlchemy will raise an exception due to CheckConstraint
         record_templates.create_template(invalid_transfer)
+
+
+def test_create_template_from_record_in_unit_of_work(
+    engine, template_data, monkeypatch
+):
+    """Test that a new record and its template are written together, or not at all."""
+    from bagels.managers import records, utils
+    from bagels.models.record import Record
+
+    for module in (records, utils):
+        monkeypatch.setattr(module, "Session", sessionmaker(bind=engine))
+    record_data = {**template_data, "date": datetime(2024, 1, 1)}
+
+    with pytest.raises(RuntimeError):
+        with utils.unit_of_work() as session:
+            records.create_record_and_splits(record_data, [], session)
+            record_templates.create_template_from_record(record_data, session)
+            raise RuntimeError("abort")
+    assert record_templates.get_all_templates() == []
+
+    with utils.unit_of_work() as session:
+        records.create_record_and_splits(record_data, [], session)
+        record_templates.create_template_from_record(record_data, session)
+    assert len(record_templates.get_all_templates()) == 1
+    assert sessionmaker(bind=engine)().query(Record).count() == 1
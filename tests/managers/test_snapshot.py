@@ -0,0 +1,230 @@
+import random
+import pytest
+from datetime import datetime, timedelta
+from freezegun import freeze_time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from bagels.models.database.db import Base
+from bagels.models.account import Account
+from bagels.models.record import Record
+from bagels.models.split import Split
+from bagels.models.person import Person
+from bagels.models.category import Category, Nature
+from bagels.managers import categories, records, snapshot, splits, utils
+from bagels.managers.snapshot import LedgerSnapshot
+
+
+@pytest.fixture(scope="function")
+def engine(monkeypatch):
+    """Create a test-specific database engine."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    for module in (categories, records, snapshot, splits, utils):
+        monkeypatch.setattr(module, "Session", sessionmaker(bind=engine))
+    yield engine
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def ledger(engine):
+    """Create a random ledger with subcategories, transfers and splits."""
+    rng = random.Random(5)
+    session = sessionmaker(bind=engine)()
+    outside = Account(name="Outside source", beginningBalance=0.0, hidden=True)
+    accounts = [
+        Account(name=f"Account {i}", beginningBalance=100.0 * i) for i in range(3)
+    ]
+    parents = [Category(name=f"Parent {n}", nature=n, color="red") for n in Nature]
+    person = Person(name="Person")
+    session.add_all([outside, *accounts, *parents, person])
+    session.flush()
+    children = [
+        Category(
+            name=f"Child {i}",
+            nature=rng.choice(list(Nature)),
+            color="blue",
+            parentCategoryId=rng.choice(parents).id,
+        )
+        for i in range(4)
+    ]
+    session.add_all(children)
+    session.flush()
+    account_ids = [a.id for a in (outside, *accounts)]
+    category_ids = [c.id for c in (*parents, *children)]
+    new_records = []
+    for _ in range(500):
+        kind = rng.choice(["income", "expense", "expense", "transfer"])
+        account_id = rng.choice(account_ids)
+        new_records.append(
+            Record(
+                label="Random",
+                amount=round(rng.uniform(1, 500), 2),
+                accountId=account_id,
+                categoryId=None if kind == "transfer" else rng.choice(category_ids),
+                isIncome=kind == "income",
+                isTransfer=kind == "transfer",
+                transferToAccountId=rng.choice(
+                    [a for a in account_ids if a != account_id]
+                )
+                if kind == "transfer"
+                else None,
+                date=datetime(2023, 11, 1)
+                + timedelta(minutes=rng.randint(0, 140 * 24 * 60)),
+            )
+        )
+    session.add_all(new_records)
+    session.flush()
+    for record in rng.sample(new_records, 150):
+        session.add(
+            Split(
+                recordId=record.id,
+                amount=round(rng.uniform(1, 50), 2),
+                personId=person.id,
+            )
+        )
+    session.commit()
+    yield {
+        "session": session,
+        "accounts": account_ids,
+        "categories": category_ids,
+        "person": person.id,
+        "records": [r.id for r in new_records],
+    }
+    session.close()
+
+
+def assert_matches_sql(ledger_snapshot, account_ids):
+    for offset_type, offset in [
+        (None, None),
+        ("month", 0),
+        ("month", -1),
+        ("week", 0),
+        ("year", -1),
+    ]:
+        for account_id in (None, account_ids[1]):
+            for isIncome in (None, True, False):
+                for nature in (None, Nature.MUST):
+                    kwargs = dict(
+                        accountId=account_id,
+                        offset_type=offset_type,
+                        offset=offset,
+                        isIncome=isIncome,
+                        nature=nature,
+                    )
+                    assert ledger_snapshot.period_figures(**kwargs) == pytest.approx(
+                        utils.get_period_figures(**kwargs)
+                    ), kwargs
+            if offset_type is None:
+                continue
+            for is_income in (True, False):
+                for subcategories in (True, False):
+                    args = (offset, offset_type, is_income, subcategories, account_id)
+                    expected = [
+                        (c.id, c.amount)
+                        for c in categories.get_all_categories_records(*args)
+                    ]
+                    result = ledger_snapshot.category_totals(*args)
+                    assert [c for c, _ in result] == [c for c, _ in expected]
+                    assert [a for _, a in result] == pytest.approx(
+                        [a for _, a in expected]
+                    )
+    for start, end in [
+        (datetime(2024, 2, 1), datetime(2024, 2, 29, 23, 59, 59)),
+        (datetime(2023, 10, 1), datetime(2024, 3, 31, 23, 59, 59)),
+    ]:
+        assert ledger_snapshot.daily_spending(start, end).tolist() == pytest.approx(
+            records.get_daily_spending(start, end).tolist()
+        )
+        assert ledger_snapshot.daily_balance(start, end) == pytest.approx(
+            records.get_daily_balance(start, end)
+        )
+
+
+@freeze_time("2024-02-15 12:00:00")
+def test_snapshot_matches_sql(ledger):
+    """Test every vectorized query against its SQL manager function."""
+    ledger_snapshot = LedgerSnapshot().load()
+    assert len(ledger_snapshot) == 500
+    assert ledger_snapshot.nbytes < 100 * len(ledger_snapshot)
+    assert_matches_sql(ledger_snapshot, ledger["accounts"])
+
+
+@freeze_time("2024-02-15 12:00:00")
+def test_snapshot_follows_writes(ledger):
+    """Test that manager writes are journaled and applied incrementally."""
+    ledger_snapshot = LedgerSnapshot().load()
+    record_ids = ledger["records"]
+
+    records.update_record(
+        record_ids[0], {"amount": 1234.5, "date": datetime(2024, 2, 3)}
+    )
+    records.delete_record(record_ids[1])
+    splits.create_split(
+        {"recordId": record_ids[2], "amount": 3.0, "personId": ledger["person"]}
+    )
+    records.create_record(
+        {
+            "label": "New",
+            "amount": 42.0,
+            "accountId": ledger["accounts"][1],
+            "categoryId": ledger["categories"][-1],
+            "date": datetime(2024, 2, 10),
+        }
+    )
+    records.bulk_create_records(
+        [
+            {
+                "label": "Bulk",
+                "amount": 7.0,
+                "accountId": ledger["accounts"][2],
+                "categoryId": ledger["categories"][0],
+                "date": datetime(2024, 2, 11),
+                "splits": [{"amount": 2.0, "personId": ledger["person"]}],
+            },
+        ]
+    )
+    categories.update_category(
+        ledger["categories"][-1], {"parentCategoryId": ledger["categories"][1]}
+    )
+    with pytest.raises(RuntimeError):
+        with utils.unit_of_work() as uow:
+            records.delete_record(record_ids[3], session=uow)
+            raise RuntimeError("abort")
+
+    assert len(ledger_snapshot._pending.record_ids) == 5
+    ledger_snapshot.refresh()
+    assert len(ledger_snapshot) == 501
+    assert_matches_sql(ledger_snapshot, ledger["accounts"])
+
+
+@freeze_time("2024-02-15 12:00:00")
+def test_managers_read_from_snapshot(ledger, monkeypatch):
+    """Test that manager reads answer from the snapshot when it is enabled."""
+    monkeypatch.setattr(snapshot, "_snapshot", None)
+    start, end = datetime(2024, 2, 1), datetime(2024, 2, 29, 23, 59, 59)
+    expected = (
+        utils.get_period_figures(offset_type="month", offset=0, isIncome=False),
+        [
+            (c.id, c.amount, c.name)
+            for c in categories.get_all_categories_records(0, "month", False)
+        ],
+        records.get_spending_trend(start, end),
+        records.get_daily_balance(start, end),
+    )
+    monkeypatch.setattr(snapshot.CONFIG.analytics, "ledger_snapshot", True)
+    result = (
+        utils.get_period_figures(offset_type="month", offset=0, isIncome=False),
+        [
+            (c.id, c.amount, c.name)
+            for c in categories.get_all_categories_records(0, "month", False)
+        ],
+        records.get_spending_trend(start, end),
+        records.get_daily_balance(start, end),
+    )
+    assert snapshot._snapshot is not None
+    assert result[0] == expected[0]
+    assert [c[::2] for c in result[1]] == [c[::2] for c in expected[1]]
+    assert result[2] == pytest.approx(expected[2]) and result[3] == pytest.approx(
+        expected[3]
+    )
@@ -1,5 +1,6 @@
+import random
 import pytest
-from datetime import datetime
+from datetime import datetime, timedelta
 from freezegun import freeze_time
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -231,6 +232,66 @@ def test_get_period_figures(session, test_data):
     )
     assert expenses == 350.0  # 150 (expense) + 200 (split expense after paid split)
 
+def _reference_period_figures(session, accountId=None, offset_type=None, offset=None, isIncome=None, nature=None):
+    """The per-record implementation of get_period_figures, used as ground truth."""
+    query = session.query(Record)
+    if accountId is not None:
+        query = query.filter(Record.accountId == accountId)
+    if offset_type is not None and offset is not None:
+        start, end = utils.get_start_end_of_period(offset, offset_type)
+        query = query.filter(Record.date >= start, Record.date < end)
+    if nature is not None:
+        query = query.join(Record.category).filter(Category.nature == nature)
+    total = 0
+    for record in query.all():
+        if isIncome is not None and (record.isTransfer or record.isIncome != isIncome):
+            continue
+        record_amount = record.amount - sum(split.amount for split in record.splits)
+        if not record.isTransfer:
+            total += record_amount if record.isIncome else -record_amount
+    return abs(round(total, CONFIG.defaults.round_decimals))
+
+@freeze_time("2024-02-15")
+def test_get_period_figures_matches_reference(session, test_data):
+    """Test the SQL aggregate against the per-record rules on random data."""
+    rng = random.Random(7)
+    want = Category(name="Want Category", nature=Nature.WANT, color="#00FF00")
+    session.add(want)
+    session.flush()
+    account_ids = [test_data["account1"].id, test_data["account2"].id]
+    category_ids = [test_data["category"].id, want.id]
+    new_records = []
+    for _ in range(400):
+        kind = rng.choice(["income", "expense", "expense", "transfer"])
+        account_id = rng.choice(account_ids)
+        new_records.append(Record(
+            label="Random",
+            amount=round(rng.uniform(1, 500), 2),
+            accountId=account_id,
+            categoryId=None if kind == "transfer" else rng.choice(category_ids),
+            isIncome=kind == "income",
+            isTransfer=kind == "transfer",
+            transferToAccountId=[a for a in account_ids if a != account_id][0] if kind == "transfer" else None,
+            date=datetime(2023, 10, 1) + timedelta(minutes=rng.randint(0, 150 * 24 * 60)),
+        ))
+    session.add_all(new_records)
+    session.flush()
+    for record in rng.sample(new_records, 120):
+        for _ in range(rng.randint(1, 3)):
+            session.add(Split(recordId=record.id, amount=round(rng.uniform(1, 50), 2),
+                              personId=test_data["person"].id, isPaid=rng.random() < 0.5))
+    session.commit()
+
+    for accountId in [None, *account_ids]:
+        for offset_type, offset in [(None, None), ("month", 0), ("month", -2), ("week", -1), ("year", 0)]:
+            for isIncome in [None, True, False]:
+                for nature in [None, Nature.NEED, Nature.WANT]:
+                    kwargs = dict(accountId=accountId, offset_type=offset_type, offset=offset,
+                                  isIncome=isIncome, nature=nature)
+                    assert utils.get_period_figures(session=session, **kwargs) == pytest.approx(
+                        _reference_period_figures(session, **kwargs)
+                    ), kwargs
+
 # Test average calculations
 def test_get_days_in_period():
     """Test days in period calculations."""
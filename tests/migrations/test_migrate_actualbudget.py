@@ -0,0 +1,127 @@
+import sqlite3
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from bagels.migrations.migrate_actualbudget import BudgetToBagelsMigration
+from bagels.models.database.db import Base
+from bagels.models.account import Account
+from bagels.models.category import Category
+from bagels.models.record import Record
+from bagels.models.split import Split  # noqa: F401, registers the mapper
+from bagels.models.person import Person  # noqa: F401
+
+
+@pytest.fixture
+def budget_db(tmp_path):
+    """Create a minimal Actual Budget database."""
+    path = tmp_path / "db.sqlite"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE accounts (id TEXT, name TEXT, balance_current INTEGER,
+            official_name TEXT, offbudget INTEGER, closed INTEGER, tombstone INTEGER);
+        CREATE TABLE category_groups (id TEXT, name TEXT, is_income INTEGER, tombstone INTEGER);
+        CREATE TABLE categories (id TEXT, name TEXT, is_income INTEGER, cat_group TEXT,
+            tombstone INTEGER);
+        CREATE TABLE v_transactions_internal (id TEXT, account TEXT, category TEXT,
+            amount INTEGER, date INTEGER, starting_balance_flag INTEGER, transfer_id TEXT,
+            is_parent INTEGER, is_child INTEGER, tombstone INTEGER);
+
+        INSERT INTO accounts VALUES
+            ('a1', 'Checking', 150000, 'Main checking', 0, 0, 0),
+            ('a2', 'Savings', 0, NULL, 1, 0, 0),
+            ('a3', 'Deleted', 0, NULL, 0, 0, 1);
+        INSERT INTO category_groups VALUES
+            ('g1', 'Income', 1, 0),
+            ('g2', 'Food', 0, 0);
+        INSERT INTO categories VALUES
+            ('c1', 'Salary', 1, 'g1', 0),
+            ('c2', 'Groceries', 0, 'g2', 0),
+            ('c3', 'Old', 0, 'g2', 1);
+        INSERT INTO v_transactions_internal VALUES
+            ('t1', 'a1', 'c1', 300000, 20240101, 0, NULL, 0, 0, 0),
+            ('t2', 'a1', 'c2', -2550, 20240102, 0, NULL, 0, 0, 0),
+            ('t3', 'a1', NULL, -1000, 20240103, 0, NULL, 0, 0, 0),
+            ('t4', 'a1', NULL, -5000, 20240104, 0, 't5', 0, 0, 0),
+            ('t5', 'a2', NULL, 5000, 20240104, 0, 't4', 0, 0, 0),
+            ('t6', 'a1', 'c2', 0, 20240105, 0, NULL, 0, 0, 0),
+            ('t7', 'a1', 'c2', -100, 20240106, 0, NULL, 0, 0, 1),
+            ('t8', 'a1', 'c2', -100, 20240107, 0, NULL, 0, 1, 0),
+            ('t9', 'a3', 'c2', -100, 20240108, 0, NULL, 0, 0, 0);
+    """)
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def bagels_db(tmp_path):
+    """Create an empty Bagels database file."""
+    path = tmp_path / "bagels.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=wal")
+    engine.dispose()
+    yield path, sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def test_migrate(budget_db, bagels_db):
+    """Test that accounts, categories and transactions are carried over."""
+    path, Session = bagels_db
+    progress = []
+
+    migrator = BudgetToBagelsMigration(str(budget_db), str(path))
+    migrator.migrate(on_progress=lambda done, total: progress.append((done, total)))
+
+    session = Session()
+    accounts = {a.name: a for a in session.query(Account).all()}
+    assert set(accounts) == {"Checking", "Savings"}
+    assert accounts["Checking"].beginningBalance == 1500.0
+    assert accounts["Checking"].description == "Main checking"
+    assert accounts["Savings"].hidden
+
+    categories = {c.name: c for c in session.query(Category).all()}
+    assert set(categories) == {"Uncategorized", "Income", "Salary", "Food", "Groceries"}
+    assert categories["Salary"].parentCategoryId == categories["Income"].id
+
+    records = {r.date.day: r for r in session.query(Record).all()}
+    assert sorted(records) == [1, 2, 3, 4]
+    assert records[1].isIncome and records[1].amount == 3000.0
+    assert records[1].categoryId == categories["Salary"].id
+    assert records[1].date == datetime(2024, 1, 1, 12, 0)
+    assert records[1].dateDay == "2024-01-01"
+    assert not records[2].isIncome and records[2].amount == 25.5
+    assert records[3].categoryId == categories["Uncategorized"].id
+    assert records[4].isTransfer
+    assert records[4].accountId == accounts["Savings"].id
+    assert records[4].transferToAccountId == accounts["Checking"].id
+    assert progress and progress[-1][0] == progress[-1][1]
+    session.close()
+
+    # Bulk-load pragmas are undone and the database is released, even while
+    # the migrator is still referenced
+    conn = sqlite3.connect(path, timeout=0)
+    assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    conn.execute("DELETE FROM record")
+    conn.commit()
+    conn.close()
+
+
+def test_migrate_rolls_back_on_error(budget_db, bagels_db):
+    """Test that a failed migration leaves the Bagels database untouched."""
+    path, Session = bagels_db
+    conn = sqlite3.connect(budget_db)
+    conn.execute("DROP TABLE v_transactions_internal")
+    conn.commit()
+    conn.close()
+
+    with pytest.raises(sqlite3.OperationalError):
+        BudgetToBagelsMigration(str(budget_db), str(path)).migrate()
+
+    session = Session()
+    assert session.query(Account).count() == 0
+    assert session.query(Category).count() == 0
+    session.close()